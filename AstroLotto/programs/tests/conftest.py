@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+import sys
+import types
+from pathlib import Path
+
+# Tests import the app the way tests/big_patch_selftest.py does: `programs.utilities.<module>`.
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# utilities/__init__ imports boot_heal, which backs up and rewrites CSVs under the real
+# AstroLotto/Data on import. Register an empty stand-in first so tests never touch user data.
+for _name in ("programs.utilities.boot_heal", "utilities.boot_heal"):
+    sys.modules.setdefault(_name, types.ModuleType(_name))
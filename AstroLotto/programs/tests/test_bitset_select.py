@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+# greedy() against a plain rescan: at every step it must take the ticket with the largest
+# score - penalty * (largest overlap with a chosen ticket) among those within max_overlap.
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from programs.utilities import bitset_select
+
+
+def _rescan(tickets, scores, n, penalty, max_overlap):
+    sets = [set(t) for t in tickets]
+    chosen = []
+    while len(chosen) < n:
+        best, arg = -np.inf, None
+        for i, s in enumerate(sets):
+            if i in chosen:
+                continue
+            worst = max((len(s & sets[j]) for j in chosen), default=0)
+            if chosen and max_overlap is not None and worst > max_overlap:
+                continue
+            gain = scores[i] - penalty * worst
+            if gain > best:
+                best, arg = gain, i
+        if arg is None:
+            break
+        chosen.append(arg)
+    return chosen
+
+
+@pytest.mark.parametrize("penalty,max_overlap", [(0.0, 2), (0.5, None), (2.0, 3), (0.25, 1)])
+def test_greedy_matches_rescan(penalty, max_overlap):
+    rng = np.random.default_rng(int(penalty * 100) + 1)
+    tickets = [sorted(rng.choice(np.arange(1, 36), 5, replace=False).tolist()) for _ in range(400)]
+    scores = rng.normal(size=len(tickets))
+    got = bitset_select.greedy(bitset_select.masks(tickets), scores, 25, penalty=penalty, max_overlap=max_overlap)
+    assert got == _rescan(tickets, scores, 25, penalty, max_overlap)
+
+
+def test_overlap_counts_shared_numbers():
+    M = bitset_select.masks([[1, 2, 3], [3, 4, 5], [2, 3, 100], [6, 7, 8]])
+    assert bitset_select.overlap(M, 0).tolist() == [3, 1, 2, 0]
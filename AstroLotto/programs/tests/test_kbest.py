@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+# k-best exactness: the K best tickets must carry the same scores as the top K of a brute-force
+# ranking of every k-subset (with and without pair terms).
+
+import itertools
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from programs.utilities import kbest
+
+
+def _brute(scores, k, K, pair=None):
+    live = [i for i, s in enumerate(scores) if np.isfinite(s)]
+    tot = []
+    for c in itertools.combinations(live, k):
+        v = sum(scores[i] for i in c)
+        if pair is not None:
+            v += sum(pair[a, b] for a, b in itertools.combinations(c, 2))
+        tot.append(v)
+    return sorted(tot, reverse=True)[:K]
+
+
+@pytest.mark.parametrize("k,K", [(3, 1), (4, 25), (5, 60)])
+def test_independent_matches_brute_force(k, K):
+    rng = np.random.default_rng(k)
+    scores = np.log(rng.uniform(0.05, 1.0, size=14))
+    scores[[0, 9]] = -np.inf
+    got = kbest.top_k(scores, k, K)
+    assert all(len(set(t)) == k and list(t) == sorted(t) for t, _ in got)
+    assert np.allclose([s for _, s in got], _brute(scores, k, K))
+
+
+@pytest.mark.parametrize("k,K", [(3, 10), (4, 30)])
+def test_pairs_match_brute_force(k, K):
+    rng = np.random.default_rng(10 + k)
+    scores = np.log(rng.uniform(0.05, 1.0, size=12))
+    B = np.triu(rng.uniform(0, 0.8, size=(12, 12)) * (rng.random((12, 12)) < 0.4), 1)
+    B = B + B.T
+    got = kbest.top_k(scores, k, K, pair=B)
+    assert np.allclose([s for _, s in got], _brute(scores, k, K, B))
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+# Codec round-trips: every code in range decodes to a valid ticket that encodes back to it,
+# and the colex ranks of all k-subsets are exactly 0..C(n, k) - 1.
+
+import itertools
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from programs.utilities import ticket_codec
+
+
+def test_rank_is_a_bijection_on_small_subsets():
+    W = np.array(list(itertools.combinations(range(1, 13), 4)))
+    codes = ticket_codec.rank(W, lo=1)
+    assert sorted(codes.tolist()) == list(range(math.comb(12, 4)))
+    assert (ticket_codec.unrank(codes, 4, lo=1) == W).all()
+
+
+@pytest.mark.parametrize("game", ["powerball", "cash5", "colorado", "pick3"])
+def test_codes_round_trip(game):
+    c = ticket_codec.codec(game)
+    rng = np.random.default_rng(5)
+    codes = np.unique(np.concatenate([[0, c.size - 1], rng.integers(0, c.size, 20_000)]))
+    whites, special = c.decode(codes)
+    assert c.valid(whites).all()
+    assert (c.encode(whites, special) == codes).all()
+    if special is not None:
+        assert ((special >= c.special[0]) & (special <= c.special[1])).all()
+
+
+def test_tickets_round_trip_and_count():
+    c = ticket_codec.codec("powerball")
+    tickets = [{"white": [69, 1, 30, 12, 7], "special": 26}, {"white": [1, 2, 3, 4, 5], "special": 1}]
+    codes = c.from_tickets(tickets + tickets[:1])
+    back = c.to_tickets(codes[:2])
+    assert [sorted(t["white"]) for t in tickets] == [list(t["white"]) for t in back]
+    assert [t["special"] for t in back] == [26, 1]
+    uniq, n = ticket_codec.count(codes)
+    assert uniq[0] == codes[0] and n.tolist() == [2, 1]
+    assert ticket_codec.dedupe(codes).tolist() == [0, 1]
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+# Wheel guarantees checked by brute force: for every m-subset of the pool some ticket must hold
+# at least t of its numbers, independently of the bitmask code that built the design.
+
+import itertools
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from programs.utilities import wheels
+
+
+def _uncovered(tickets, pool, t, m):
+    sets = [set(tk) for tk in tickets]
+    return sum(1 for drawn in itertools.combinations(pool, m)
+               if not any(len(s.intersection(drawn)) >= t for s in sets))
+
+
+@pytest.mark.parametrize("pool,k,t,m", [
+    (7, 3, 2, 2),
+    (10, 5, 3, 3),
+    ([3, 8, 11, 19, 24, 30, 33, 41, 47, 52, 60, 66], 5, 3, 4),
+    (14, 6, 4, 5),
+])
+def test_wheel_guarantee_holds(pool, k, t, m):
+    w = wheels.wheel(pool, k, t, m, seconds=0.5, seed=1, use_cache=False)
+    nums = list(range(1, pool + 1)) if isinstance(pool, int) else sorted(pool)
+    assert w.guaranteed and w.uncovered == 0
+    assert all(len(set(tk)) == k and set(tk) <= set(nums) for tk in w.tickets)
+    assert _uncovered(w.tickets, nums, t, m) == 0
+    assert w.total == len(list(itertools.combinations(nums, m)))
+    if m == t:
+        assert len(w.tickets) >= wheels.schonheim(len(nums), k, t)
+
+
+def test_fano_plane_is_found():
+    # C(7, 3, 2) = 7, the Fano plane, which meets the Schönheim bound
+    w = wheels.wheel(7, 3, 2, seconds=1.0, seed=3, use_cache=False)
+    assert wheels.schonheim(7, 3, 2) == 7
+    assert len(w.tickets) == 7
+
+
+def test_check_counts_what_brute_force_counts():
+    pool = list(range(1, 11))
+    tickets = [(1, 2, 3, 4, 5), (6, 7, 8, 9, 10), (1, 3, 5, 7, 9)]
+    uncovered, total = wheels.check(tickets, pool, t=3, m=4)
+    assert total == 210
+    assert uncovered == _uncovered(tickets, pool, 3, 4) > 0
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+# Program/utilities/bitset_select.py
+# Diverse ticket selection over 128-bit ticket masks (two uint64 words, numbers 0..127).
+#
+#   masks(tickets)                      (P x 2) uint64; tickets = (P x k) matrix or ragged lists
+#   overlap(M, i)                       |ticket_i & ticket_j| for every j (popcount of the AND)
+#   popcount(x)                         set bits per uint64 element
+#   farthest_first(M, m)                max-min Jaccard distance greedy from ticket 0
+#                                       (diversity.select_diverse semantics, ties -> lowest index)
+#   greedy(M, scores, n, penalty, max_overlap)
+#                                       max (score - penalty * largest overlap with a chosen ticket),
+#                                       lazy heap updates; tickets sharing more than max_overlap
+#                                       numbers with a pick are dropped, and the optional special-ball
+#                                       uniqueness rule of app_main holds back repeated specials
+#                                       (penalty=0 is a plain best-first scan under the cap)
+#
+# Every accepted ticket costs one vectorized AND + popcount over the pool, so picking
+# 100 tickets out of 100k is ~100 passes over a (100k x 2) array.
+
+import heapq
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+WORDS = 2
+
+if hasattr(np, "bitwise_count"):
+    def popcount(x: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(x)
+else:  # numpy < 2.0
+    _BYTE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(x: np.ndarray) -> np.ndarray:
+        b = np.ascontiguousarray(x).view(np.uint8).reshape(x.shape + (8,))
+        return _BYTE[b].sum(axis=-1)
+
+
+def masks(tickets) -> np.ndarray:
+    """(P x 2) uint64 bitmasks; numbers outside 0..127 are ignored, repeats collapse."""
+    try:
+        T = np.asarray(tickets, dtype=np.int64)
+        ragged = T.ndim != 2
+    except (ValueError, TypeError):
+        ragged = True
+    if ragged:
+        rows = [list(t) for t in tickets]
+        lens = np.array([len(r) for r in rows], dtype=np.int64)
+        flat = np.array([int(x) for r in rows for x in r], dtype=np.int64)
+        owner = np.repeat(np.arange(len(rows)), lens)
+        P = len(rows)
+    else:
+        P = T.shape[0]
+        flat = T.ravel()
+        owner = np.repeat(np.arange(P), T.shape[1])
+    M = np.zeros((P, WORDS), dtype=np.uint64)
+    ok = (flat >= 0) & (flat < 64 * WORDS)
+    flat, owner = flat[ok], owner[ok]
+    bits = np.left_shift(np.uint64(1), (flat % 64).astype(np.uint64))
+    np.bitwise_or.at(M, (owner, flat // 64), bits)
+    return M
+
+
+def sizes(M: np.ndarray) -> np.ndarray:
+    return popcount(M).sum(axis=1).astype(np.int64)
+
+
+def overlap(M: np.ndarray, i: int) -> np.ndarray:
+    return popcount(M & M[i]).sum(axis=1).astype(np.int64)
+
+
+def farthest_first(M: np.ndarray, m: int, first: int = 0) -> List[int]:
+    """Start from `first`, then repeatedly add the ticket whose nearest chosen ticket is farthest
+    away in Jaccard distance (1 - |a & b| / |a | b|)."""
+    P = len(M)
+    if P == 0 or m <= 0:
+        return []
+    sz = sizes(M)
+    dmin = np.full(P, np.inf)
+    chosen = [int(first)]
+    taken = np.zeros(P, dtype=bool)
+    taken[first] = True
+    while len(chosen) < min(m, P):
+        inter = overlap(M, chosen[-1])
+        uni = sz + sz[chosen[-1]] - inter
+        d = np.where(uni > 0, 1.0 - inter / np.maximum(uni, 1), 0.0)
+        np.minimum(dmin, d, out=dmin)
+        cand = np.where(taken, -np.inf, dmin)
+        j = int(np.argmax(cand))
+        chosen.append(j)
+        taken[j] = True
+    return chosen
+
+
+def greedy(M: np.ndarray, scores: Sequence[float], n: int, penalty: float = 1.0,
+           max_overlap: Optional[int] = None, *, specials: Optional[Sequence] = None,
+           min_unique_sp: int = 0) -> List[int]:
+    """Max (score - penalty * largest overlap with a chosen ticket), lazily re-evaluated.
+
+    Gains only drop as tickets are chosen, so a popped entry whose refreshed gain still beats
+    the next heap top is the true argmax (no full rescan per pick). With specials, tickets
+    repeating a used special are skipped while fewer than `min_unique_sp` distinct specials are
+    in; once the pool runs dry they compete again to fill up (app_main's second pass).
+    """
+    s = np.asarray(scores, dtype=float)
+    P = len(M)
+    worst = np.zeros(P, dtype=np.int64)      # largest overlap with any chosen ticket
+    heap = [(-s[i], i) for i in range(P)]
+    heapq.heapify(heap)
+    chosen: List[int] = []
+    used: set = set()
+    held: List[int] = []
+
+    while len(chosen) < n:
+        if not heap:
+            if not held:
+                break
+            min_unique_sp = 0                # second pass: fill up without the rule
+            for j in held:
+                heapq.heappush(heap, (-(s[j] - penalty * worst[j]), j))
+            held.clear()
+        neg, i = heapq.heappop(heap)
+        if max_overlap is not None and chosen and worst[i] > max_overlap:
+            continue                         # overlaps only grow, so it stays out
+        sp = specials[i] if specials is not None else None
+        if sp is not None and len(used) < min_unique_sp and sp in used:
+            held.append(i)
+            continue
+        gain = s[i] - penalty * worst[i]
+        if heap and gain < -heap[0][0] - 1e-12:
+            heapq.heappush(heap, (-gain, i))
+            continue
+        chosen.append(i)
+        np.maximum(worst, overlap(M, i), out=worst)
+        if sp is not None:
+            used.add(sp)
+    return chosen
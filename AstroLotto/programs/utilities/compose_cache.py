@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+# Program/utilities/compose_cache.py
+# Compose the white / special surfaces once per input, and take all finite-difference probes
+# of a time-dependent surface in one pass.
+#
+#   key(*parts)                     stable hex digest of nested inputs (arrays, dicts, dates, ...)
+#   cached(key, build, ttl)         build() once per key; entries expire after ttl seconds
+#   Surfaces(white, special, tarot) what meta_compose returns, kept together
+#   probe(surface_at, t, eps, bucket=None, center=False)
+#                                   surfaces at t +/- each eps (and t itself with center=True):
+#                                   every distinct bucket(epoch) (e.g. its UTC date) is evaluated
+#                                   once, then the values are stacked and differenced in one op
+#   clear()
+#
+# probe() returns {"t", "eps", "at", "white", "special", "d_white", "d_special"}: "at" maps each
+# bucket to its (white, special) pair, so later reads of the same epochs need no recomposition;
+# white / special are the surfaces at t (None unless center=True); d_* are the (len(eps) x n)
+# central differences (f(t + e) - f(t - e)) / 2e per surface (None when the surface is missing).
+# Plain arrays work too and come back as the white surface.
+
+import hashlib, threading, time
+import datetime as dt
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+TTL = 600.0
+MAX_ENTRIES = 64
+
+_LOCK = threading.Lock()
+_CACHE: Dict[str, Tuple[float, Any]] = {}
+
+
+@dataclass(frozen=True)
+class Surfaces:
+    white: np.ndarray
+    special: Optional[np.ndarray] = None
+    tarot: str = ""
+
+
+def _feed(h, x: Any) -> None:
+    if x is None or isinstance(x, (bool, int, float, str)):
+        h.update(f"{type(x).__name__}:{x!r};".encode("utf-8"))
+    elif isinstance(x, np.ndarray):
+        h.update(f"nd:{x.dtype}:{x.shape};".encode("utf-8"))
+        h.update(np.ascontiguousarray(x).tobytes())
+    elif isinstance(x, np.generic):
+        _feed(h, x.item())
+    elif isinstance(x, dict):
+        h.update(b"{")
+        for k in sorted(x, key=repr):
+            _feed(h, k)
+            _feed(h, x[k])
+        h.update(b"}")
+    elif isinstance(x, (list, tuple)):
+        h.update(b"[")
+        for v in x:
+            _feed(h, v)
+        h.update(b"]")
+    elif isinstance(x, (dt.date, dt.datetime)):
+        h.update(f"date:{x.isoformat()};".encode("utf-8"))
+    else:
+        h.update(f"{type(x).__name__}:{x!r};".encode("utf-8"))
+
+
+def key(*parts: Any) -> str:
+    h = hashlib.sha1()
+    for p in parts:
+        _feed(h, p)
+    return h.hexdigest()
+
+
+def cached(k: str, build: Callable[[], Any], ttl: Optional[float] = TTL) -> Any:
+    now = time.monotonic()
+    with _LOCK:
+        hit = _CACHE.get(k)
+    if hit is not None and (ttl is None or now - hit[0] <= ttl):
+        return hit[1]
+    out = build()
+    with _LOCK:
+        if len(_CACHE) >= MAX_ENTRIES:
+            _CACHE.clear()
+        _CACHE[k] = (now, out)
+    return out
+
+
+def clear() -> None:
+    with _LOCK:
+        _CACHE.clear()
+
+
+def _pair(v: Union[Surfaces, np.ndarray, Sequence[float], None]) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    if isinstance(v, Surfaces):
+        return np.asarray(v.white, dtype=float), (None if v.special is None else np.asarray(v.special, dtype=float))
+    return (None if v is None else np.asarray(v, dtype=float)), None
+
+
+def _diff(vals: list, eps: np.ndarray) -> Optional[np.ndarray]:
+    if any(v is None for v in vals) or len({v.shape for v in vals}) != 1:
+        return None
+    A = np.stack(vals)                                  # [f(t + e_1..n), f(t - e_1..n)]
+    n = len(eps)
+    return (A[:n] - A[n:]) / (2.0 * eps[:, None])
+
+
+def probe(surface_at: Callable[[float], Any], t: float, eps: Union[float, Sequence[float]],
+          bucket: Optional[Callable[[float], Hashable]] = None, center: bool = False) -> Dict[str, Any]:
+    """Central differences of surface_at around epoch t for every step in eps (seconds)."""
+    e = np.atleast_1d(np.asarray(eps, dtype=float))
+    if (e <= 0).any():
+        raise ValueError("probe: eps must be positive")
+    steps = [float(t) + x for x in e] + [float(t) - x for x in e]
+    bucket = bucket or (lambda x: x)
+    at: Dict[Hashable, Tuple[Optional[np.ndarray], Optional[np.ndarray]]] = {}
+    for x in ([float(t)] if center else []) + steps:
+        b = bucket(x)
+        if b not in at:
+            at[b] = _pair(surface_at(x))
+    mid = at[bucket(float(t))] if center else (None, None)
+    return {"t": float(t), "eps": e, "at": at, "white": mid[0], "special": mid[1],
+            "d_white": _diff([at[bucket(x)][0] for x in steps], e),
+            "d_special": _diff([at[bucket(x)][1] for x in steps], e)}
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+# Program/utilities/cooc_engine.py
+# White-ball co-occurrence from the one-hot draw matrix X (n_draws x numbers).
+#
+#   matrix(d, halflife=None)    Cooc for a draw_store.Draws, cached per game / version / half-life
+#   from_matrix(W, weights)     same for a plain (n_draws x k) int matrix (no cache)
+#   triplets(d_or_W, top_k)     [((a, b, c), count)] most frequent triplets, blocked per first number
+#
+# Cooc.pairs = X^T diag(w) X, indexed by number on both axes (so pairs[a, a] = draws with a).
+# With a half-life the weights are 2^(-age / halflife) (freq_engine.ages), otherwise 1.
+#   pmi(), npmi(), lift()       array forms (NaN where the pair never occurred)
+#   top(k, by="count"|"pmi"|"npmi"|"lift")   [((a, b), value)] over a < b, ties by (a, b)
+#
+# Triplets: for each number a, the draws containing a give X_a^T X_a, whose (b, c) cells
+# with a < b < c are the triplet counts. Memory stays at one (numbers x numbers) block.
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from . import draw_store, freq_engine
+except Exception:
+    from utilities import draw_store, freq_engine  # type: ignore
+
+_LOCK = threading.Lock()
+_CACHE: Dict[Tuple, object] = {}
+
+
+@dataclass(frozen=True)
+class Cooc:
+    pairs: np.ndarray        # (size x size) weighted pair counts, diagonal = single counts
+    total: float             # sum of draw weights (= n_draws unweighted)
+
+    @property
+    def singles(self) -> np.ndarray:
+        return np.diag(self.pairs)
+
+    def _probs(self):
+        N = self.total if self.total > 0 else 1.0
+        p = self.singles / N
+        return self.pairs / N, p[:, None], p[None, :]
+
+    def pmi(self) -> np.ndarray:
+        pab, pa, pb = self._probs()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out = np.log(pab) - np.log(pa) - np.log(pb)
+        return np.where(pab > 0, out, np.nan)
+
+    def npmi(self) -> np.ndarray:
+        pab = self._probs()[0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out = self.pmi() / -np.log(pab)
+        return np.where((pab > 0) & (pab < 1), out, np.nan)
+
+    def lift(self) -> np.ndarray:
+        pab, pa, pb = self._probs()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out = pab / (pa * pb)
+        return np.where(pab > 0, out, np.nan)
+
+    def top(self, k: Optional[int] = None, by: str = "count") -> List[Tuple[Tuple[int, int], float]]:
+        M = self.pairs if by == "count" else getattr(self, by)()
+        a, b = np.triu_indices(self.pairs.shape[0], k=1)
+        ok = self.pairs[a, b] > 0
+        a, b = a[ok], b[ok]
+        v = M[a, b]
+        ok = np.isfinite(v)
+        a, b, v = a[ok], b[ok], v[ok]
+        order = np.lexsort((b, a, -v))
+        if k is not None:
+            order = order[:max(0, int(k))]
+        return [((int(a[i]), int(b[i])), float(v[i])) for i in order]
+
+
+def _onehot(W: np.ndarray, size: Optional[int] = None) -> np.ndarray:
+    W = np.asarray(W, dtype=np.intp)
+    n = W.shape[0] if W.ndim == 2 else 0
+    if size is None:
+        size = int(W.max()) + 1 if W.size else 1
+    X = np.zeros((n, size), dtype=np.float32)
+    if n:
+        rows = np.repeat(np.arange(n), W.shape[1])
+        flat = W.ravel()
+        ok = (flat >= 0) & (flat < size)
+        X[rows[ok], flat[ok]] = 1.0
+    return X
+
+
+def from_matrix(W: np.ndarray, weights: Optional[np.ndarray] = None, size: Optional[int] = None) -> Cooc:
+    """Pair counts for a (n_draws x k) int matrix; repeats within a draw count once."""
+    X = _onehot(W, size)
+    if weights is None:
+        return Cooc(pairs=(X.T @ X).astype(float), total=float(X.shape[0]))
+    w = np.asarray(weights, dtype=np.float64)
+    Xd = X.astype(np.float64)
+    return Cooc(pairs=(Xd * w[:, None]).T @ Xd, total=float(w.sum()))
+
+
+def _cached(key: Tuple, build):
+    with _LOCK:
+        hit = _CACHE.get(key)
+    if hit is not None:
+        return hit
+    out = build()
+    with _LOCK:
+        if len(_CACHE) > 32:
+            _CACHE.clear()
+        _CACHE[key] = out
+    return out
+
+
+def matrix(d: "draw_store.Draws", halflife: Optional[float] = None, *, unit: str = "days") -> Cooc:
+    """Cached Cooc for the whites of `d`, optionally time-decayed."""
+    hl = None if halflife is None else float(halflife)
+
+    def build() -> Cooc:
+        w = None if hl is None else np.exp(-np.log(2.0) / max(1e-9, hl) * freq_engine.ages(d, unit))
+        return from_matrix(d.whites, w, size=d.white_max + 1)
+
+    return _cached(("pairs", d.game, d.n, draw_store.version(d), hl, unit), build)
+
+
+def _triplets(W: np.ndarray) -> List[Tuple[Tuple[int, int, int], int]]:
+    X = _onehot(W)
+    A, B, C, V = [], [], [], []
+    for a in np.flatnonzero(X.sum(axis=0) >= 1):
+        Xa = X[X[:, a] > 0]
+        Ca = Xa.T @ Xa
+        Ca[:a + 1, :] = 0                       # keep a < b < c
+        b, c = np.nonzero(np.triu(Ca, k=1))
+        if b.size:
+            A.append(np.full(b.size, a)); B.append(b); C.append(c); V.append(Ca[b, c])
+    if not A:
+        return []
+    a, b, c, v = (np.concatenate(x) for x in (A, B, C, V))
+    order = np.lexsort((c, b, a, -v))
+    return [((int(a[i]), int(b[i]), int(c[i])), int(v[i])) for i in order]
+
+
+def triplets(d, top_k: Optional[int] = None) -> List[Tuple[Tuple[int, int, int], int]]:
+    """Triplet counts (a < b < c), most frequent first; `d` is a Draws or an int matrix."""
+    if isinstance(d, draw_store.Draws):
+        out = _cached(("triplets", d.game, d.n, draw_store.version(d)), lambda: _triplets(d.whites))
+    else:
+        out = _triplets(np.asarray(d, dtype=int))
+    return out if top_k is None else out[:max(0, int(top_k))]
+
+
+def clear(game: Optional[str] = None) -> None:
+    with _LOCK:
+        if game is None:
+            _CACHE.clear()
+            return
+        g = draw_store.normalize_game(game)
+        for k in [k for k in _CACHE if k[1] == g]:
+            _CACHE.pop(k, None)
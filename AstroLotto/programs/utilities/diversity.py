@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from pathlib import Path
+import os
+PROJECT_DIR = Path(__file__).resolve().parent
+(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
+(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
+
+# Program/utilities/diversity.py
+from typing import List
+
+try:
+    from . import bitset_select
+except Exception:
+    from utilities import bitset_select  # type: ignore
+
+def _set_distance(a: List[int], b: List[int]) -> float:
+    sa, sb = set(a), set(b)
+    inter = len(sa & sb)
+    uni = len(sa | sb)
+    if uni == 0: return 0.0
+    return 1.0 - (inter / uni)
+
+def select_diverse(candidates: List[List[int]], m: int, target: float = 0.5) -> List[List[int]]:
+    if not candidates: return []
+    m = min(m, len(candidates))
+    try:
+        # Same picks as the loop below, with overlaps from 128-bit masks (numbers 0..127).
+        if all(0 <= int(x) < 128 for c in candidates for x in c):
+            M = bitset_select.masks(candidates)
+            return [candidates[i] for i in bitset_select.farthest_first(M, m)]
+    except (TypeError, ValueError):
+        pass
+    chosen = [candidates[0]]
+    remaining = candidates[1:]
+    while len(chosen) < m and remaining:
+        best = None; best_d = -1.0
+        for cand in remaining:
+            d = min(_set_distance(cand, s) for s in chosen)
+            if d > best_d: best_d, best = d, cand
+        chosen.append(best); remaining.remove(best)
+        if best_d >= target and len(chosen) >= m: break
+    return chosen
\ No newline at end of file
@@ -0,0 +1,402 @@
+from __future__ import annotations
+
+from pathlib import Path
+import os
+
+# Program/utilities/draw_store.py
+# One canonical integer draw matrix per game, so analytics stop re-reading CSVs.
+#
+#   load(game)            Draws for Data/cached_<game>_data.csv (memory-mapped .npy cache)
+#   from_frame(df, game)  Draws parsed from an in-memory frame (uploads, filtered windows);
+#                         every valid row is kept, dedupe=True drops repeated draws
+#                         (same date, whites and special)
+#   as_draws(obj, game)   Draws | DataFrame -> Draws (what the analytics helpers call)
+#   version(d)            content hash, the cache key used by freq/gap/cooc engines
+#
+# Draws.whites   (n_draws x k) int8, sorted per row (pick3 keeps draw order)
+# Draws.special  (n_draws,) int8, -1 where the game has none / the cell was empty
+# Draws.dates    (n_draws,) datetime64[D], oldest first, NaT kept at the end
+# Draws.rows     source-frame row per draw (from_frame only; aligns extra columns)
+#
+# Cache files sit next to the CSV: <stem>.whites.npy / .special.npy / .dates.npy and
+# <stem>.draws.json with the CSV's size, mtime and sha1. A changed size/mtime triggers a
+# hash check; the matrix is rebuilt only when the content actually changed.
+
+import hashlib, json, re, threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .config import DATA_DIR as _DATA_DIR
+except Exception:
+    try:
+        from utilities.config import DATA_DIR as _DATA_DIR  # type: ignore
+    except Exception:
+        _DATA_DIR = Path(os.environ.get("ASTRO_DATA_DIR", Path(__file__).resolve().parents[2] / "Data"))
+
+FORMAT_VERSION = 2
+
+
+@dataclass(frozen=True)
+class GameSpec:
+    csv: str
+    k: int
+    white_min: int
+    white_max: int
+    special: Optional[Tuple[int, int]] = None
+    special_cols: Tuple[str, ...] = ()
+    ordered: bool = False           # pick3: digits keep their order, repeats allowed
+
+
+GAMES: Dict[str, GameSpec] = {
+    "powerball": GameSpec("cached_powerball_data.csv", 5, 1, 69, (1, 26), ("powerball", "power_ball", "pb")),
+    "megamillions": GameSpec("cached_megamillions_data.csv", 5, 1, 70, (1, 25), ("mega_ball", "megaball", "mega", "mb")),
+    "cash5": GameSpec("cached_cash5_data.csv", 5, 1, 32),
+    "luckyforlife": GameSpec("cached_luckyforlife_data.csv", 5, 1, 48, (1, 18), ("lucky_ball", "luckyball", "lb", "s1")),
+    "colorado": GameSpec("cached_colorado_lottery_data.csv", 6, 1, 40),
+    "pick3": GameSpec("cached_pick3_data.csv", 3, 0, 9, ordered=True),
+    "pick3_midday": GameSpec("cached_pick3_midday_data.csv", 3, 0, 9, ordered=True),
+    "pick3_evening": GameSpec("cached_pick3_evening_data.csv", 3, 0, 9, ordered=True),
+}
+_ALIASES = {
+    "mega_millions": "megamillions", "mega": "megamillions", "mm": "megamillions",
+    "lucky_for_life": "luckyforlife", "lfl": "luckyforlife",
+    "colorado_lottery": "colorado", "coloradolotto": "colorado", "colorado_lotto": "colorado",
+    "pb": "powerball", "cash_5": "cash5",
+}
+_WHITE_PATTERNS = ("white{i}", "white_{i}", "n{i}", "w{i}", "wb{i}", "ball{i}", "ball_{i}", "num{i}", "d{i}")
+_STRING_COLS = ("winning_numbers", "winning_number", "numbers", "winning_nums", "winning", "digits")
+_DATE_COLS = ("draw_date", "date", "drawdate", "draw_time", "draw")
+
+
+def normalize_game(game: str) -> str:
+    g = re.sub(r"[\s\-]+", "_", str(game or "").strip().lower())
+    if g in GAMES:
+        return g
+    if g in _ALIASES:
+        return _ALIASES[g]
+    g2 = g.replace("_", "")
+    if g2 in GAMES:
+        return g2
+    if g2.startswith("power"): return "powerball"
+    if g2.startswith("mega"): return "megamillions"
+    if g2.startswith("lucky"): return "luckyforlife"
+    if g2.startswith("colorado"): return "colorado"
+    if g2.startswith("pick3"): return "pick3_" + g2[5:] if "pick3_" + g2[5:] in GAMES else "pick3"
+    return g
+
+
+@dataclass(frozen=True)
+class Draws:
+    game: str
+    whites: np.ndarray
+    special: np.ndarray
+    dates: np.ndarray
+    white_min: int
+    white_max: int
+    special_range: Optional[Tuple[int, int]] = None
+    rows: Optional[np.ndarray] = None     # source-frame row of each draw (from_frame only)
+
+    @property
+    def n(self) -> int:
+        return int(self.whites.shape[0])
+
+    @property
+    def k(self) -> int:
+        return int(self.whites.shape[1]) if self.whites.ndim == 2 else 0
+
+    @property
+    def has_special(self) -> bool:
+        return self.special_range is not None and bool((self.special >= 0).any())
+
+    def take(self, rows) -> "Draws":
+        return Draws(self.game, np.asarray(self.whites[rows]), np.asarray(self.special[rows]), np.asarray(self.dates[rows]),
+                     self.white_min, self.white_max, self.special_range,
+                     None if self.rows is None else np.asarray(self.rows[rows]))
+
+    def tail(self, n: Optional[int] = None, days: Optional[int] = None) -> "Draws":
+        """Most recent `n` draws and/or draws within `days` of today."""
+        out = self
+        if days:
+            cutoff = np.datetime64(pd.Timestamp.now().normalize() - pd.Timedelta(days=int(days)), "D")
+            out = out.take(np.flatnonzero(out.dates >= cutoff))
+        if n is not None and n >= 0:
+            out = out.take(slice(max(0, out.n - int(n)), None))
+        return out
+
+    def frame(self, white_fmt: str = "white{i}", special_col: str = "special") -> pd.DataFrame:
+        df = pd.DataFrame({"draw_date": pd.to_datetime(self.dates)})
+        for i in range(self.k):
+            df[white_fmt.format(i=i + 1)] = self.whites[:, i].astype(int)
+        if self.special_range is not None:
+            df[special_col] = pd.Series(self.special.astype(float), dtype=float).where(self.special >= 0).astype("Int64")
+        return df
+
+
+# ---------- parsing ----------
+
+def _norm_cols(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.copy(deep=False)
+    out.columns = [re.sub(r"\s+", "_", str(c).strip().lower()) for c in df.columns]
+    return out.loc[:, ~out.columns.duplicated()]
+
+
+def _num(s: pd.Series) -> np.ndarray:
+    return pd.to_numeric(s, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+
+def _coalesce(df: pd.DataFrame, names) -> Optional[np.ndarray]:
+    """First non-missing value across `names` (some feeds fill different columns per era)."""
+    out = None
+    for nm in names:
+        if nm in df.columns:
+            v = _num(df[nm])
+            out = v if out is None else np.where(np.isnan(out), v, out)
+    return out
+
+
+def _from_strings(df: pd.DataFrame, k: int, ordered: bool) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    for nm in _STRING_COLS:
+        if nm not in df.columns:
+            continue
+        txt = df[nm].astype("string").fillna("")
+        if ordered or nm == "digits":
+            digits = txt.str.replace(r"\D", "", regex=True)
+            digits = digits.where(digits.str.len() > 0, "").str.zfill(k).where(digits.str.len() > 0, "")
+            W = np.full((len(df), k), np.nan)
+            for i in range(k):
+                W[:, i] = pd.to_numeric(digits.str.slice(i, i + 1), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+            return W, None
+        parts = txt.str.findall(r"\d+")
+        W = np.full((len(df), k + 1), np.nan)
+        for i in range(k + 1):
+            W[:, i] = pd.to_numeric(parts.str.get(i), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        return W[:, :k], W[:, k]
+    return None, None
+
+
+def _dates(df: pd.DataFrame) -> np.ndarray:
+    for nm in _DATE_COLS:
+        if nm in df.columns:
+            d = pd.to_datetime(df[nm], errors="coerce", format="mixed")
+            if getattr(d.dt, "tz", None) is not None:
+                d = d.dt.tz_localize(None)
+            return d.to_numpy(dtype="datetime64[D]")
+    return np.full(len(df), np.datetime64("NaT"), dtype="datetime64[D]")
+
+
+def _spec_for(game: Optional[str], df: pd.DataFrame) -> Tuple[str, GameSpec]:
+    g = normalize_game(game) if game else ""
+    if g in GAMES:
+        return g, GAMES[g]
+    # unknown game: infer k from the columns present, ranges from the data
+    k = 0
+    while any(p.format(i=k + 1) in df.columns for p in _WHITE_PATTERNS):
+        k += 1
+    return g or "unknown", GameSpec("", k or 5, 0, 99, (0, 99))
+
+
+def from_frame(df: pd.DataFrame, game: Optional[str] = None, *, dedupe: bool = False) -> Draws:
+    """Parse white/special numbers and dates out of any history frame, vectorised.
+
+    Rows are kept as the CSV has them, duplicates included, so counts match the per-module
+    loaders this replaces; dedupe=True keeps only the first of identical draws.
+    """
+    g, spec = _spec_for(game, _norm_cols(df) if df is not None else pd.DataFrame())
+    k = spec.k
+    if df is None or df.empty:
+        return _empty(g, spec)
+    work = _norm_cols(df)
+    cols = [_coalesce(work, [p.format(i=i) for p in _WHITE_PATTERNS]) for i in range(1, k + 1)]
+    special = None
+    if all(c is not None for c in cols):
+        W = np.column_stack(cols)
+    else:
+        W, special = _from_strings(work, k, spec.ordered)
+        if W is None:
+            return _empty(g, spec)
+    if spec.special is not None:
+        sp = _coalesce(work, list(spec.special_cols) + ["special", "bonus"])
+        special = sp if special is None else (special if sp is None else np.where(np.isnan(sp), special, sp))
+    if special is None:
+        special = np.full(len(work), np.nan)
+
+    ok = np.isfinite(W).all(axis=1)
+    ok &= ((W >= spec.white_min) & (W <= spec.white_max) & (np.mod(np.nan_to_num(W), 1) == 0)).all(axis=1)
+    W = np.nan_to_num(W[ok]).astype(np.int16)
+    if not spec.ordered:
+        W.sort(axis=1)
+    sp = special[ok]
+    if spec.special is not None:
+        lo, hi = spec.special
+        sp = np.where(np.isfinite(sp) & (sp >= lo) & (sp <= hi), sp, -1)
+    else:
+        sp = np.full(len(sp), -1)
+    dates = _dates(work)[ok]
+    src = np.flatnonzero(ok)
+
+    order = np.argsort(np.where(np.isnat(dates), np.datetime64("9999-12-31"), dates), kind="stable")
+    W, sp, dates, src = W[order], sp[order].astype(np.int16), dates[order], src[order]
+    if dedupe:
+        keep = ~pd.DataFrame(W).assign(_s=sp, _d=dates.astype("int64")).duplicated().to_numpy()
+    else:
+        keep = np.ones(len(W), dtype=bool)
+    dt_ = np.int8 if spec.white_max <= 127 and (spec.special is None or spec.special[1] <= 127) else np.int16
+    return Draws(g, np.ascontiguousarray(W[keep], dtype=dt_), np.ascontiguousarray(sp[keep], dtype=dt_),
+                 dates[keep], spec.white_min, spec.white_max, spec.special, src[keep])
+
+
+def _empty(g: str, spec: GameSpec) -> Draws:
+    return Draws(g, np.zeros((0, spec.k), dtype=np.int8), np.zeros(0, dtype=np.int8),
+                 np.zeros(0, dtype="datetime64[D]"), spec.white_min, spec.white_max, spec.special)
+
+
+def as_draws(obj, game: Optional[str] = None) -> Draws:
+    if isinstance(obj, Draws):
+        return obj
+    return from_frame(obj if isinstance(obj, pd.DataFrame) else pd.DataFrame(), game)
+
+
+# ---------- disk cache ----------
+
+_LOCK = threading.Lock()
+_MEM: Dict[str, Tuple[Tuple[int, int], Draws]] = {}
+
+
+def data_dir() -> Path:
+    return Path(os.environ.get("ASTRO_DATA_DIR", str(_DATA_DIR)))
+
+
+def csv_path(game: str, root: Optional[Path | str] = None) -> Path:
+    g = normalize_game(game)
+    spec = GAMES.get(g)
+    if spec is None:
+        raise KeyError(f"Unknown game {game!r}")
+    base = Path(root) if root else data_dir()
+    # callers pass either the Data dir or the project root
+    if not (base / spec.csv).exists() and (base / "Data" / spec.csv).exists():
+        base = base / "Data"
+    return base / spec.csv
+
+
+def _files(csv: Path) -> Dict[str, Path]:
+    stem = csv.with_suffix("")
+    return {"whites": Path(f"{stem}.whites.npy"), "special": Path(f"{stem}.special.npy"),
+            "dates": Path(f"{stem}.dates.npy"), "meta": Path(f"{stem}.draws.json")}
+
+
+def _sha1(p: Path) -> str:
+    h = hashlib.sha1()
+    with open(p, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _read_csv(p: Path) -> pd.DataFrame:
+    for enc in ("utf-8-sig", "utf-8", "cp1252", "latin1"):
+        try:
+            return pd.read_csv(p, encoding=enc)
+        except Exception:
+            continue
+    return pd.DataFrame()
+
+
+def _load_files(game: str, fs: Dict[str, Path], mmap: bool) -> Draws:
+    spec = GAMES[game]
+    mode = "r" if mmap else None
+    return Draws(game, np.load(fs["whites"], mmap_mode=mode), np.load(fs["special"], mmap_mode=mode),
+                 np.load(fs["dates"], mmap_mode=mode), spec.white_min, spec.white_max, spec.special)
+
+
+def _write_files(d: Draws, fs: Dict[str, Path], meta: Dict) -> None:
+    for key in ("whites", "special", "dates"):
+        tmp = fs[key].with_name(fs[key].name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, np.asarray(getattr(d, key)))
+        os.replace(tmp, fs[key])
+    fs["meta"].write_text(json.dumps(meta), encoding="utf-8")
+
+
+def load(game: str, root: Optional[Path | str] = None, *, mmap: bool = True) -> Draws:
+    """Canonical Draws for a game's cached CSV; empty Draws when the CSV is missing."""
+    g = normalize_game(game)
+    spec = GAMES.get(g)
+    if spec is None:
+        raise KeyError(f"Unknown game {game!r}")
+    csv = csv_path(g, root)
+    try:
+        st_ = csv.stat()
+    except OSError:
+        return _empty(g, spec)
+    sig = (int(st_.st_size), int(st_.st_mtime_ns))
+    key = str(csv.resolve())
+    with _LOCK:
+        hit = _MEM.get(key)
+        if hit is not None and hit[0] == sig:
+            return hit[1]
+    fs = _files(csv)
+    meta = {}
+    try:
+        meta = json.loads(fs["meta"].read_text(encoding="utf-8"))
+    except Exception:
+        meta = {}
+    d = None
+    have = meta.get("version") == FORMAT_VERSION and all(fs[k].exists() for k in ("whites", "special", "dates"))
+    if have and (meta.get("size"), meta.get("mtime_ns")) == sig:
+        d = _safe_load(g, fs, mmap)
+    if d is None:
+        digest = _sha1(csv)
+        if have and meta.get("sha1") == digest:
+            d = _safe_load(g, fs, mmap)       # touched but unchanged: just refresh the stamp
+        rebuilt = d is None
+        if rebuilt:
+            d = from_frame(_read_csv(csv), g)
+            meta = {"version": FORMAT_VERSION, "game": g, "n": d.n}
+        meta.update({"size": sig[0], "mtime_ns": sig[1], "sha1": digest})
+        try:
+            if rebuilt:
+                _write_files(d, fs, meta)
+                d = _safe_load(g, fs, mmap) or d
+            else:
+                fs["meta"].write_text(json.dumps(meta), encoding="utf-8")
+        except Exception:
+            pass
+    with _LOCK:
+        _MEM[key] = (sig, d)
+    return d
+
+
+def _safe_load(game: str, fs: Dict[str, Path], mmap: bool) -> Optional[Draws]:
+    try:
+        return _load_files(game, fs, mmap)
+    except Exception:
+        return None
+
+
+def clear(game: Optional[str] = None, root: Optional[Path | str] = None, *, files: bool = False) -> None:
+    """Drop the in-process cache (and with files=True the .npy/.json next to the CSV)."""
+    with _LOCK:
+        _MEM.clear()
+    if files:
+        for g in ([normalize_game(game)] if game else list(GAMES)):
+            for p in _files(csv_path(g, root)).values():
+                try:
+                    p.unlink()
+                except Exception:
+                    pass
+
+
+def white_names(d: Draws) -> List[str]:
+    return [f"white{i + 1}" for i in range(d.k)]
+
+
+def version(d: Draws) -> str:
+    """Content hash of a draw matrix; analytics caches key on (game, version)."""
+    h = hashlib.sha1()
+    for a in (d.whites, d.special, d.dates):
+        h.update(np.ascontiguousarray(a).view(np.uint8).tobytes())
+    return h.hexdigest()[:16]
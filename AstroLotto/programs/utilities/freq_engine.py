@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+# Program/utilities/freq_engine.py
+# Number frequencies straight off the draw matrix (utilities/draw_store).
+#
+#   counts(d)                       plain white counts, index = number (0..white_max)
+#   decayed(d, halflives)           (len(halflives) x numbers) exponentially decayed counts,
+#                                   all half-lives in one weighted np.bincount
+#   prefix(d)                       (n_draws + 1 x numbers) cumulative counts, cached per matrix
+#   window(d, start, end)           counts over draws [start, end) in O(numbers) via prefix()
+#   rolling(d, size)                counts for every window of `size` draws, (n - size + 1 x numbers)
+#   since(d, days, now=None)        counts over the draws dated on/after (now or today) - days
+#   to_probs(counts, lo, hi, a)     add-a smoothing over [lo, hi] -> probabilities
+#
+# kind="special" gives the same for the special ball. Ages are in days from the newest
+# draw (unit="days"), or in draws (unit="draws", also used when the history has no dates).
+
+import math, threading, weakref
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from . import draw_store
+except Exception:
+    from utilities import draw_store  # type: ignore
+
+_LOCK = threading.Lock()
+_PREFIX: Dict[Tuple[int, int, str], Tuple[weakref.ref, np.ndarray]] = {}
+
+
+def _values(d: "draw_store.Draws", kind: str) -> Tuple[np.ndarray, int]:
+    """(flat numbers, matrix width) for whites or specials; invalid specials dropped later."""
+    if kind == "special":
+        sp = np.asarray(d.special, dtype=np.intp).reshape(-1, 1)
+        return sp, 1
+    W = np.asarray(d.whites, dtype=np.intp)
+    return W, W.shape[1] if W.ndim == 2 else 0
+
+
+def _size(d: "draw_store.Draws", kind: str) -> int:
+    if kind == "special":
+        return (d.special_range[1] + 1) if d.special_range else 1
+    return d.white_max + 1
+
+
+def ages(d: "draw_store.Draws", unit: str = "days") -> np.ndarray:
+    """Age of each draw relative to the newest one (days, or draws when undated)."""
+    n = d.n
+    if n == 0:
+        return np.zeros(0)
+    dates = np.asarray(d.dates)
+    ok = ~np.isnat(dates)
+    if unit == "draws" or not ok.any():
+        return np.arange(n, dtype=float)[::-1]
+    a = (dates[ok].max() - dates).astype("timedelta64[D]").astype(float)
+    a[~ok] = a[ok].max()
+    return a
+
+
+def counts(d: "draw_store.Draws", *, kind: str = "white", weights: Optional[np.ndarray] = None) -> np.ndarray:
+    V, _ = _values(d, kind)
+    size = _size(d, kind)
+    if V.size == 0:
+        return np.zeros(size)
+    w = None if weights is None else np.repeat(np.asarray(weights, dtype=float), V.shape[1])
+    flat = V.ravel()
+    ok = flat >= 0
+    return np.bincount(flat[ok], weights=None if w is None else w[ok], minlength=size)[:size].astype(float)
+
+
+def decayed(d: "draw_store.Draws", halflives: Sequence[float], *, kind: str = "white", unit: str = "days",
+            extra_weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """Decayed counts for every half-life at once: row h = sum over draws of 2^(-age / halflives[h])."""
+    hl = np.asarray([max(1e-9, float(h)) for h in halflives], dtype=float)
+    size = _size(d, kind)
+    V, width = _values(d, kind)
+    if V.size == 0 or hl.size == 0:
+        return np.zeros((hl.size, size))
+    w = np.exp(-(math.log(2.0) / hl)[:, None] * ages(d, unit)[None, :])          # (H x n)
+    if extra_weights is not None:
+        w = w * np.asarray(extra_weights, dtype=float)[None, :]
+    flat = V.ravel()
+    ok = flat >= 0
+    # one bincount over (half-life, number) cells: index = h * size + number
+    idx = (np.arange(hl.size)[:, None] * size + flat[ok][None, :]).ravel()
+    ww = np.repeat(w, width, axis=1)[:, ok].ravel()
+    return np.bincount(idx, weights=ww, minlength=hl.size * size).reshape(hl.size, size)
+
+
+def prefix(d: "draw_store.Draws", *, kind: str = "white") -> np.ndarray:
+    """Cumulative counts: prefix(d)[i] = counts over the first i draws (int32)."""
+    key = (id(d.whites), d.n, kind)
+    with _LOCK:
+        hit = _PREFIX.get(key)
+    if hit is not None and hit[0]() is d.whites:
+        return hit[1]
+    size = _size(d, kind)
+    V, width = _values(d, kind)
+    P = np.zeros((d.n + 1, size), dtype=np.int32)
+    if V.size:
+        rows = np.repeat(np.arange(d.n), width)
+        flat = V.ravel()
+        ok = flat >= 0
+        np.add.at(P[1:], (rows[ok], flat[ok]), 1)
+        np.cumsum(P, axis=0, out=P)
+    with _LOCK:
+        if len(_PREFIX) > 32:
+            _PREFIX.clear()
+        try:
+            _PREFIX[key] = (weakref.ref(d.whites), P)
+        except TypeError:
+            pass
+    return P
+
+
+def window(d: "draw_store.Draws", start: int = 0, end: Optional[int] = None, *, kind: str = "white") -> np.ndarray:
+    P = prefix(d, kind=kind)
+    n = d.n
+    e = n if end is None else max(0, min(n, int(end) if end >= 0 else n + int(end)))
+    s = max(0, min(e, int(start) if start >= 0 else n + int(start)))
+    return (P[e] - P[s]).astype(float)
+
+
+def last(d: "draw_store.Draws", n_draws: int, *, kind: str = "white") -> np.ndarray:
+    """Counts over the most recent `n_draws` draws."""
+    return window(d, d.n - max(0, int(n_draws)), d.n, kind=kind)
+
+
+def rolling(d: "draw_store.Draws", size: int, *, kind: str = "white") -> np.ndarray:
+    P = prefix(d, kind=kind)
+    size = int(size)
+    if size <= 0 or size > d.n:
+        return np.zeros((0, P.shape[1]))
+    return (P[size:] - P[:-size]).astype(float)
+
+
+def since(d: "draw_store.Draws", days: int, *, kind: str = "white", now=None) -> np.ndarray:
+    """Counts over draws dated on/after (now or today) - days; all draws when undated."""
+    dates = np.asarray(d.dates)
+    if d.n == 0 or np.isnat(dates).all():
+        return window(d, kind=kind)
+    ref = np.datetime64(now, "D") if now is not None else np.datetime64("today", "D")
+    cutoff = ref - np.timedelta64(int(days), "D")
+    start = int(np.searchsorted(np.where(np.isnat(dates), np.datetime64("9999-12-31"), dates), cutoff, side="left"))
+    return window(d, start, d.n, kind=kind)
+
+
+def to_probs(c: np.ndarray, lo: int, hi: int, smoothing: float = 1.0) -> np.ndarray:
+    """Counts over numbers lo..hi (last axis) + smoothing, normalised per row."""
+    s = np.asarray(c, dtype=float)[..., lo:hi + 1] + float(smoothing)
+    tot = s.sum(axis=-1, keepdims=True)
+    return s / np.where(tot > 0, tot, 1.0)
+
+
+def clear() -> None:
+    with _LOCK:
+        _PREFIX.clear()
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+# Program/utilities/gap_engine.py
+# Gap / overdue statistics for every number in one pass over the one-hot draw matrix.
+#
+#   stats(d)                    GapStats for a draw_store.Draws (cached per game + content version)
+#   from_matrix(W, lo, hi)      same for a plain (n_draws x k) int matrix (no cache)
+#
+# GapStats (index i <-> number lo + i):
+#   hits, last_seen, current    hit count, index of the last draw containing it (-1 = never),
+#                               draws since then (n_draws when never seen)
+#   mean, var                   mean / variance of the completed gaps (NaN below two hits)
+#   z                           overdue z-score (current - mean) / std, 0 where undefined
+#   hist                        (numbers x max_gap + 1) gap histogram per number
+#   distribution()              pooled gap histogram (what history_utils.gap_distribution shows)
+#
+# A gap is the difference in draw index between consecutive draws containing a number.
+# Last-seen indices come from a running maximum down the draw axis: idx[r, n] = r where
+# number n is drawn, else -1, so maximum.accumulate(idx)[r - 1] is the previous sighting.
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from . import draw_store
+except Exception:
+    from utilities import draw_store  # type: ignore
+
+_LOCK = threading.Lock()
+_CACHE: Dict[Tuple[str, str, int, str], "GapStats"] = {}
+
+
+@dataclass(frozen=True)
+class GapStats:
+    lo: int
+    n_draws: int
+    hits: np.ndarray
+    last_seen: np.ndarray
+    current: np.ndarray
+    mean: np.ndarray
+    var: np.ndarray
+    z: np.ndarray
+    hist: np.ndarray
+
+    @property
+    def numbers(self) -> np.ndarray:
+        return np.arange(self.lo, self.lo + len(self.hits))
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "number": self.numbers, "hits": self.hits, "last_seen": self.last_seen,
+            "current_gap": self.current, "mean_gap": self.mean, "var_gap": self.var, "overdue_z": self.z,
+        })
+
+    def distribution(self) -> pd.DataFrame:
+        c = self.hist.sum(axis=0)
+        g = np.flatnonzero(c)
+        return pd.DataFrame({"gap": g, "count": c[g]})
+
+
+def _onehot(W: np.ndarray, lo: int, hi: int) -> np.ndarray:
+    W = np.asarray(W, dtype=np.intp)
+    n = W.shape[0] if W.ndim == 2 else 0
+    M = np.zeros((n, hi - lo + 1), dtype=bool)
+    if n:
+        rows = np.repeat(np.arange(n), W.shape[1])
+        flat = W.ravel()
+        ok = (flat >= lo) & (flat <= hi)
+        M[rows[ok], flat[ok] - lo] = True
+    return M
+
+
+def _from_onehot(M: np.ndarray, lo: int) -> GapStats:
+    n, size = M.shape
+    idx = np.where(M, np.arange(n, dtype=np.int32)[:, None], np.int32(-1))
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    last_seen = idx[-1].astype(int) if n else np.full(size, -1)
+    current = np.where(last_seen >= 0, n - 1 - last_seen, n)
+    hits = M.sum(axis=0).astype(int)
+
+    r, c = np.nonzero(M[1:])                     # sightings after the first draw
+    prev = idx[r, c]                             # running max up to the draw before
+    ok = prev >= 0
+    c, gaps = c[ok], (r[ok] + 1 - prev[ok])
+    ng = np.bincount(c, minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(c, weights=gaps, minlength=size) / ng
+        var = np.bincount(c, weights=gaps.astype(float) ** 2, minlength=size) / ng - mean ** 2
+        var = np.maximum(var, 0.0)
+        z = np.where((ng > 0) & (var > 0), (current - mean) / np.sqrt(var), 0.0)
+    G = int(gaps.max()) + 1 if gaps.size else 1
+    hist = np.bincount(c * G + gaps, minlength=size * G).reshape(size, G)
+    return GapStats(lo=int(lo), n_draws=int(n), hits=hits, last_seen=last_seen, current=current,
+                    mean=mean, var=var, z=np.nan_to_num(z), hist=hist)
+
+
+def from_matrix(W: np.ndarray, lo: int, hi: int) -> GapStats:
+    """Gap statistics for numbers lo..hi of a (n_draws x k) matrix, oldest draw first."""
+    return _from_onehot(_onehot(W, lo, hi), lo)
+
+
+def stats(d: "draw_store.Draws", *, kind: str = "white") -> GapStats:
+    """Cached GapStats for whites (kind="white") or the special ball (kind="special")."""
+    if kind == "special":
+        lo, hi = d.special_range if d.special_range else (0, -1)
+        W = np.asarray(d.special).reshape(-1, 1)
+    else:
+        lo, hi = d.white_min, d.white_max
+        W = d.whites
+    key = (d.game, kind, d.n, draw_store.version(d))
+    with _LOCK:
+        hit = _CACHE.get(key)
+    if hit is not None:
+        return hit
+    out = from_matrix(W, lo, hi)
+    with _LOCK:
+        if len(_CACHE) > 32:
+            _CACHE.clear()
+        _CACHE[key] = out
+    return out
+
+
+def clear(game: Optional[str] = None) -> None:
+    with _LOCK:
+        if game is None:
+            _CACHE.clear()
+            return
+        g = draw_store.normalize_game(game)
+        for k in [k for k in _CACHE if k[0] == g]:
+            _CACHE.pop(k, None)
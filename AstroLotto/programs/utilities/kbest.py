@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+# Program/utilities/kbest.py
+# Exact top-K tickets under additive per-number scores (sum of log-weights, as
+# app_main._score_sets uses), instead of estimating them from Monte Carlo frequencies.
+#
+#   top_k(scores, k, K)                         [(numbers, score)] best K k-subsets, best first
+#   top_k(scores, k, K, pair=B)                 same with pair terms: score + sum B[a, b] over pairs
+#   with_special(tickets, sp_scores, K, weight) best K (whites, special) combos of both lists
+#   ordered_top_k(scores, k, K)                 ordered draws with repeats (pick3): per-position sums
+#
+# `scores` is indexed by number; non-finite entries are excluded.
+# Without pair terms: numbers sorted by score, a ticket is an increasing index tuple into
+# that order, and bumping any one index to the next free slot can only lower the score.
+# A heap seeded with (0, 1, ..., k-1) and expanded lazily by those bumps pops tickets
+# in exact score order. About k pushes happen per popped ticket.
+# With pair terms (B >= 0, e.g. log(1 + strength * bonus)) it is a best-first search over
+# partial tickets. Each partial ticket carries an admissible upper bound: its score, plus
+# the best r completions counting their pairs with the chosen numbers, plus r(r-1)/2 times
+# the largest pair term. Complete tickets pop in exact order. `max_pops` bounds the work.
+
+import heapq, itertools
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Ticket = Tuple[Tuple[int, ...], float]
+
+
+def _prepare(scores) -> Tuple[np.ndarray, np.ndarray]:
+    s = np.asarray(scores, dtype=float)
+    nums = np.flatnonzero(np.isfinite(s))
+    order = nums[np.argsort(-s[nums], kind="stable")]
+    return order, s[order]
+
+
+def _independent(order: np.ndarray, v: np.ndarray, k: int, K: int) -> List[Ticket]:
+    n = len(v)
+    if k > n or K <= 0:
+        return []
+    cs = np.concatenate([[0.0], np.cumsum(v)])
+    start = tuple(range(k))
+    heap = [(-float(cs[k]), start)]
+    seen = {start}
+    out: List[Ticket] = []
+    while heap and len(out) < K:
+        neg, idx = heapq.heappop(heap)
+        out.append((tuple(sorted(int(order[i]) for i in idx)), -neg))
+        for j in range(k):
+            nxt = idx[j] + 1
+            if nxt < (idx[j + 1] if j + 1 < k else n):
+                child = idx[:j] + (nxt,) + idx[j + 1:]
+                if child not in seen:
+                    seen.add(child)
+                    heapq.heappush(heap, (neg + float(v[idx[j]] - v[nxt]), child))
+    return out
+
+
+def _with_pairs(order: np.ndarray, v: np.ndarray, B: np.ndarray, k: int, K: int, max_pops: int) -> List[Ticket]:
+    n = len(v)
+    if k > n or K <= 0:
+        return []
+    P = np.asarray(B, dtype=float)[np.ix_(order, order)]
+    P = np.where(np.isfinite(P), np.maximum(P, 0.0), 0.0)
+    np.fill_diagonal(P, 0.0)
+    bmax = float(P.max()) if P.size else 0.0
+    tie = itertools.count()
+
+    def bound(score: float, extra: np.ndarray, last: int, r: int) -> float:
+        if r == 0:
+            return score
+        cand = v[last + 1:] + extra[last + 1:]
+        if len(cand) < r:
+            return -np.inf
+        best = np.partition(cand, len(cand) - r)[len(cand) - r:].sum()
+        return score + float(best) + bmax * r * (r - 1) / 2.0
+
+    zero = np.zeros(n)
+    heap = [(-bound(0.0, zero, -1, k), next(tie), 0.0, (), zero)]
+    out: List[Ticket] = []
+    pops = 0
+    while heap and len(out) < K and pops < max_pops:
+        neg_ub, _, score, idx, extra = heapq.heappop(heap)
+        pops += 1
+        if len(idx) == k:
+            out.append((tuple(sorted(int(order[i]) for i in idx)), score))
+            continue
+        last = idx[-1] if idx else -1
+        r = k - len(idx) - 1
+        for j in range(last + 1, n - r):
+            sc = score + float(v[j] + extra[j])
+            ex = extra + P[j]
+            ub = bound(sc, ex, j, r)
+            if np.isfinite(ub):
+                heapq.heappush(heap, (-ub, next(tie), sc, idx + (j,), ex))
+    return out
+
+
+def top_k(scores, k: int, K: int, *, pair: Optional[np.ndarray] = None, max_pops: int = 200000) -> List[Ticket]:
+    """Exact best K sorted k-number tickets by sum of scores (+ pair terms)."""
+    order, v = _prepare(scores)
+    if pair is None or not np.any(np.asarray(pair) > 0):
+        return _independent(order, v, int(k), int(K))
+    return _with_pairs(order, v, pair, int(k), int(K), int(max_pops))
+
+
+def with_special(tickets: Sequence[Ticket], special_scores, K: int, weight: float = 1.0) -> List[Tuple[Tuple[int, ...], int, float]]:
+    """Best K (whites, special, score) from ranked white tickets x special scores."""
+    order, sv = _prepare(special_scores)
+    if not tickets or not len(order):
+        return []
+    sv = sv * float(weight)
+    heap = [(-(tickets[0][1] + sv[0]), 0, 0)]
+    seen = {(0, 0)}
+    out = []
+    while heap and len(out) < K:
+        neg, i, j = heapq.heappop(heap)
+        out.append((tickets[i][0], int(order[j]), -neg))
+        for a, b in ((i + 1, j), (i, j + 1)):
+            if a < len(tickets) and b < len(order) and (a, b) not in seen:
+                seen.add((a, b))
+                heapq.heappush(heap, (-(tickets[a][1] + sv[b]), a, b))
+    return out
+
+
+def ordered_top_k(scores, k: int, K: int) -> List[Ticket]:
+    """Best K ordered k-digit draws with repeats: the sum of k independent digit scores."""
+    order, v = _prepare(scores)
+    if not len(order) or K <= 0:
+        return []
+    n = len(v)
+    start = (0,) * int(k)
+    heap = [(-float(v[0]) * k, start)]
+    seen = {start}
+    out: List[Ticket] = []
+    while heap and len(out) < K:
+        neg, idx = heapq.heappop(heap)
+        out.append((tuple(int(order[i]) for i in idx), -neg))
+        for j in range(len(idx)):
+            if idx[j] + 1 < n:
+                child = idx[:j] + (idx[j] + 1,) + idx[j + 1:]
+                if child not in seen:
+                    seen.add(child)
+                    heapq.heappush(heap, (neg + float(v[idx[j]] - v[idx[j] + 1]), child))
+    return out
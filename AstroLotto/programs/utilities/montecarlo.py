@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from pathlib import Path
+import os
+PROJECT_DIR = Path(__file__).resolve().parent
+(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
+(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
+
+from typing import Dict, List, Any
+import random
+import numpy as np
+import pandas as pd
+from .smart_features import WHITE_RANGES, SPECIAL_RANGES, long_short_blend, gap_overdue_bonus
+from . import draw_store, cooc_engine, ticket_sampler, ticket_codec, kbest
+
+def _weighted_choice(items: List[int], weights: List[float]) -> int:
+    total = sum(weights) + 1e-12
+    r = random.random() * total
+    c = 0.0
+    for x, w in zip(items, weights):
+        c += w
+        if r <= c:
+            return x
+    return items[-1]
+
+def _pair_bonus(df, game: str, top_k_pairs: int = 30) -> Dict[tuple,float]:
+    """Lightweight pair bias just for 5/6-number games. Not used for pick3."""
+    d = draw_store.as_draws(df, game)
+    if d.n == 0:
+        return {}
+    top = dict(cooc_engine.matrix(d).top(top_k_pairs))
+    if top:
+        m = max(top.values())
+        for k in list(top.keys()):
+            top[k] = top[k]/m
+    return top
+
+def _weight_vector(game: str, base_scores: Dict[int,float]) -> np.ndarray:
+    lo, hi, _ = WHITE_RANGES[game]
+    w = np.zeros(hi+1, dtype=float)
+    for i in range(lo, hi+1):
+        w[i] = max(1e-9, float(base_scores.get(i, 0.0)))
+    return w
+
+def _sample_many(game: str, base_scores: Dict[int,float], pair_bonus: Dict[tuple,float], n: int,
+                 chaos_pct: float = 0.0, allow_repeats: bool = False) -> np.ndarray:
+    """(n x k) tickets in one batch (utilities/ticket_sampler); pair bonuses bump later picks by 15%."""
+    lo, hi, k = WHITE_RANGES[game]
+    w = _weight_vector(game, base_scores)
+    if allow_repeats:
+        return ticket_sampler.sample(w, k, n, chaos_pct=chaos_pct, replace=True)
+    pl = ticket_sampler.pair_log_matrix(pair_bonus, hi+1) if pair_bonus else None
+    return ticket_sampler.sample(w, k, n, pair_log=pl, chaos_pct=chaos_pct)
+
+def sample_set(game: str, base_scores: Dict[int,float], df: pd.DataFrame, pair_bonus: Dict[tuple,float], chaos_pct: float = 0.0, allow_repeats: bool = False) -> List[int]:
+    T = _sample_many(game, base_scores, pair_bonus, 1, chaos_pct=chaos_pct, allow_repeats=allow_repeats)
+    return [int(x) for x in T[0]]  # pick3 keeps draw order, others are sorted
+
+def exact_picks(game: str, base_scores: Dict[int,float], pair_bonus: Dict[tuple,float], n_sets: int = 5) -> List[List[int]]:
+    """Best n_sets tickets by sum of log base scores (+ log pair bumps), enumerated exactly."""
+    lo, hi, k = WHITE_RANGES[game]
+    w = _weight_vector(game, base_scores)
+    scores = np.full(len(w), -np.inf)
+    scores[lo:] = np.log(w[lo:])
+    if game == "pick3":
+        return [list(t) for t, _ in kbest.ordered_top_k(scores, k, n_sets)]
+    pl = ticket_sampler.pair_log_matrix(pair_bonus, hi+1) if pair_bonus else None
+    return [list(t) for t, _ in kbest.top_k(scores, k, n_sets, pair=pl)]
+
+def monte_carlo_picks(game: str, df: pd.DataFrame, n_sets: int = 5, n_sims: int = 5000, short_days: int = 30, alpha: float = 0.3, gap_strength: float = 0.2, chaos_pct: float = 0.05, exact: bool = False) -> List[List[int]]:
+    """Most frequent of n_sims sampled tickets; exact=True enumerates the top tickets instead."""
+    lo, hi, k = WHITE_RANGES[game]
+    base = long_short_blend(df, game, short_days=short_days, alpha=alpha)
+    gap = gap_overdue_bonus(df, game, strength=gap_strength)
+    base_scores = {i: max(1e-9, base.get(i, 0.0) * gap.get(i, 1.0)) for i in range(lo, hi+1)}
+    if exact:
+        return exact_picks(game, base_scores, {} if game == "pick3" else _pair_bonus(df, game), n_sets=n_sets)
+    if game == "pick3":
+        # Ordered with replacement
+        T = _sample_many(game, base_scores, {}, max(500, n_sims//10), chaos_pct=chaos_pct, allow_repeats=True)
+    else:
+        T = _sample_many(game, base_scores, _pair_bonus(df, game), n_sims, chaos_pct=chaos_pct)
+    return [list(t) for t, _ in ticket_codec.tally(game, T, top=n_sets)]
+
+def choose_special(game: str, df: pd.DataFrame, model: Dict[str,Any] | None) -> int | None:
+    lo_hi = SPECIAL_RANGES.get(game)
+    if not lo_hi:
+        return None
+    lo, hi = lo_hi
+    # prefer model special_scores; fall back to compute from df
+    scores = None
+    if isinstance(model, dict):
+        scores = model.get("special_scores")
+    if not scores:
+        # compute from df
+        col = None
+        for c in df.columns:
+            lc = c.lower()
+            if game == "powerball" and lc == "powerball": col = c; break
+            if game == "megamillions" and lc in ("mega_ball","megaball","mega"): col = c; break
+            if game == "luckyforlife" and lc in ("lucky_ball","luckyball","lucky"): col = c; break
+            if lc in ("special","bonus"): col = c; break
+        if col:
+            s = pd.to_numeric(df[col], errors="coerce").dropna().astype(int)
+            vc = s.value_counts().to_dict()
+            total = sum(vc.values()) or 1
+            scores = {i: vc.get(i, 0) / total for i in range(lo, hi+1)}
+        else:
+            scores = {i: 1.0 for i in range(lo, hi+1)}
+    keys = list(range(lo, hi+1))
+    w = [max(1e-9, float(scores.get(i, 0.0))) for i in keys]
+    return _weighted_choice(keys, w)
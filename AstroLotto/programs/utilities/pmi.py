@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from pathlib import Path
+import os
+PROJECT_DIR = Path(__file__).resolve().parent
+(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
+(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
+
+# Program/utilities/pmi.py
+from typing import Dict, Tuple, List
+import numpy as np
+import pandas as pd
+try:
+    from . import draw_store, cooc_engine
+except Exception:
+    from utilities import draw_store, cooc_engine  # type: ignore
+
+def _white_matrix(df, white_cols: List[str]) -> np.ndarray:
+    """Sorted int rows from a Draws or from `white_cols` of a frame (rows with blanks dropped)."""
+    if isinstance(df, draw_store.Draws):
+        return np.asarray(df.whites, dtype=int)
+    cols = [c for c in white_cols if c in df.columns]
+    if not cols or len(cols) < len(white_cols):
+        return np.zeros((0, len(white_cols)), dtype=int)
+    W = df[cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    W = W[np.isfinite(W).all(axis=1)]
+    return np.sort(W.astype(int), axis=1)
+
+def pmi_pairs(df, white_cols: List[str], top_k: int = 40) -> Dict[Tuple[int,int], float]:
+    """Top pairs by PMI, scaled so the strongest pair is 1.0 (negative PMI clipped to 0)."""
+    is_draws = isinstance(df, draw_store.Draws)
+    if not white_cols and not is_draws:
+        return {}
+    if is_draws:
+        co = cooc_engine.matrix(df)
+    else:
+        W = _white_matrix(df, white_cols or [])
+        if not len(W):
+            return {}
+        co = cooc_engine.from_matrix(W)
+    ranked = co.top(None, by="pmi")
+    if not ranked or ranked[0][1] <= 0:
+        return {}
+    maxp = ranked[0][1]
+    return {pair: max(0.0, v / maxp) for pair, v in ranked[:top_k]}
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from pathlib import Path
+import os
+PROJECT_DIR = Path(__file__).resolve().parent
+(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
+(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
+
+# Program/utilities/probability.py (v1.2 context-aware, hotfixed)
+
+import math, os
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Tuple, List
+
+try:
+    from . import draw_store, freq_engine
+except Exception:
+    from utilities import draw_store, freq_engine  # type: ignore
+
+GAME_RULES = {
+    "powerball":   {"k_white": 5, "white_min": 1, "white_max": 69, "special_min": 1, "special_max": 26},
+    "megamillions":{"k_white": 5, "white_min": 1, "white_max": 70, "special_min": 1, "special_max": 25},
+    "colorado_lottery": {"k_white": 6, "white_min": 1, "white_max": 40, "special_min": None, "special_max": None},
+    "cash5": {"k_white": 5, "white_min": 1, "white_max": 32, "special_min": None, "special_max": None},
+    "pick3": {"k_white": 3, "white_min": 0, "white_max": 9, "special_min": None, "special_max": None},
+    "lucky_for_life":{"k_white": 5, "white_min": 1, "white_max": 48, "special_min": 1, "special_max": 18},
+}
+
+def _find_date_column(df):
+    """
+    Try hard to locate a date-like column.
+    Matches common names, datetime dtypes, or parseable strings.
+    Returns the column name or None.
+    """
+    # 1) name-based candidates
+    name_keys = {"drawdate","draw_date","date","draw_dt","drawtime","draw time","draw-date"}
+    for c in df.columns:
+        k = str(c).strip().lower().replace(" ", "").replace("-", "_")
+        if k in name_keys:
+            return c
+
+    # 2) dtype-based
+    for c in df.columns:
+        try:
+            if pd.api.types.is_datetime64_any_dtype(df[c]):
+                return c
+        except Exception:
+            pass
+
+    # 3) try-to-parse
+    for c in df.columns:
+        try:
+            pd.to_datetime(df[c], errors="raise")
+            return c
+        except Exception:
+            continue
+    return None
+
+def _norm_game(game: str) -> str:
+    g = (game or "").lower().strip()
+    if g.startswith("power"): return "powerball"
+    if g.startswith("mega"): return "megamillions"
+    if "colorado" in g and "lotto" in g: return "colorado_lottery"
+    if g in ("cash5","cash 5"): return "cash5"
+    if g.replace(" ", "") in ("lfl","luckyforlife"): return "lucky_for_life"
+    return g
+
+def _date_col(df: pd.DataFrame) -> Optional[str]:
+    for c in ("draw_date","date","Date"):
+        if c in df.columns: return c
+    return None
+
+def _exp_weights(dates: pd.Series, halflife_days: float) -> np.ndarray:
+    if dates.empty: return np.array([])
+    maxd = pd.to_datetime(dates).max()
+    deltas = (pd.to_datetime(maxd) - pd.to_datetime(dates)).dt.total_seconds() / (3600*24)
+    lam = math.log(2.0) / max(1e-9, halflife_days)
+    return np.exp(-lam * deltas.values.astype(float))
+
+def _context_weights(df: pd.DataFrame, context: Optional[Dict]) -> np.ndarray:
+    if not context: return np.ones(len(df), dtype=float)
+    ctx_q = context.get("moon_quadrant", None)
+    if ctx_q is None: return np.ones(len(df), dtype=float)
+    col = None
+    for c in ("moon_quadrant","moon_q","moonquad"):
+        if c in df.columns: col=c; break
+    if col is None: return np.ones(len(df), dtype=float)
+    q = pd.to_numeric(df[col], errors="coerce").fillna(-1).astype(int).values
+    return np.where(q == int(ctx_q), 1.25, 1.0)
+
+def _guess_cols(df: pd.DataFrame, game: str) -> Tuple[List[str], Optional[str]]:
+    cols = [c.lower() for c in df.columns]; mapping = dict(zip(cols, df.columns))
+    white_names = ["white1","white2","white3","white4","white5","white6",
+                   "n1","n2","n3","n4","n5","n6","w1","w2","w3","w4","w5","w6",
+                   "ball1","ball2","ball3","ball4","ball5","ball6"]
+    special_names = ["powerball","power","pb","mega","megaball","bonus","special"]
+    whites=[mapping[n] for n in white_names if n in mapping][:GAME_RULES.get(game,{}).get("k_white",5)]
+    special=None
+    for n in special_names:
+        if n in mapping: special = mapping[n]; break
+    return whites, special
+
+def compute_number_probs_multi(
+    df,
+    game: str,
+    halflives,
+    smoothing_white: float=1.0,
+    smoothing_special: float=1.0,
+    context: Optional[Dict]=None
+) -> Dict[str, np.ndarray]:
+    """Like compute_number_probs for several half-lives at once.
+
+    Returns {"halflives", "white": (H x white numbers), "special": (H x special numbers) or None}.
+    """
+    game = _norm_game(game)
+    rules = GAME_RULES[game]
+    wmin,wmax = rules["white_min"], rules["white_max"]
+    smin,smax = rules["special_min"], rules["special_max"]
+    hl = [float(h) for h in halflives]
+    d = draw_store.as_draws(df, game)
+    if d.n == 0:
+        white = np.full((len(hl), wmax - wmin + 1), 1.0/(wmax - wmin + 1))
+        special = None if smin is None else np.full((len(hl), smax - smin + 1), 1.0/(smax - smin + 1))
+        return {"halflives": np.asarray(hl), "white": white, "special": special}
+    if np.isnat(np.asarray(d.dates)).all():
+        print("Warning: No date column detected; using pseudo-date.")
+    ctx = None
+    if context and isinstance(df, pd.DataFrame) and d.rows is not None:
+        ctx = _context_weights(df, context)[d.rows]
+
+    white = freq_engine.to_probs(freq_engine.decayed(d, hl, extra_weights=ctx), wmin, wmax, smoothing_white)
+    special = None
+    if smin is not None:
+        sc = freq_engine.decayed(d, hl, kind="special", extra_weights=ctx)
+        sc = np.pad(sc, ((0, 0), (0, max(0, smax + 1 - sc.shape[1]))))
+        special = freq_engine.to_probs(sc, smin, smax, smoothing_special)
+    return {"halflives": np.asarray(hl), "white": white, "special": special}
+
+def compute_number_probs(
+    df,
+    game: str,
+    halflife_days: float=180.0,
+    smoothing_white: float=1.0,
+    smoothing_special: float=1.0,
+    rule_clip: bool=True,
+    context: Optional[Dict]=None
+) -> Dict[str, np.ndarray]:
+    """White/special probabilities from decayed draw counts.
+
+    `df` is a history frame or a draw_store.Draws (pass draw_store.load(game) to skip
+    CSV parsing altogether). Out-of-range numbers are always dropped by the draw store,
+    so rule_clip is kept only for signature compatibility.
+    """
+    out = compute_number_probs_multi(df, game, [halflife_days], smoothing_white, smoothing_special, context)
+    return {"white": out["white"][0], "special": None if out["special"] is None else out["special"][0]}
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+# Program/utilities/ticket_codec.py
+# Tickets as int64 codes, so counting / dedupe / lookups run on integer arrays.
+#
+#   rank(W, lo) / unrank(codes, k, lo)   sorted k-subsets <-> colexicographic rank
+#                                        (combinatorial number system: sum C(x_i, i + 1))
+#   codec(game)                          Codec for any draw_store / GAME_RULES game key
+#   Codec.encode(whites, special)        (m x k) whites [+ (m,) specials] -> (m,) codes
+#   Codec.decode(codes)                  -> (whites, specials or None)
+#   Codec.from_tickets / to_tickets      [{"white": [...], "special": s}] or [[...]] <-> codes
+#   Codec.history(d)                     codes of every draw in a draw_store.Draws
+#   count(codes)                         distinct codes with counts, most frequent first
+#   dedupe(codes)                        indices of first occurrences, original order kept
+#   tally(game, T, top)                  [(ticket tuple, count)], ties in ticket order
+#
+# Code layout: white_code * n_special + (special - special_min) for special-ball games, so
+# code // n_special recovers the white combination. Ordered games (pick3) use positional
+# base-(hi - lo + 1) digits instead of subsets.
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from . import draw_store
+except Exception:
+    from utilities import draw_store  # type: ignore
+
+_NMAX = 96
+_KMAX = 8
+
+
+def _binom_table() -> np.ndarray:
+    C = np.zeros((_NMAX + 1, _KMAX + 1), dtype=np.int64)
+    C[:, 0] = 1
+    for n in range(1, _NMAX + 1):
+        C[n, 1:] = C[n - 1, 1:] + C[n - 1, :-1]
+    return C
+
+
+_C = _binom_table()
+
+
+def rank(W: np.ndarray, lo: int = 0) -> np.ndarray:
+    """Colex rank of each row of a (m x k) matrix of strictly increasing numbers >= lo."""
+    X = np.asarray(W, dtype=np.int64) - int(lo)
+    if X.ndim == 1:
+        X = X[None, :]
+    k = X.shape[1]
+    return _C[X, np.arange(1, k + 1)].sum(axis=1) if X.size else np.zeros(X.shape[0], dtype=np.int64)
+
+
+def unrank(codes: np.ndarray, k: int, lo: int = 0) -> np.ndarray:
+    """Inverse of rank(): (m,) codes -> (m x k) sorted rows."""
+    r = np.asarray(codes, dtype=np.int64).copy()
+    out = np.empty((len(r), int(k)), dtype=np.int64)
+    for i in range(int(k), 0, -1):
+        # largest x with C(x, i) <= r; column i of the table is non-decreasing in x
+        x = np.searchsorted(_C[:, i], r, side="right") - 1
+        out[:, i - 1] = x
+        r -= _C[x, i]
+    return out + int(lo)
+
+
+@dataclass(frozen=True)
+class Codec:
+    game: str
+    k: int
+    lo: int
+    hi: int
+    special: Optional[Tuple[int, int]] = None
+    ordered: bool = False
+
+    @property
+    def n_white(self) -> int:
+        span = self.hi - self.lo + 1
+        return span ** self.k if self.ordered else int(_C[span, self.k])
+
+    @property
+    def n_special(self) -> int:
+        return (self.special[1] - self.special[0] + 1) if self.special else 1
+
+    @property
+    def size(self) -> int:
+        return self.n_white * self.n_special
+
+    def _white_codes(self, W: np.ndarray) -> np.ndarray:
+        W = np.asarray(W, dtype=np.int64)
+        if self.ordered:
+            base = self.hi - self.lo + 1
+            return (W - self.lo) @ (base ** np.arange(self.k - 1, -1, -1, dtype=np.int64))
+        return rank(np.sort(W, axis=1), self.lo)
+
+    def encode(self, whites: np.ndarray, special: Optional[np.ndarray] = None) -> np.ndarray:
+        W = np.asarray(whites, dtype=np.int64).reshape(-1, self.k)
+        codes = self._white_codes(W)
+        if self.special:
+            sp = np.zeros(len(W), dtype=np.int64) if special is None else np.asarray(special, dtype=np.int64) - self.special[0]
+            codes = codes * self.n_special + np.clip(sp, 0, self.n_special - 1)
+        return codes
+
+    def _white_rows(self, c: np.ndarray) -> np.ndarray:
+        if not self.ordered:
+            return unrank(c, self.k, self.lo)
+        base = self.hi - self.lo + 1
+        W = np.empty((len(c), self.k), dtype=np.int64)
+        c = np.asarray(c, dtype=np.int64).copy()
+        for j in range(self.k - 1, -1, -1):
+            c, W[:, j] = np.divmod(c, base)
+        return W + self.lo
+
+    def decode(self, codes: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        c = np.asarray(codes, dtype=np.int64)
+        sp = None
+        if self.special:
+            c, s = np.divmod(c, self.n_special)
+            sp = s + self.special[0]
+        return self._white_rows(c), sp
+
+    def valid(self, whites: np.ndarray) -> np.ndarray:
+        """Rows with k in-range numbers (and no repeats unless ordered)."""
+        W = np.asarray(whites, dtype=np.int64).reshape(-1, self.k)
+        ok = ((W >= self.lo) & (W <= self.hi)).all(axis=1)
+        if not self.ordered and self.k > 1:
+            ok &= (np.diff(np.sort(W, axis=1), axis=1) > 0).all(axis=1)
+        return ok
+
+    def from_tickets(self, tickets: Iterable[Any], with_special: bool = True) -> np.ndarray:
+        """Codes for [{"white": [...], "special": s}] or plain number lists; malformed rows -> -1."""
+        rows, sps = [], []
+        for t in tickets:
+            whites = t.get("white") if isinstance(t, dict) else t
+            sp = t.get("special") if isinstance(t, dict) else None
+            try:
+                w = [int(x) for x in (whites or [])]
+            except Exception:
+                w = []
+            rows.append(w if len(w) == self.k else [self.lo - 1] * self.k)
+            sps.append(int(sp) if (sp is not None and with_special and self.special) else (self.special[0] if self.special else 0))
+        if not rows:
+            return np.zeros(0, dtype=np.int64)
+        W = np.asarray(rows, dtype=np.int64)
+        S = np.asarray(sps, dtype=np.int64)
+        ok = self.valid(W)
+        if self.special:
+            ok &= (S >= self.special[0]) & (S <= self.special[1])
+        out = np.full(len(W), -1, dtype=np.int64)
+        out[ok] = self.encode(W[ok], S[ok] if self.special else None)
+        return out
+
+    def to_tickets(self, codes: np.ndarray) -> List[dict]:
+        W, sp = self.decode(codes)
+        return [{"white": [int(x) for x in w], "special": None if sp is None else int(s)}
+                for w, s in zip(W.tolist(), (sp.tolist() if sp is not None else [None] * len(W)))]
+
+    def history(self, d: "draw_store.Draws", with_special: bool = True) -> np.ndarray:
+        """Codes of the draws in `d` (rows that do not fit the game are skipped)."""
+        W = np.asarray(d.whites, dtype=np.int64)
+        if W.ndim != 2 or W.shape[1] != self.k:
+            return np.zeros(0, dtype=np.int64)
+        ok = self.valid(W)
+        sp = None
+        if self.special:
+            sp = np.asarray(d.special, dtype=np.int64)
+            if with_special:
+                ok &= (sp >= self.special[0]) & (sp <= self.special[1])
+            else:
+                sp = np.full(len(W), self.special[0])
+        return self.encode(W[ok], None if sp is None else sp[ok])
+
+    def seen(self, codes: np.ndarray, d: "draw_store.Draws", with_special: bool = True) -> np.ndarray:
+        """Boolean per code: was this ticket ever drawn (whites only when with_special=False)?"""
+        c = np.asarray(codes, dtype=np.int64)
+        if with_special or not self.special:
+            return np.isin(c, self.history(d, True))
+        return np.isin(c // self.n_special, self.history(d, False) // self.n_special)
+
+
+@lru_cache(maxsize=32)
+def codec(game: str) -> Codec:
+    g = draw_store.normalize_game(game)
+    spec = draw_store.GAMES.get(g)
+    if spec is None:
+        raise KeyError(f"unknown game {game!r}")
+    return Codec(g, spec.k, spec.white_min, spec.white_max, spec.special, spec.ordered)
+
+
+def count(codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(distinct codes, counts), most frequent first, ties by code."""
+    u, c = np.unique(np.asarray(codes, dtype=np.int64), return_counts=True)
+    order = np.lexsort((u, -c))
+    return u[order], c[order]
+
+
+def dedupe(codes: np.ndarray) -> np.ndarray:
+    """Indices of the first occurrence of every code, in original order."""
+    _, first = np.unique(np.asarray(codes, dtype=np.int64), return_index=True)
+    return np.sort(first)
+
+
+def tally(game: str, T: np.ndarray, top: Optional[int] = None) -> List[Tuple[Tuple[int, ...], int]]:
+    """Distinct white tickets of `T` with counts, most frequent first, ties in ticket order."""
+    T = np.asarray(T, dtype=np.int64)
+    if T.size == 0:
+        return []
+    cd = codec(game)
+    u, c = np.unique(cd._white_codes(T), return_counts=True)
+    W = cd._white_rows(u)
+    order = np.lexsort(tuple(W[:, j] for j in range(W.shape[1] - 1, -1, -1)) + (-c,))
+    if top is not None:
+        order = order[:max(0, int(top))]
+    return [(tuple(int(x) for x in W[i]), int(c[i])) for i in order]
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+# Program/utilities/ticket_sampler.py
+# Draw many weighted tickets at once instead of one rng.choice per trial.
+#
+#   sample(weights, k, m)       (m x k) tickets; weights are indexed by number (0 = never drawn)
+#   pair_log_matrix(bonus, n)   {(a, b): b} pair bonuses -> (n x n) log-multiplier matrix
+#
+# Counting the drawn tickets goes through utilities/ticket_codec.tally.
+#
+# Without replacement a ticket is the top-k of log(w) + Gumbel noise over the (m x n) matrix,
+# which is exactly sequential weighted sampling without replacement. The keys are computed
+# in the equivalent form log(U) / w, and for k ~ 5 of ~70 the top-k is taken by k masked
+# argmax passes (cheaper than argpartition on short rows). Only positive-weight numbers
+# get a column, so a shortlisted pool costs proportionally less.
+# Pair bonuses make the weights depend on what was already picked, so then the k picks
+# are taken one column at a time as an exponential race: each step rescales the remaining
+# clocks by the pair bump of the number just chosen and takes the argmin (earlier bumps are
+# already in the clocks). Memorylessness makes that exact with a single noise matrix, so the pair path costs about
+# what the chaos path does (~1 s for 1M powerball tickets) instead of k fresh Gumbel draws.
+# With replacement (pick3) each position is an independent inverse-CDF draw (per-row CDFs
+# when chaos boosts are on).
+# Work is chunked so memory stays at `chunk` x n floats.
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+CHUNK = 1 << 16
+
+
+def pair_log_matrix(pair_bonus: Dict[Tuple[int, int], float], size: int, strength: float = 0.15) -> np.ndarray:
+    """Symmetric log(1 + strength * bonus) matrix, zero where there is no bonus."""
+    L = np.zeros((size, size), dtype=np.float32)
+    for (a, b), v in (pair_bonus or {}).items():
+        if 0 <= a < size and 0 <= b < size and a != b:
+            L[a, b] = L[b, a] = np.log1p(strength * float(v))
+    return L
+
+
+def _logw(weights: np.ndarray) -> np.ndarray:
+    w = np.asarray(weights, dtype=np.float64)
+    w = np.where(np.isfinite(w) & (w > 0), w, 0.0)
+    with np.errstate(divide="ignore"):
+        return np.log(w).astype(np.float32)
+
+
+def _chaos(rng: np.random.Generator, m: int, size: int, chaos_pct: float) -> np.ndarray:
+    """Per-row log-boost of log U(1.1, 1.5), each number boosted with probability chaos_pct
+    (at least one number per row on average)."""
+    q = np.float32(max(chaos_pct, 1.0 / size))
+    V = rng.random((m, size), dtype=np.float32)
+    hit = V < q
+    return np.where(hit, np.log(np.float32(1.1) + np.float32(0.4) * V / q), np.float32(0.0))
+
+
+def _take(z: np.ndarray, out: np.ndarray, t: int) -> None:
+    """Column t = row-wise argmax of z; the winner is masked for the next pick."""
+    out[:, t] = np.argmax(z, axis=1)
+    np.put_along_axis(z, out[:, t:t + 1], -np.inf, axis=1)
+
+
+def _chunk(rng, logw, k, m, pair_log, chaos_pct) -> np.ndarray:
+    size = len(logw)
+    boost = _chaos(rng, m, size, chaos_pct) if chaos_pct > 0 else None
+    out = np.empty((m, k), dtype=np.intp)
+    if pair_log is None:
+        # Gumbel-top-k in its exponential form: argmax of log(U) / w ranks the numbers exactly
+        # like log(w) + Gumbel, with one log instead of two.
+        z = rng.random((m, size), dtype=np.float32)
+        with np.errstate(divide="ignore"):
+            np.log(z, out=z)
+        z *= np.exp(-logw) if boost is None else np.exp(-(logw + boost))
+        for t in range(k):
+            _take(z, out, t)
+        return np.sort(out, axis=1)
+    # Exponential race: number i fires at E_i / w_i (E ~ Exp(1)) and the first to fire is
+    # drawn with probability proportional to w_i. The race is memoryless, so once one fires
+    # the others' remaining times are again Exp(w_i); when the pick just made multiplies w_i by
+    # its pair bump b_i the race goes on with (z_i - fired) / b_i. Bumps from earlier picks are
+    # already folded into z, so each step applies only the latest one and one noise matrix
+    # serves all k steps.
+    z = rng.random((m, size), dtype=np.float32)
+    with np.errstate(divide="ignore"):
+        np.log(z, out=z)
+    np.negative(z, out=z)
+    z *= np.exp(-logw) if boost is None else np.exp(-(logw + boost))
+    inv = np.exp(-pair_log).astype(np.float32)          # 1 / bump for each pair
+    rows = np.arange(m)
+    for t in range(k):
+        out[:, t] = np.argmin(z, axis=1)
+        fired = z[rows, out[:, t]]
+        z[rows, out[:, t]] = np.inf
+        if t + 1 < k:
+            z -= fired[:, None]                         # residual time
+            z *= inv[out[:, t]]                         # bump from this pick only
+    return np.sort(out, axis=1)
+
+
+def sample(weights: np.ndarray, k: int, m: int, *, pair_log: Optional[np.ndarray] = None, chaos_pct: float = 0.0,
+           replace: bool = False, rng: Optional[np.random.Generator] = None, chunk: int = CHUNK) -> np.ndarray:
+    """(m x k) int tickets drawn with probability proportional to `weights` (indexed by number).
+
+    Without replacement rows are sorted; with replace=True (pick3) they keep draw order.
+    If every weight is zero the live numbers are drawn uniformly.
+    """
+    rng = rng or np.random.default_rng()
+    w = np.asarray(weights, dtype=np.float64)
+    k, m = int(k), int(m)
+    if m <= 0 or k <= 0 or w.size == 0:
+        return np.zeros((max(0, m), max(0, k)), dtype=np.intp)
+    if not (np.isfinite(w) & (w > 0)).any():
+        w = np.ones_like(w)
+    if replace:
+        p = np.where(np.isfinite(w) & (w > 0), w, 0.0)
+        if chaos_pct <= 0:
+            cdf = np.cumsum(p / p.sum())
+            return np.minimum(np.searchsorted(cdf, rng.random((m, k)), side="right"), len(cdf) - 1)
+        parts = []
+        for s in range(0, m, chunk):
+            n = min(chunk, m - s)
+            cdf = np.cumsum(p * np.exp(_chaos(rng, n, len(p), chaos_pct)), axis=1)
+            U = rng.random((n, k)) * cdf[:, -1:]
+            parts.append(np.minimum((cdf[:, None, :] <= U[:, :, None]).sum(axis=2), len(p) - 1))
+        return np.concatenate(parts, axis=0)
+    logw = _logw(w)
+    live = np.flatnonzero(np.isfinite(logw))            # zero-weight numbers are dropped up front
+    if len(live) < k:
+        live = np.arange(len(w))
+        logw = np.where(np.isfinite(logw), logw, np.float32(-30.0))
+    pl = None if pair_log is None else np.asarray(pair_log, dtype=np.float32)[np.ix_(live, live)]
+    parts = [_chunk(rng, logw[live], k, min(chunk, m - s), pl, chaos_pct) for s in range(0, m, chunk)]
+    return live[np.concatenate(parts, axis=0)]
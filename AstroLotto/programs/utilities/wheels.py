@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+# Program/utilities/wheels.py
+# Wheels with a real guarantee: covering / lottery designs over a player's number pool.
+#
+#   wheel(pool, k, t, m=None)    Wheel of k-number tickets such that whenever m of the pool
+#                                numbers are drawn, some ticket holds at least t of them
+#                                (m = t is the classic covering design C(v, k, t))
+#   check(tickets, pool, t, m)   (uncovered, total) m-subsets of the pool for any ticket list
+#   schonheim(v, k, t)           lower bound on the size of C(v, k, t)
+#
+# Wheel: pool, k, t, m, tickets (numbers), uncovered / total m-subsets, lower_bound, source
+#   .guaranteed, .coverage, .guarantee (one-line text for the UI)
+#
+# Designs are built on pool indices 0..v-1 with every ticket and every m-subset as one
+# uint64 mask, so "ticket covers subset" is popcount(a & b) >= t over whole arrays:
+#   1. greedy: from random uncovered m-subsets grow candidate tickets through t of their
+#      numbers and keep the one covering the most uncovered subsets, until none is left;
+#   2. local search: drop the ticket that uncovers the least, then repair by swapping one
+#      number of a ticket for one of an uncovered subset (annealed acceptance) within
+#      the time budget; repeat while repairs succeed.
+# Complete designs are cached per (v, k, t, m) in Data/cache/wheels.json and only ever
+# replaced by smaller ones. A cached design is returned as is with seconds=0 (or when it
+# meets the Schönheim bound) and is otherwise the start of the next search.
+
+import itertools, json, math, time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+try:
+    from . import bitset_select, draw_store
+except Exception:
+    from utilities import bitset_select, draw_store  # type: ignore
+
+MAX_V = 32
+MAX_SUBSETS = 250_000
+CANDIDATES = 64       # candidate tickets per greedy step
+MOVES = 16            # swaps scored per local-search step
+TEMPERATURE = 0.2     # annealing temperature (in uncovered subsets)
+
+
+@dataclass(frozen=True)
+class Wheel:
+    pool: Tuple[int, ...]
+    k: int
+    t: int
+    m: int
+    tickets: Tuple[Tuple[int, ...], ...]
+    uncovered: int
+    total: int
+    lower_bound: Optional[int] = None
+    source: str = "search"
+
+    @property
+    def v(self) -> int:
+        return len(self.pool)
+
+    @property
+    def guaranteed(self) -> bool:
+        return self.uncovered == 0
+
+    @property
+    def coverage(self) -> float:
+        return 1.0 - self.uncovered / self.total if self.total else 1.0
+
+    @property
+    def guarantee(self) -> str:
+        txt = f"{len(self.tickets)} tickets: if {self.m} of your {self.v} numbers are drawn, at least one ticket has {self.t}"
+        if not self.guaranteed:
+            txt += f" ({self.coverage:.1%} of cases; search stopped early)"
+        if self.lower_bound:
+            txt += f" (lower bound {self.lower_bound})"
+        return txt
+
+
+def schonheim(v: int, k: int, t: int) -> int:
+    """Schönheim bound: ceil(v/k * ceil((v-1)/(k-1) * ... ceil((v-t+1)/(k-t+1))))."""
+    b = 1
+    for i in range(t - 1, -1, -1):
+        b = -(-(v - i) * b // (k - i))
+    return b
+
+
+@lru_cache(maxsize=16)
+def _subset_masks(v: int, r: int) -> np.ndarray:
+    bits = np.uint64(1) << np.arange(v, dtype=np.uint64)
+    idx = np.fromiter(itertools.chain.from_iterable(itertools.combinations(range(v), r)), dtype=np.int64)
+    return np.bitwise_or.reduce(bits[idx.reshape(-1, r)], axis=1) if r else np.zeros(1, dtype=np.uint64)
+
+
+def _hits(S: np.ndarray, b, t: int) -> np.ndarray:
+    return bitset_select.popcount(S & np.uint64(b)) >= t
+
+
+def _bits(x: int) -> List[int]:
+    return [i for i in range(int(x).bit_length()) if (int(x) >> i) & 1]
+
+
+def _to_mask(block: Sequence[int]) -> int:
+    return sum(1 << int(i) for i in set(block))
+
+
+def _validate(v: int, k: int, t: int, m: int) -> None:
+    if not (1 <= t <= min(k, m) and k <= v and m <= v):
+        raise ValueError(f"need 1 <= t <= min(k, m) and k, m <= v (got v={v}, k={k}, t={t}, m={m})")
+    if v > MAX_V or math.comb(v, m) > MAX_SUBSETS:
+        raise ValueError(f"pool too large for an exact wheel (v={v}, C(v, m)={math.comb(v, m)})")
+
+
+def _grow(seeds: np.ndarray, v: int, k: int, t: int, rng: np.random.Generator) -> np.ndarray:
+    """One random k-ticket per seed subset, holding t numbers of that subset."""
+    inside = (seeds[:, None] >> np.arange(v, dtype=np.uint64)) & np.uint64(1)
+    keys = rng.random((len(seeds), v)) + inside           # seed numbers first
+    first = np.argsort(-keys, axis=1)[:, :t]
+    keys = rng.random((len(seeds), v))
+    np.put_along_axis(keys, first, 2.0, axis=1)           # ... then k - t random others
+    pick = np.argsort(-keys, axis=1)[:, :k].astype(np.uint64)
+    return np.bitwise_or.reduce(np.uint64(1) << pick, axis=1)
+
+
+def _greedy(S: np.ndarray, v: int, k: int, t: int, rng: np.random.Generator) -> List[int]:
+    cnt = np.zeros(len(S), dtype=np.int32)
+    blocks: List[int] = []
+    while True:
+        U = S[cnt == 0]
+        if not len(U):
+            return blocks
+        C = _grow(U[rng.integers(len(U), size=CANDIDATES)], v, k, t, rng)
+        gain = (bitset_select.popcount(U[:, None] & C[None, :]) >= t).sum(axis=0)
+        b = int(C[int(np.argmax(gain))])
+        blocks.append(b)
+        cnt += _hits(S, b, t)
+
+
+def _repair(S: np.ndarray, B: List[int], cnt: np.ndarray, t: int, rng: np.random.Generator, deadline: float) -> bool:
+    """Swap numbers in B until every subset is covered (True) or time runs out (False).
+
+    Each step takes a random uncovered subset s, the tickets sharing the most numbers with it,
+    and scores every "one number out, one number of s in" swap on them (up to MOVES) at once.
+    """
+    Bn = np.array(B, dtype=np.uint64)
+    try:
+        while time.perf_counter() < deadline:
+            unc = np.flatnonzero(cnt == 0)
+            if not len(unc):
+                return True
+            s = int(S[unc[rng.integers(len(unc))]])
+            ov = bitset_select.popcount(Bn & np.uint64(s))
+            idx, nbs = [], []
+            for i in np.flatnonzero(ov == ov.max()):
+                b = int(Bn[i])
+                for o in _bits(b & ~s):
+                    for n in _bits(s & ~b):
+                        idx.append(i); nbs.append(b ^ (1 << o) ^ (1 << n))
+            if len(idx) > MOVES:
+                keep = rng.choice(len(idx), MOVES, replace=False)
+                idx, nbs = [idx[j] for j in keep], [nbs[j] for j in keep]
+            idx = np.array(idx)
+            old = bitset_select.popcount(S[None, :] & Bn[idx][:, None]) >= t
+            new = bitset_select.popcount(S[None, :] & np.array(nbs, dtype=np.uint64)[:, None]) >= t
+            delta = ((cnt == 1) & old & ~new).sum(axis=1) - ((cnt == 0) & new & ~old).sum(axis=1)
+            best = np.flatnonzero(delta == delta.min())
+            j = int(best[rng.integers(len(best))])
+            if delta[j] <= 0 or rng.random() < math.exp(-float(delta[j]) / TEMPERATURE):
+                cnt += new[j].astype(np.int32) - old[j].astype(np.int32)
+                Bn[idx[j]] = nbs[j]
+        return not (cnt == 0).any()
+    finally:
+        B[:] = [int(x) for x in Bn]
+
+
+def _shrink(S: np.ndarray, blocks: List[int], t: int, floor: int, rng: np.random.Generator, deadline: float) -> List[int]:
+    best = list(blocks)
+    while len(best) > max(1, floor) and time.perf_counter() < deadline:
+        H = bitset_select.popcount(S[:, None] & np.array(best, dtype=np.uint64)[None, :]) >= t
+        cnt = H.sum(axis=1).astype(np.int32)
+        j = int(np.argmin((H & (cnt == 1)[:, None]).sum(axis=0)))
+        cur = best[:j] + best[j + 1:]
+        cnt -= H[:, j]
+        if not _repair(S, cur, cnt, t, rng, deadline):
+            break
+        best = cur
+    return best
+
+
+# ---------- disk cache ----------
+
+def _cache_path() -> Path:
+    return draw_store.data_dir() / "cache" / "wheels.json"
+
+
+def _read_cache() -> Dict[str, List[List[int]]]:
+    p = _cache_path()
+    try:
+        return json.loads(p.read_text(encoding="utf-8")) if p.exists() else {}
+    except Exception:
+        return {}
+
+
+def _write_cache(key: str, blocks: List[List[int]]) -> None:
+    p = _cache_path()
+    try:
+        data = _read_cache()
+        if key in data and len(data[key]) <= len(blocks):
+            return
+        data[key] = blocks
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_suffix(p.suffix + ".tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        tmp.replace(p)
+    except Exception:
+        pass
+
+
+def _design(v: int, k: int, t: int, m: int, seconds: float, seed: Optional[int], use_cache: bool) -> Tuple[List[int], str]:
+    if k == v:
+        return [(1 << v) - 1], "trivial"
+    S = _subset_masks(v, m)
+    key = f"{v}-{k}-{t}-{m}"
+    cached = None
+    if use_cache:
+        rows = _read_cache().get(key)
+        if rows and all(len(set(r)) == k and 0 <= min(r) and max(r) < v for r in rows):
+            masks = [_to_mask(r) for r in rows]
+            if _uncovered(S, masks, t) == 0:
+                cached = masks
+    rng = np.random.default_rng(seed)
+    floor = schonheim(v, k, t) if m == t else 1
+    if cached is not None and (len(cached) <= floor or seconds <= 0):
+        return cached, "cache"
+    deadline = time.perf_counter() + max(0.0, float(seconds))
+    # a cached design is the starting point, so every run can only improve on it
+    found = _shrink(S, list(cached) if cached is not None else _greedy(S, v, k, t, rng), t, floor, rng, deadline)
+    if cached is not None and len(cached) <= len(found):
+        return cached, "cache"
+    if use_cache:
+        _write_cache(key, [_bits(b) for b in found])
+    return found, "search"
+
+
+def _uncovered(S: np.ndarray, masks: Sequence[int], t: int) -> int:
+    covered = np.zeros(len(S), dtype=bool)
+    for b in masks:
+        covered |= _hits(S, b, t)
+    return int((~covered).sum())
+
+
+def _pool(pool: Union[int, Sequence[int]]) -> Tuple[int, ...]:
+    if isinstance(pool, (int, np.integer)):
+        return tuple(range(1, int(pool) + 1))
+    return tuple(sorted({int(x) for x in pool}))
+
+
+def wheel(pool: Union[int, Sequence[int]], k: int, t: int, m: Optional[int] = None, *,
+          seconds: float = 2.0, seed: Optional[int] = None, use_cache: bool = True) -> Wheel:
+    """Wheel over `pool` (numbers, or v for 1..v); `seconds` bounds the local search."""
+    nums = _pool(pool)
+    v, k, t = len(nums), int(k), int(t)
+    m = t if m is None else int(m)
+    _validate(v, k, t, m)
+    blocks, source = _design(v, k, t, m, seconds, seed, use_cache)
+    tickets = tuple(sorted(tuple(nums[i] for i in _bits(b)) for b in blocks))
+    return Wheel(pool=nums, k=k, t=t, m=m, tickets=tickets,
+                 uncovered=_uncovered(_subset_masks(v, m), blocks, t), total=math.comb(v, m),
+                 lower_bound=schonheim(v, k, t) if m == t else None, source=source)
+
+
+def check(tickets: Sequence[Sequence[int]], pool: Union[int, Sequence[int]], t: int, m: Optional[int] = None) -> Tuple[int, int]:
+    """(uncovered, total) m-subsets of `pool` for arbitrary tickets (numbers off the pool ignored)."""
+    nums = _pool(pool)
+    m = int(t) if m is None else int(m)
+    _validate(len(nums), max(int(t), 1), int(t), m)
+    pos = {n: i for i, n in enumerate(nums)}
+    masks = [_to_mask([pos[int(x)] for x in tk if int(x) in pos]) for tk in tickets]
+    S = _subset_masks(len(nums), m)
+    return _uncovered(S, masks, int(t)), len(S)
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from pathlib import Path
+import os
+PROJECT_DIR = Path(__file__).resolve().parent
+(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
+(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
+
+# History utilities for AstroLotto (frequency, gaps, heatmaps, pairs, triplets, streaks, time-window filter)
+from pathlib import Path
+from typing import Tuple, List, Optional
+import numpy as np, pandas as pd
+try:
+    from utilities import draw_store, freq_engine, gap_engine, cooc_engine
+except Exception:  # pragma: no cover
+    draw_store = freq_engine = gap_engine = cooc_engine = None
+
+def project_root_from_page(file_path: str) -> Path:
+    """Return the project root directory given the path to a page module.
+
+    Pages live two levels beneath the project root in the
+    ``programs/pages`` directory.  Earlier versions searched for a
+    capitalised ``Program`` directory; on case‑sensitive systems this
+    fails if only the lower‑case ``programs`` package exists.  This
+    implementation climbs the directory tree until it finds a folder
+    named either ``programs`` or ``Program`` (case‑insensitive) and
+    returns its parent.  As a fallback, if no such folder is found it
+    returns two levels up from the supplied file path.
+    """
+    p = Path(file_path).resolve()
+    q = p
+    while q.parent != q:
+        if q.name.lower() in ("programs", "program"):
+            return q.parent
+        q = q.parent
+    # Fallback: assume file is ``programs/pages/<page>.py`` and return
+    # the grandparent directory.  This mirrors the earlier behaviour
+    # where the project root was two levels up from the page file.
+    return p.parent.parent
+
+def load_cached_dataframe(root: Path, game_key: str) -> pd.DataFrame:
+    paths = {
+        "powerball": root / "Data" / "cached_powerball_data.csv",
+        "megamillions": root / "Data" / "cached_megamillions_data.csv",
+        "cash5": root / "Data" / "cached_cash5_data.csv",
+        "luckyforlife": root / "Data" / "cached_luckyforlife_data.csv",
+        "colorado": root / "Data" / "cached_colorado_lottery_data.csv",
+        "pick3": root / "Data" / "cached_pick3_data.csv",
+    }
+    path = paths.get(game_key)
+    if not path or not path.exists():
+        raise FileNotFoundError(f"Cached data for {game_key!r} not found at {path}")
+    df = pd.read_csv(path)
+    df.columns = [c.strip().lower() for c in df.columns]
+    if "draw_date" in df.columns:
+        try: df["draw_date"] = pd.to_datetime(df["draw_date"])
+        except Exception: pass
+    return df
+
+def load_draws(root: Path, game_key: str):
+    """Canonical draw matrix for a game (draw_store cache next to the cached CSV)."""
+    if draw_store is None:
+        raise ImportError("utilities.draw_store unavailable")
+    d = draw_store.load(game_key, Path(root) / "Data")
+    if d.n == 0:
+        raise FileNotFoundError(f"Cached data for {game_key!r} not found under {root}")
+    return d
+
+def extract_numbers(df) -> Tuple[np.ndarray, List[str]]:
+    if draw_store is not None and isinstance(df, draw_store.Draws):
+        return np.asarray(df.whites, dtype=int), draw_store.white_names(df)
+    white_cols = [c for c in df.columns if c.startswith("white")]
+    n_cols = [c for c in df.columns if (c.startswith("n") and c[1:].isdigit())]
+    if white_cols:
+        cols = sorted(white_cols, key=lambda x: int(x.replace("white","")))
+    elif n_cols:
+        cols = sorted(n_cols, key=lambda x: int(x[1:]))
+    else:
+        guess = [c for c in df.columns if c in ("num1","num2","num3","num4","num5","num6")]
+        cols = guess or []
+    if not cols:
+        raise ValueError("Could not detect number columns in dataframe.")
+    arr = df[cols].to_numpy(dtype=float)
+    arr = arr[~np.isnan(arr).any(axis=1)]
+    return arr.astype(int), cols
+
+def number_range_for_game(game_key: str, arr: Optional[np.ndarray] = None) -> int:
+    ranges = {"powerball":69,"megamillions":70,"cash5":32,"luckyforlife":48,"colorado":40,"pick3":10}
+    if game_key in ranges: return ranges[game_key]
+    if arr is not None: return int(np.nanmax(arr))
+    return 70
+
+def frequency_table(arr, max_n: int) -> pd.DataFrame:
+    """Counts per number 1..max_n; `arr` is a white matrix or a draw_store.Draws."""
+    if draw_store is not None and isinstance(arr, draw_store.Draws):
+        c = freq_engine.counts(arr).astype(int)
+        counts = np.zeros(max_n+1, dtype=int)
+        counts[:min(len(c), max_n+1)] = c[:max_n+1]
+        counts = counts[1:max_n+1]
+    else:
+        flat = np.asarray(arr, dtype=int).flatten()
+        flat = flat[(flat >= 0) & (flat <= max_n)]
+        counts = np.bincount(flat, minlength=max_n+1)[1:max_n+1]
+    idx = np.arange(1, max_n+1)
+    df = pd.DataFrame({"number": idx, "count": counts})
+    df["rank"] = df["count"].rank(method="dense", ascending=False).astype(int)
+    return df.sort_values(["count","number"], ascending=[False, True]).reset_index(drop=True)
+
+def position_heatmap(arr, max_n: int) -> np.ndarray:
+    """(positions x max_n) counts of number n at draw position pos."""
+    if draw_store is not None and isinstance(arr, draw_store.Draws):
+        arr = arr.whites
+    arr = np.asarray(arr, dtype=int)
+    positions = arr.shape[1]
+    pos = np.broadcast_to(np.arange(positions), arr.shape).ravel()
+    flat = arr.ravel()
+    ok = (flat >= 1) & (flat <= max_n)
+    heat = np.bincount(pos[ok] * max_n + flat[ok] - 1, minlength=positions * max_n)
+    return heat.reshape(positions, max_n).astype(int)
+
+def gap_distribution(arr, max_n: int) -> pd.DataFrame:
+    """Pooled histogram of gaps (in draws) between repeat sightings of numbers 1..max_n."""
+    if draw_store is not None and isinstance(arr, draw_store.Draws) and arr.white_min == 1 and arr.white_max == max_n:
+        dist = gap_engine.stats(arr).distribution()
+    elif gap_engine is not None:
+        if draw_store is not None and isinstance(arr, draw_store.Draws):
+            arr = arr.whites
+        dist = gap_engine.from_matrix(np.asarray(arr, dtype=int), 1, max_n).distribution()
+    else:
+        raise ImportError("utilities.gap_engine unavailable")
+    return dist if not dist.empty else pd.DataFrame({"gap":[], "count":[]})
+
+def top_pairs(arr, top_k: int = 20):
+    """Most frequent pairs (X^T X over the one-hot draw matrix); `arr` may be a Draws."""
+    if cooc_engine is None:
+        raise ImportError("utilities.cooc_engine unavailable")
+    if draw_store is not None and isinstance(arr, draw_store.Draws):
+        items = cooc_engine.matrix(arr).top(top_k)
+    else:
+        items = cooc_engine.from_matrix(np.asarray(arr, dtype=int)).top(top_k)
+    if not items: return pd.DataFrame({"pair":[], "count":[]})
+    return pd.DataFrame({"pair": [f"{a}-{b}" for (a,b),_ in items], "count": [int(c) for _,c in items]})
+
+def top_triplets(arr, top_k: int = 20):
+    """Most frequent triplets (blocked co-occurrence, see utilities/cooc_engine)."""
+    if cooc_engine is None:
+        raise ImportError("utilities.cooc_engine unavailable")
+    items = cooc_engine.triplets(arr, top_k)
+    if not items: return pd.DataFrame({"triplet":[], "count":[]})
+    return pd.DataFrame({"triplet": [f"{a}-{b}-{c}" for (a,b,c),_ in items], "count": [cnt for _,cnt in items]})
+
+def compute_streaks(arr: np.ndarray, max_n: int) -> pd.DataFrame:
+    draws = [set(r.tolist()) for r in arr]
+    seen = {n: [] for n in range(1, max_n+1)}
+    for s in draws:
+        for n in range(1, max_n+1):
+            seen[n].append(1 if n in s else 0)
+    hot, cold = [], []
+    for n, seq in seen.items():
+        r = 0; m1 = 0; m0 = 0; r0 = 0
+        for v in seq:
+            if v: r += 1; m1 = max(m1, r); r0 = 0
+            else: r0 += 1; m0 = max(m0, r0); r = 0
+        hot.append((n, m1)); cold.append((n, m0))
+    import pandas as pd
+    return pd.DataFrame(hot, columns=["number","longest_hot"]).merge(pd.DataFrame(cold, columns=["number","longest_cold"]), on="number")
+
+def filter_time_window(df: pd.DataFrame, days: Optional[int]) -> pd.DataFrame:
+    if not days or "draw_date" not in df.columns: return df
+    cutoff = pd.Timestamp.utcnow().tz_localize(None) - pd.Timedelta(days=int(days))
+    return df[df["draw_date"] >= cutoff].reset_index(drop=True)
@@ -1,13 +1,10 @@
 from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
 # app_main.py — BreakoutBuddy (hardened, 8 tabs, dropdown quick explain, rank_now dict fix)
 
+import time
+_BOOT_T0 = time.perf_counter()
+
 from pathlib import Path
 import os, sys
 
@@ -33,16 +30,16 @@ for p in [str(MODULES_DIR), str(PROGRAM_DIR)]:
     if p not in sys.path:
         sys.path.insert(0, p)
 
-DATA_DIR   = Path(os.environ.get("BREAKOUTBUDDY_DATA",   str(APP_ROOT / "Data"))).resolve()
-EXTRAS_DIR = Path(os.environ.get("BREAKOUTBUDDY_EXTRAS", str(APP_ROOT / "extras"))).resolve()
-DATA_DIR.mkdir(parents=True, exist_ok=True)
-EXTRAS_DIR.mkdir(parents=True, exist_ok=True)
+# Data/extras come from the process-wide path service (resolved once, cached).
+from modules.services import paths as bb_paths
+from modules.services import startup_profile
 
-DB_PATH = DATA_DIR / "breakoutbuddy.duckdb"
+DATA_DIR   = bb_paths.data_dir()
+EXTRAS_DIR = bb_paths.extras_dir()
+DB_PATH    = bb_paths.db_path()
 # ---------- end resolver ----------
 
 # ---------- Runtime imports ----------
-import duckdb
 import pandas as pd
 import streamlit as st
 
@@ -52,9 +49,16 @@ st.caption("BB build: 2025-09-19 (hardened + tabs + dropdown + rank_now dict fix
 
 # Core modules/services
 from modules import data as data_mod
-from modules import regime as regime_mod
 from modules.services import enrich as enrich_svc
 from modules.services import scoring as scoring_svc
+from modules.services import app_cache
+
+# Daily DB retention/checkpoint, off the render path (no-op when already run today).
+try:
+    from modules.services import db_lifecycle
+    db_lifecycle.start_background(every_hours=24.0)
+except Exception:
+    pass
 
 # Agents (safe import for Cloud)
 HAS_AGENTS = False
@@ -106,7 +110,7 @@ from modules.ui import plain_english as pe_ui
 from modules.ui.single_ticker_analyzer import render as render_single_ticker
 
 # ---------- DB ----------
-conn = duckdb.connect(str(DB_PATH))
+conn = app_cache.get_connection(DB_PATH)
 
 # ---------- Helpers ----------
 def _settings_to_dict(s: object) -> dict:
@@ -125,7 +129,7 @@ def _settings_to_dict(s: object) -> dict:
 
 # ---------- Thin wrappers used by tabs ----------
 def list_universe_fn(n: int):
-    return data_mod.list_universe(n)
+    return app_cache.list_universe(n)
 
 def pull_enriched_snapshot_fn(tickers):
     return data_mod.pull_enriched_snapshot(tickers)
@@ -152,7 +156,7 @@ def analyze_one_fn(ticker: str = "", *, model=None, prior: float | None = None,
         return pd.DataFrame()
 
 def compute_regime_fn() -> dict:
-    return regime_mod.compute_regime()
+    return app_cache.compute_regime()
 
 def rank_now_fn(universe_size=None, top_n: int = 25, sort_by: str | None = None,
                 agent_weight: float | None = None, settings: SidebarSettings | None = None, **kwargs):
@@ -180,7 +184,7 @@ def rank_now_fn(universe_size=None, top_n: int = 25, sort_by: str | None = None,
     settings_dict = _settings_to_dict(settings)
 
     # IMPORTANT: pass ONLY one positional arg (dict)
-    snap, regime, ranked, auc, model = scoring_svc.rank_now(settings_dict)
+    snap, regime, ranked, auc, model = app_cache.rank_now(settings_dict)
 
     # Optional resort
     if sort_by:
@@ -258,3 +262,8 @@ with tabs[6]:
 
 with tabs[7]:
     render_about_tab(data_dir=DATA_DIR, db_path=DB_PATH)
+
+# ---------- Startup timing ----------
+_paint_ms = (time.perf_counter() - _BOOT_T0) * 1000.0
+if startup_profile.record_first_paint(_paint_ms):
+    st.session_state["bb_first_paint_ms"] = round(_paint_ms, 1)
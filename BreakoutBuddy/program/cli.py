@@ -1,82 +1,6 @@
 from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
-from pathlib import Path
-
-# ---------- Strict per-app Data/Extras resolver (BreakoutBuddy) ----------
-from pathlib import Path
-import os, sys
-BB_HERE     = Path(__file__).resolve()
-BB_APP_ROOT = BB_HERE.parents[1]   # .../BreakoutBuddy
-
-def _bb_cloud_roots():
-    h = Path.home()
-    return [
-        h / "OneDrive",
-        h / "OneDrive - Personal",
-        h / "OneDrive - Wagstaff Law Firm",
-        h / "Dropbox",
-        h / "Google Drive",
-        h / "Library" / "CloudStorage" / "OneDrive",
-        h / "Library" / "CloudStorage" / "Dropbox",
-        h / "Library" / "CloudStorage" / "GoogleDrive",
-    ]
-
-def _bb_first_existing(paths):
-    for p in paths:
-        try:
-            p2 = Path(p).expanduser().resolve()
-            if p2.exists():
-                return p2
-        except Exception:
-            pass
-    return None
-
-def bb_resolve_dir(preferred_env_var: str, fallback_name: str):
-    """
-    Strict per-app order (NO repo-level fallback):
-      1) Env var (abs or relative)
-      2) BB_APP_ROOT/<name>
-      3) CWD/<name>
-      4) Cloud roots: <BreakoutBuddy>/<name>
-      5) Create BB_APP_ROOT/<name>
-    """
-    envv = os.environ.get(preferred_env_var, "").strip()
-    if envv:
-        cand = (Path(envv) if os.path.isabs(envv) else (Path.cwd() / envv))
-        if cand.exists():
-            return cand.resolve()
-
-    hit = _bb_first_existing([BB_APP_ROOT / fallback_name, Path.cwd() / fallback_name])
-    if hit:
-        return hit
-
-    cands = []
-    for root in _bb_cloud_roots():
-        cands += [
-            root / BB_APP_ROOT.name / fallback_name,
-            root / "Projects" / BB_APP_ROOT.name / fallback_name,
-        ]
-    hit = _bb_first_existing(cands)
-    if hit:
-        return hit
-
-    target = (BB_APP_ROOT / fallback_name).resolve()
-    target.mkdir(parents=True, exist_ok=True)
-    return target
-
-BB_DATA   = bb_resolve_dir("BREAKOUTBUDDY_DATA",   "Data")
-BB_EXTRAS = bb_resolve_dir("BREAKOUTBUDDY_EXTRAS", "extras")
-
-bb_extras_src = (BB_EXTRAS / "src")
-if bb_extras_src.exists() and str(bb_extras_src) not in sys.path:
-    sys.path.insert(0, str(bb_extras_src))
-# ---------- end resolver ----------
+from .modules.services.paths import BB_DATA
 
 import argparse, sys, asyncio, json, pandas as pd
 from .modules.agents.orchestrator import AgentOrchestrator
@@ -119,6 +43,106 @@ def cmd_show_weights(args):
     w = latest_weights()
     print(json.dumps(w or {}, indent=2))
 
+def cmd_profile_imports(args):
+    from .modules.services import startup_profile
+    mods = [m.strip() for m in args.modules.split(",") if m.strip()] or None
+    rep = startup_profile.profile_imports(mods, top=args.top, sort_by=args.sort, record=not args.no_record)
+    print(startup_profile.format_report(rep))
+
+def cmd_montecarlo(args):
+    from .modules import montecarlo as mc
+    symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+    targets = [float(t) / 100.0 for t in args.targets.split(",") if t.strip()]
+    res = mc.simulate_universe(symbols, n_paths=args.paths, horizon=args.horizon, method=args.method,
+                               targets=targets or mc.DEFAULT_TARGETS, seed=args.seed)
+    _print(res.to_frame().round(4))
+
+def cmd_learner_train(args):
+    from .modules import learner
+    out = learner.train_incremental(horizon_days=args.horizon, target_pct=args.target,
+                                    chunk_rows=args.chunk_rows, holdout_days=args.holdout_days, reset=args.reset)
+    print(json.dumps(out, indent=2, default=str))
+
+def cmd_replay(args):
+    from .modules import intraday
+    if args.bench:
+        out = intraday.benchmark(args.bench, args.bars, top_n=args.top, seed=args.seed)
+    else:
+        if args.file:
+            bars = intraday.load_replay(args.file)
+        else:
+            symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+            bars = intraday.from_cache(symbols, interval=args.interval, period=args.period)
+        on_event = (lambda e: print(f"{e.ts} {e.kind:5} {e.ticker:8} {e.prev_rank} -> {e.rank}  {e.score:.2f}")) \
+            if args.events else None
+        out = intraday.run_replay(bars, top_n=args.top, speed=args.speed, on_event=on_event)
+        rk = out.pop("ranker")
+        _print(rk.snapshot().head(args.top).round(3))
+    print(json.dumps(out, indent=2, default=str))
+
+def cmd_bench(args):
+    from .modules.bench import suite
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()] or None
+    df = suite.run_suite(sizes, seed=args.seed, repeat=args.repeat, stages=stages,
+                         record=not args.no_record, progress=print)
+    _print(df[["size", "stage", "seconds", "per_ticker_ms", "rows"]])
+
+def cmd_bench_compare(args):
+    from .modules.bench import suite
+    cmp = suite.compare(args.current or None, args.baseline or None, threshold=args.threshold / 100.0,
+                        min_seconds=args.min_seconds)
+    if cmp.empty:
+        print("Need two recorded runs to compare (see Data/perf/bench_history.csv).")
+        return
+    print(f"baseline {cmp.attrs.get('baseline')}  ->  current {cmp.attrs.get('current')}")
+    _print(cmp)
+    bad = cmp[cmp["regression"]]
+    if not bad.empty:
+        print(f"{len(bad)} stage(s) slower than +{args.threshold:g}%")
+        sys.exit(1)
+
+def cmd_market_record(args):
+    from .modules.services import market_data
+    symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+    if args.universe_csv:
+        u = pd.read_csv(args.universe_csv)
+        if "Ticker" in u.columns:
+            symbols += u["Ticker"].dropna().astype(str).str.upper().head(args.limit).tolist()
+    market_data.set_mode("record", archive=args.archive or None)
+    out = market_data.record_universe(list(dict.fromkeys(symbols)), progress=lambda t: print("recorded", t))
+    print(json.dumps(out, indent=2))
+
+def cmd_market_synthetic(args):
+    from .modules.bench import synthetic
+    panel = synthetic.make_panel(args.size, seed=args.seed)
+    print(json.dumps(synthetic.write_archive(panel, args.archive or None), indent=2))
+
+def cmd_walkforward(args):
+    from .modules import walkforward as wf
+    ks = [int(k) for k in args.k.split(",") if k.strip()]
+    hs = [int(h) for h in args.horizons.split(",") if h.strip()]
+    engines = [e.strip() for e in args.engines.split(",") if e.strip()] or None
+    res = wf.run(args.db or None, k=ks, horizons=hs, horizon_days=args.horizon, target_pct=args.target,
+                 engines=engines, workers=args.workers, start=args.start or None, end=args.end or None,
+                 resume=not args.fresh, progress=print)
+    if res.empty:
+        print("No labelled history to replay (features_history / features_labels).")
+        return
+    print("checkpoint:", res.attrs.get("checkpoint"))
+    _print(wf.summary(res))
+
+def cmd_db_maintain(args):
+    from .modules.services import db_lifecycle as dbl
+    if args.report:
+        for db in dbl.databases():
+            _print(dbl.growth(db, days=args.days))
+        return
+    mode = True if args.rewrite else (False if args.no_rewrite else "auto")
+    for db in dbl.databases():
+        print(json.dumps(dbl.maintain(db, rewrite_mode=mode), indent=2, default=str))
+        _print(dbl.growth(db, days=args.days))
+
 def main():
     p = argparse.ArgumentParser(prog="BreakoutBuddy CLI")
     sub = p.add_subparsers(dest="cmd", required=True)
@@ -137,6 +161,91 @@ def main():
     w = sub.add_parser("show-weights")
     w.set_defaults(func=cmd_show_weights)
 
+    pi = sub.add_parser("profile-imports", help="List the slowest imports on a cold start")
+    pi.add_argument("--top", type=int, default=25)
+    pi.add_argument("--sort", default="cumulative_ms", choices=["cumulative_ms", "self_ms"])
+    pi.add_argument("--modules", default="", help="Comma-separated modules (default: app_main's import set)")
+    pi.add_argument("--no-record", action="store_true", help="Don't append to Data/perf/startup_history.csv")
+    pi.set_defaults(func=cmd_profile_imports)
+
+    m = sub.add_parser("montecarlo", help="Monte Carlo breakout odds from daily history")
+    m.add_argument("--symbols", default="AAPL,MSFT,SPY")
+    m.add_argument("--paths", type=int, default=10_000)
+    m.add_argument("--horizon", type=int, default=20, help="Trading days")
+    m.add_argument("--method", default="bootstrap", choices=["bootstrap", "gbm"])
+    m.add_argument("--targets", default="3,5,10", help="Comma-separated % moves")
+    m.add_argument("--seed", type=int, default=None)
+    m.set_defaults(func=cmd_montecarlo)
+
+    lt = sub.add_parser("learner-train", help="Incremental retrain from features_history (new rows only)")
+    lt.add_argument("--horizon", type=int, default=5)
+    lt.add_argument("--target", type=float, default=3.0)
+    lt.add_argument("--chunk-rows", type=int, default=50_000)
+    lt.add_argument("--holdout-days", type=int, default=10)
+    lt.add_argument("--reset", action="store_true", help="Ignore the saved model and start over")
+    lt.set_defaults(func=cmd_learner_train)
+
+    rp = sub.add_parser("replay", help="Replay intraday bars through the streaming ranker")
+    rp.add_argument("--file", default="", help="CSV/parquet bars (Datetime, Ticker, OHLCV)")
+    rp.add_argument("--symbols", default="AAPL,MSFT,SPY", help="Used with the cache when --file is not given")
+    rp.add_argument("--interval", default="5m", choices=["1m", "5m"])
+    rp.add_argument("--period", default="5d")
+    rp.add_argument("--top", type=int, default=25)
+    rp.add_argument("--speed", type=float, default=None, help="Bar-time seconds per wall second (default: flat out)")
+    rp.add_argument("--events", action="store_true", help="Print each ranking event")
+    rp.add_argument("--bench", type=int, default=0, help="Synthetic session with this many symbols instead")
+    rp.add_argument("--bars", type=int, default=390, help="Bars per symbol for --bench")
+    rp.add_argument("--seed", type=int, default=0)
+    rp.set_defaults(func=cmd_replay)
+
+    bn = sub.add_parser("bench", help="Time scan stages on a synthetic market (no network)")
+    bn.add_argument("--sizes", default="50,500,5000", help="Comma-separated universe sizes")
+    bn.add_argument("--stages", default="", help="Comma-separated subset of stages (default: all)")
+    bn.add_argument("--repeat", type=int, default=1)
+    bn.add_argument("--seed", type=int, default=0)
+    bn.add_argument("--no-record", action="store_true", help="Don't append to Data/perf/bench_history.csv")
+    bn.set_defaults(func=cmd_bench)
+
+    bc = sub.add_parser("bench-compare", help="Flag stages that got slower between two bench runs")
+    bc.add_argument("--baseline", default="", help="Run id (default: the run before --current)")
+    bc.add_argument("--current", default="", help="Run id (default: latest)")
+    bc.add_argument("--threshold", type=float, default=15.0, help="Allowed slowdown in %%")
+    bc.add_argument("--min-seconds", type=float, default=0.005)
+    bc.set_defaults(func=cmd_bench_compare)
+
+    mr = sub.add_parser("market-record", help="Record yfinance responses for offline replay (BB_MARKET_DATA=replay)")
+    mr.add_argument("--symbols", default="SPY,^VIX,AAPL,MSFT")
+    mr.add_argument("--universe-csv", default="", help="Also record the head of this CSV's Ticker column")
+    mr.add_argument("--limit", type=int, default=500)
+    mr.add_argument("--archive", default="", help="Default: Data/cache/market_archive.zip or BB_MARKET_ARCHIVE")
+    mr.set_defaults(func=cmd_market_record)
+
+    ms = sub.add_parser("market-synthetic", help="Fill the replay archive with a seeded synthetic market")
+    ms.add_argument("--size", type=int, default=500)
+    ms.add_argument("--seed", type=int, default=0)
+    ms.add_argument("--archive", default="")
+    ms.set_defaults(func=cmd_market_synthetic)
+
+    wf = sub.add_parser("walkforward", help="Replay the rankers over every stored as-of date (P@K, decay, turnover)")
+    wf.add_argument("--db", default="", help="Default: Data/breakoutbuddy.duckdb")
+    wf.add_argument("--k", default="10,20")
+    wf.add_argument("--horizons", default="1,2,3,5,10", help="Hit-rate decay horizons (days)")
+    wf.add_argument("--horizon", type=int, default=5, help="Horizon for P@K")
+    wf.add_argument("--target", type=float, default=3.0, help="Hit = +target%% within the horizon")
+    wf.add_argument("--engines", default="", help="Default: combined, blended and every stored flag")
+    wf.add_argument("--workers", type=int, default=None)
+    wf.add_argument("--start", default="")
+    wf.add_argument("--end", default="")
+    wf.add_argument("--fresh", action="store_true", help="Ignore the checkpoint and start over")
+    wf.set_defaults(func=cmd_walkforward)
+
+    dm = sub.add_parser("db-maintain", help="Apply DB retention, downsample features_history, checkpoint, rewrite")
+    dm.add_argument("--rewrite", action="store_true", help="Always rewrite the file (default: when mostly free blocks)")
+    dm.add_argument("--no-rewrite", action="store_true")
+    dm.add_argument("--report", action="store_true", help="Only print per-table sizes and growth")
+    dm.add_argument("--days", type=int, default=7, help="Growth window (days)")
+    dm.set_defaults(func=cmd_db_maintain)
+
     args = p.parse_args()
     args.func(args)
 
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
 import math
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from modules.rules import Rule, evaluate, fmt, or_default, or_nan, present, ratio_safe
 
 def _pct(x):
     try:
@@ -95,6 +95,13 @@ def make_ticker_advice(row, regime: dict | None = None) -> dict:
 
     headline = f"{' / '.join(style).capitalize()} — {rating:.1f}★ | Model pop odds ≈ {pup:.0%} | Score {fscore:.3f}"
 
+    # Monte Carlo odds (montecarlo.simulate().to_frame() columns), when the row has them
+    mc_hit = r.get("MC_PHit_5%")
+    if mc_hit is not None and not (isinstance(mc_hit, float) and math.isnan(mc_hit)):
+        mc_hit = float(mc_hit)
+        if mc_hit >= 0.5: pros.append(f"Simulated paths touch +5% in {mc_hit:.0%} of cases")
+        elif mc_hit < 0.25: cons.append(f"Only {mc_hit:.0%} of simulated paths reach +5%")
+
     context_bits = []
     if regime:
         try:
@@ -104,6 +111,12 @@ def make_ticker_advice(row, regime: dict | None = None) -> dict:
             context_bits.append(f"SPY 20d trend {tr:+.2%}, vol {vol:.2%}, 200d slope {slope:+.3f}")
         except Exception:
             pass
+    try:
+        q05, q95 = r.get("MC_Q05"), r.get("MC_Q95")
+        if q05 is not None and q95 is not None and not math.isnan(float(q05)):
+            context_bits.append(f"MC 5–95% range {float(q05):.2f}–{float(q95):.2f}")
+    except Exception:
+        pass
     context = " | ".join(context_bits) if context_bits else ""
 
     return {
@@ -113,3 +126,99 @@ def make_ticker_advice(row, regime: dict | None = None) -> dict:
         "cons": cons,
         "context": context,
     }
+
+
+# ---------- whole-frame version ----------
+# Same rules as make_ticker_advice, as a table evaluated with masks over the frame.
+# advise_frame(df).loc[i] matches make_ticker_advice(df.loc[i]) field for field.
+
+ADVICE_RULES = [
+    Rule("rsi2_extreme", "pros", lambda c: c.rsi2 < 5, "RSI2 extremely low (<5): bounce-friendly oversold", "rsi2"),
+    Rule("rsi2_low", "pros", lambda c: c.rsi2 < 10, "RSI2 low (<10): mild oversold tailwind", "rsi2"),
+    Rule("rsi4_low", "pros", lambda c: c.rsi4 < 20, "RSI4 under 20: short-term weakness that often mean-reverts"),
+    Rule("crsi_low", "pros", lambda c: c.crsi < 25, "ConnorsRSI <25: composite oversold score"),
+    Rule("rel_pos", "pros", lambda c: c.rel > 0, "Outperforming SPY recently (RelSPY > 0)"),
+    Rule("rvol_high", "pros", lambda c: c.rvol >= 1.5, fmt("Elevated volume (RVOL ≈ {:.2f}) → attention/liquidity", "rvol"), "rvol"),
+    Rule("rvol_up", "pros", lambda c: c.rvol >= 1.1, fmt("Slight volume uptick (RVOL ≈ {:.2f})", "rvol"), "rvol"),
+    Rule("squeeze", "pros", lambda c: c.squeeze >= 0.5, "Squeeze/vol compression hint present"),
+    Rule("down_day", "pros", lambda c: c.chg <= -2.0, fmt("Down {:.2f}% today: potential mean-reversion setup", "chg")),
+    Rule("above_200d", "pros", lambda c: c.p200 >= 0, "Above 200‑day trend"),
+    Rule("below_200d", "cons", lambda c: c.p200 <= -5, fmt("{:.1f}% below 200‑day trend: fragile trend context", "p200")),
+    Rule("rel_neg", "cons", lambda c: c.rel < 0, "Underperforming SPY recently (RelSPY < 0)"),
+    Rule("rsi2_hot", "cons", lambda c: c.rsi2 > 80, "RSI2 very high (>80): overbought risk"),
+    Rule("crowded", "cons", lambda c: c.crowd > 1.5, fmt("Crowded name (CrowdRisk ≈ {:.2f})", "crowd")),
+    Rule("chase", "cons", lambda c: c.chase >= 0.7, fmt("Retail chase risk high ({:.2f})", "chase")),
+    Rule("high_vol", "cons", lambda c: c.atr_ratio > 0.05, fmt("Volatility high (ATR ≈ {:.1f}% of price)", "atr_pct")),
+    Rule("mc_touch", "pros", lambda c: c.mc_hit >= 0.5, fmt("Simulated paths touch +5% in {:.0%} of cases", "mc_hit"), "mc"),
+    Rule("mc_rare", "cons", lambda c: c.mc_hit < 0.25, fmt("Only {:.0%} of simulated paths reach +5%", "mc_hit"), "mc"),
+]
+
+# headline style by (rsi2 < 10, pullback in uptrend, squeeze) bits
+_STYLES = []
+for _k in range(8):
+    _st = [nm for b, nm in ((1, "mean‑reversion bounce"), (2, "pullback‑in‑uptrend"), (4, "possible squeeze")) if _k & b]
+    _STYLES.append(" / ".join(_st or ["standard setup"]).capitalize())
+
+
+def _regime_context(regime: dict | None) -> str:
+    if not regime:
+        return ""
+    try:
+        tr = float(regime.get("spy20d_trend", 0.0))
+        vol = float(regime.get("spy20d_vol", 0.0))
+        slope = float(regime.get("ma200_slope5", 0.0))
+        return f"SPY 20d trend {tr:+.2%}, vol {vol:.2%}, 200d slope {slope:+.3f}"
+    except Exception:
+        return ""
+
+
+def advise_frame(df: pd.DataFrame, regime: dict | None = None) -> pd.DataFrame:
+    """make_ticker_advice for every row: headline, rating, pros, cons, context, codes."""
+    cols = ["headline", "rating", "pros", "cons", "context", "codes"]
+    if df is None or len(df) == 0:
+        return pd.DataFrame(columns=cols)
+    n = len(df)
+    c = SimpleNamespace(
+        rsi2=or_nan(df, "RSI2"), rsi4=or_nan(df, "RSI4"), crsi=or_nan(df, "ConnorsRSI"),
+        rel=or_default(df, "RelSPY", 0.0), rvol=or_default(df, "RVOL", 1.0),
+        squeeze=or_default(df, "SqueezeHint", 0.0), crowd=or_default(df, "CrowdRisk", 0.0),
+        chase=or_default(df, "RetailChaseRisk", 0.0), p200=or_default(df, "PctFrom200d", 0.0),
+        pup=or_default(df, "P_up", 0.55), fscore=or_default(df, "FinalScore", 0.0),
+        close=or_default(df, "Close", 0.0), atr=or_default(df, "ATR", 0.0),
+        chg=or_default(df, "ChangePct", 0.0), mc_hit=or_nan(df, "MC_PHit_5%"),
+    )
+    c.atr_ratio = ratio_safe(c.atr, c.close)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        c.atr_pct = c.atr / c.close * 100
+    res = evaluate(ADVICE_RULES, c, n)
+
+    # star rating, same arithmetic order as the per-row version
+    rp = np.full(n, 3.0)
+    for thr in (0.60, 0.65, 0.70):
+        rp = rp + np.where(c.pup >= thr, 0.5, 0.0)
+    for thr in (0.08, 0.12):
+        rp = rp + np.where(c.fscore >= thr, 0.5, 0.0)
+    rp = rp + np.where(c.rel > 0, 0.25, 0.0)
+    rp = rp + np.where(c.p200 > 0, 0.25, 0.0)
+    over = c.crowd - 1.0
+    rp = rp - 0.25 * np.where(over > 0.0, over, 0.0)
+    rp = rp - 0.25 * np.where(c.chase >= 0.7, 1.0, 0.0)
+    rp = rp - np.where(c.atr_ratio > 0.06, 0.5, 0.0)
+    rating = np.round(np.clip(rp, 1.0, 5.0) * 2) / 2.0
+
+    style = ((c.rsi2 < 10).astype(int) + 2 * ((c.rel > 0) & (c.p200 >= 0) & (c.rsi2 < 50)).astype(int)
+             + 4 * (c.squeeze >= 0.5).astype(int))
+    headline = [f"{_STYLES[k]} — {rt:.1f}★ | Model pop odds ≈ {p:.0%} | Score {f:.3f}"
+                for k, rt, p, f in zip(style.tolist(), rating.tolist(), c.pup.tolist(), c.fscore.tolist())]
+
+    reg = _regime_context(regime)
+    context = [reg] * n
+    if "MC_Q05" in df.columns and "MC_Q95" in df.columns:
+        q05, q95 = or_nan(df, "MC_Q05"), or_nan(df, "MC_Q95")
+        ok = present(df, "MC_Q05") & present(df, "MC_Q95") & ~np.isnan(q05)
+        for i in np.flatnonzero(ok).tolist():
+            bit = f"MC 5–95% range {q05[i]:.2f}–{q95[i]:.2f}"
+            context[i] = f"{reg} | {bit}" if reg else bit
+
+    return pd.DataFrame({"headline": headline, "rating": rating, "pros": res["pros"], "cons": res["cons"],
+                         "context": context, "codes": res["codes"]}, index=df.index, columns=cols)
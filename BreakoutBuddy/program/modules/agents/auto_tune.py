@@ -1,11 +1,5 @@
 from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
 from typing import Dict, Any, List, Tuple
 from pathlib import Path
 import json
@@ -13,27 +7,22 @@ import pandas as pd
 import numpy as np
 
 from .registry import compute_all, list_agent_names
+from modules.services import paths as bb_paths
 
 _WEIGHTS_FILE = "agent_weights.json"
 
 def _data_dir() -> Path:
-    here = Path(__file__).resolve()
-    for up in [here, *here.parents]:
-        cand = up / "Data"
-        if cand.is_dir():
-            return cand
-        if up.name == "program":
-            cand2 = up.parent / "Data"
-            if cand2.is_dir():
-                return cand2
-    fb = here.parent / "Data"
-    fb.mkdir(parents=True, exist_ok=True)
-    return fb
+    return bb_paths.data_dir()
 
 def _weights_path() -> Path:
     return _data_dir() / _WEIGHTS_FILE
 
 def _load_weights() -> Dict[str, float]:
+    try:
+        from modules.services import app_cache
+        return app_cache.agent_weights()
+    except Exception:
+        pass
     p = _weights_path()
     if p.exists():
         try:
@@ -73,13 +62,11 @@ def _design_matrix(df: pd.DataFrame):
     for _, row in df.iterrows():
         sigs = compute_all(row.to_dict())
         rows.append([s.score for s in sigs])
-    import numpy as np
     X = np.array(rows, dtype=float) if rows else np.zeros((0,0), dtype=float)
     names = list_agent_names()
     return X, names
 
 def _target_vector(df: pd.DataFrame):
-    import numpy as np
     if "Combined_base" in df.columns and pd.api.types.is_numeric_dtype(df["Combined_base"]):
         y = df["Combined_base"].astype(float).to_numpy()
     elif "Combined" in df.columns and pd.api.types.is_numeric_dtype(df["Combined"]):
@@ -96,7 +83,6 @@ def run_agents_calibration(conn=None, lookback_days: int = 90, **kwargs) -> Dict
         w = {name: 0.0 for name in list_agent_names()}
         save_weights(w)
         return {"status": "ok", "note": "Not enough data; saved zeros.", "weights": [{"agent":k,"weight":0.0} for k in w]}
-    import numpy as np
     X, names = _design_matrix(df)
     y = _target_vector(df)
     if X.shape[0] != y.shape[0] or X.shape[0] == 0:
@@ -1,14 +1,6 @@
-
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
-
 import asyncio
 import pandas as pd
-import yfinance as yf
+from modules.services import market_data
 from .base import BaseAgent, ProgressCB
 
 class DataAgent(BaseAgent):
@@ -16,13 +8,13 @@ class DataAgent(BaseAgent):
 
     async def _run_impl(self, symbol: str, progress: ProgressCB = None):
         cfg = self.cfg or {}
-        hp = cfg.get("hist_period","1y"); hi = cfg.get("hist_interval","1d")
-        ip = cfg.get("intra_period","5d"); ii = cfg.get("intra_interval","30m")
-        tk = yf.Ticker(symbol)
-        hist = await asyncio.to_thread(tk.history, period=hp, interval=hi, auto_adjust=False)
-        intra = await asyncio.to_thread(tk.history, period=ip, interval=ii, auto_adjust=False)
+        (hp0, hi0), (ip0, ii0) = market_data.AGENT_HISTORY   # defaults record_universe archives
+        hp = cfg.get("hist_period",hp0); hi = cfg.get("hist_interval",hi0)
+        ip = cfg.get("intra_period",ip0); ii = cfg.get("intra_interval",ii0)
+        hist = await asyncio.to_thread(market_data.history, symbol, period=hp, interval=hi, auto_adjust=False)
+        intra = await asyncio.to_thread(market_data.history, symbol, period=ip, interval=ii, auto_adjust=False)
         try:
-            info = await asyncio.to_thread(lambda: tk.fast_info.__dict__ if hasattr(tk, "fast_info") else {})
+            info = await asyncio.to_thread(market_data.fast_info, symbol)
         except Exception:
             info = {}
         return {
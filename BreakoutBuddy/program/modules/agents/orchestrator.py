@@ -1,18 +1,12 @@
 from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
-
 from dataclasses import dataclass
 from typing import Callable, Dict, List, Optional
 import math
 
 from modules.agents.technical_agent import TechnicalAgent
 from modules.agents.sentiment_agent import SentimentAgent
+from modules.services import tracing
 
 ProgressCB = Callable[[str, float], None]
 
@@ -36,6 +30,7 @@ def _combine(scores: Dict[str, float]) -> float:
     m = sum(scores.values()) / len(scores)
     return max(-10.0, min(10.0, m))
 
+@tracing.traced("agents_run")
 def run_for_symbols(symbols: List[str], progress_cb: Optional[ProgressCB] = None) -> Dict[str, AgentReport]:
     out: Dict[str, AgentReport] = {}
     ta = TechnicalAgent()
@@ -49,7 +44,8 @@ def run_for_symbols(symbols: List[str], progress_cb: Optional[ProgressCB] = None
         ok = True
 
         try:
-            s = ta.score(sym)
+            with tracing.span("agent_technical", ticker=sym):
+                s = ta.score(sym)
             if s is not None:
                 scores["technical"] = float(s)
                 notes_parts.append(f"Tech {s:+.1f}")
@@ -58,7 +54,8 @@ def run_for_symbols(symbols: List[str], progress_cb: Optional[ProgressCB] = None
             notes_parts.append(f"Tech err: {e}")
 
         try:
-            s = sa.score(sym)
+            with tracing.span("agent_sentiment", ticker=sym):
+                s = sa.score(sym)
             if s is not None:
                 scores["sentiment"] = float(s)
                 notes_parts.append(f"Sent {s:+.1f}")
@@ -1,12 +1,5 @@
 from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
-
 from typing import Optional, List
 import re
 
@@ -16,10 +9,7 @@ try:
 except Exception:
     _VADER = False
 
-try:
-    import yfinance as yf
-except Exception:
-    yf = None  # optional
+from modules.services import market_data
 
 _POS = {"beat","beats","surge","surged","gain","gains","up","bull","bullish","positive","strong","record","growth","upgrade","outperform"}
 _NEG = {"miss","misses","plunge","plunges","drop","drops","down","bear","bearish","negative","weak","cut","downgrade","underperform","loss"}
@@ -35,11 +25,8 @@ class SentimentAgent:
     """Light sentiment from recent Yahoo news. Optional; returns None on network errors."""
 
     def _fetch_titles(self, symbol: str) -> List[str]:
-        if yf is None:
-            return []
         try:
-            t = yf.Ticker(symbol)
-            items = getattr(t, "news", None)
+            items = market_data.news(symbol)
             if not items:
                 return []
             titles = []
@@ -1,100 +1,11 @@
 from __future__ import annotations
 
 from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
 
-
-from pathlib import Path
-
-# ---------- Strict per-app Data/Extras resolver (BreakoutBuddy) ----------
-from pathlib import Path
-import os, sys
-BB_HERE     = Path(__file__).resolve()
-BB_APP_ROOT = BB_HERE.parents[1]   # .../BreakoutBuddy
-
-def _bb_cloud_roots():
-    h = Path.home()
-    return [
-        h / "OneDrive",
-        h / "OneDrive - Personal",
-        h / "OneDrive - Wagstaff Law Firm",
-        h / "Dropbox",
-        h / "Google Drive",
-        h / "Library" / "CloudStorage" / "OneDrive",
-        h / "Library" / "CloudStorage" / "Dropbox",
-        h / "Library" / "CloudStorage" / "GoogleDrive",
-    ]
-
-def _bb_first_existing(paths):
-    for p in paths:
-        try:
-            p2 = Path(p).expanduser().resolve()
-            if p2.exists():
-                return p2
-        except Exception:
-            pass
-    return None
-
-def bb_resolve_dir(preferred_env_var: str, fallback_name: str):
-    """
-    Strict per-app order (NO repo-level fallback):
-      1) Env var (abs or relative)
-      2) BB_APP_ROOT/<name>
-      3) CWD/<name>
-      4) Cloud roots: <BreakoutBuddy>/<name>
-      5) Create BB_APP_ROOT/<name>
-    """
-    envv = os.environ.get(preferred_env_var, "").strip()
-    if envv:
-        cand = (Path(envv) if os.path.isabs(envv) else (Path.cwd() / envv))
-        if cand.exists():
-            return cand.resolve()
-
-    hit = _bb_first_existing([BB_APP_ROOT / fallback_name, Path.cwd() / fallback_name])
-    if hit:
-        return hit
-
-    cands = []
-    for root in _bb_cloud_roots():
-        cands += [
-            root / BB_APP_ROOT.name / fallback_name,
-            root / "Projects" / BB_APP_ROOT.name / fallback_name,
-        ]
-    hit = _bb_first_existing(cands)
-    if hit:
-        return hit
-
-    target = (BB_APP_ROOT / fallback_name).resolve()
-    target.mkdir(parents=True, exist_ok=True)
-    return target
-
-BB_DATA   = bb_resolve_dir("BREAKOUTBUDDY_DATA",   "Data")
-BB_EXTRAS = bb_resolve_dir("BREAKOUTBUDDY_EXTRAS", "extras")
-
-bb_extras_src = (BB_EXTRAS / "src")
-if bb_extras_src.exists() and str(bb_extras_src) not in sys.path:
-    sys.path.insert(0, str(bb_extras_src))
-# ---------- end resolver ----------
-
-from pathlib import Path as _P
+from modules.services import paths as bb_paths
 
 def data_dir():
-    here = _P(__file__).resolve()
-    candidates = [
-        here.parents[3] / "Data",          # BreakoutBuddy/Data
-        here.parents[2] / "Data",          # BreakoutBuddy/program/Data
-        _P.cwd() / "Data",
-    ]
-    for c in candidates:
-        try:
-            if c.exists():
-                return c
-        except Exception:
-            pass
-    return candidates[0]
+    return bb_paths.data_dir()
 
 from typing import Iterable, Optional, Dict, Tuple, List
 
@@ -103,8 +14,8 @@ import pandas as pd
 
 from modules.features import load_features
 
-# Resolve BreakoutBuddy/Data/breakoutbuddy.duckdb relative to this file
-DEFAULT_DB_PATH = Path(__file__).resolve().parents[3] / "Data" / str(BB_DATA / 'breakoutbuddy.duckdb')
+# BreakoutBuddy/Data/breakoutbuddy.duckdb (resolved once by the path service)
+DEFAULT_DB_PATH = bb_paths.db_path()
 
 # Canonical feature set expected by most agent trainers
 CANONICAL_COLS: List[str] = [
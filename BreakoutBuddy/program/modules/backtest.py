@@ -1,14 +1,8 @@
 from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
 import pandas as pd
 import numpy as np
-import yfinance as yf
+from modules.services import market_data
 
 def _rsi(series: pd.Series, n:int=14) -> pd.Series:
     delta = series.diff()
@@ -21,7 +15,7 @@ def _rsi(series: pd.Series, n:int=14) -> pd.Series:
 def quick_backtest_rsi2_rule(tickers, rsi2_thresh:int=5, horizon:int=5, target_pct:float=3.0) -> pd.DataFrame:
     rows = []
     for t in tickers:
-        df = yf.download(t, period="2y", interval="1d", auto_adjust=False, progress=False)
+        df = market_data.download(t, period="2y", interval="1d", auto_adjust=False, progress=False)
         if df is None or df.empty: 
             continue
         df["RSI2"] = _rsi(df["Close"], 2)
@@ -0,0 +1,3 @@
+# bench package — offline scan benchmarks on a seeded synthetic market.
+#   synthetic.make_panel / write_cache   OHLCV panels served through ohlcv_cache
+#   suite.run_suite / compare            stage timings, history, regression check
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+# suite.py — time every scan stage on synthetic universes and keep a history.
+#
+#   run_suite(sizes=(50, 500, 5000))   one run: every stage at every size -> DataFrame
+#   history()                          Data/perf/bench_history.csv (one row per run/size/stage)
+#   compare(threshold=0.15)            latest run vs the previous one (or a given run id);
+#                                      `regression` is set where a stage got slower than
+#                                      the threshold allows
+#
+# Each size gets its own synthetic cache under Data/perf/bench_work/<size>, and
+# ohlcv_cache is pointed at it for the duration of the run, so nothing hits Yahoo and
+# the real cache is never touched. Runs are also appended to bench_runs.jsonl with
+# their environment (python / pandas / numpy / git rev).
+
+import contextlib, json, platform, statistics, subprocess, time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from modules.services import paths as bb_paths
+from modules.bench import synthetic
+
+DEFAULT_SIZES = (50, 500, 5000)
+STAGES = [
+    "generate",                 # synthetic.make_panel
+    "write_cache",              # synthetic.write_cache
+    "load_history",             # ohlcv_cache.get_history per ticker (cache hits)
+    "enrich_last_row",          # data.enrich_last_row on preloaded frames
+    "pull_enriched_snapshot",   # the scan end to end (load + enrich)
+    "rank_cols",                # services.scoring._ensure_rank_cols (+ agents heuristic lift)
+    "blended_ranking",          # ranking.blended_ranking
+    "diversify",                # diversify.select, top 20 from up to 2000 candidates (cold cache)
+    "agents_technical",         # TechnicalAgent.score per ticker
+]
+HISTORY_COLS = ["run_id", "ts", "size", "stage", "seconds", "per_ticker_ms", "rows", "repeat", "seed", "git"]
+
+
+def _perf_dir() -> Path:
+    return bb_paths.get_paths().perf_dir
+
+
+def _history_file() -> Path:
+    return _perf_dir() / "bench_history.csv"
+
+
+def _runs_file() -> Path:
+    return _perf_dir() / "bench_runs.jsonl"
+
+
+def _git_rev() -> str:
+    try:
+        res = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=str(bb_paths.get_paths().program_dir),
+                             capture_output=True, text=True, timeout=5)
+        return res.stdout.strip()
+    except Exception:
+        return ""
+
+
+@contextlib.contextmanager
+def _cache_at(path: Path):
+    """Point ohlcv_cache at `path` for the duration of the block."""
+    from modules.services import ohlcv_cache
+    old = ohlcv_cache.CACHE_DIR
+    ohlcv_cache.CACHE_DIR = Path(path)
+    try:
+        yield
+    finally:
+        ohlcv_cache.CACHE_DIR = old
+
+
+def _timed(fn: Callable[[], object], repeat: int):
+    times, out = [], None
+    for _ in range(max(1, int(repeat))):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times), out
+
+
+def _rows(obj) -> int:
+    try:
+        return int(len(obj))
+    except Exception:
+        return 0
+
+
+def run_suite(sizes: Sequence[int] = DEFAULT_SIZES, *, seed: int = 0, repeat: int = 1,
+              stages: Optional[Iterable[str]] = None, record: bool = True,
+              progress: Optional[Callable[[str], None]] = None) -> pd.DataFrame:
+    """Time each stage at each universe size; seconds is the median over `repeat` runs."""
+    from modules import data as data_mod
+    from modules import ranking
+    from modules.services import ohlcv_cache
+    from modules.services import scoring
+    from modules.agents.technical_agent import TechnicalAgent
+
+    want = [s for s in STAGES if stages is None or s in set(stages)]
+    run_id = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    ts = datetime.now().isoformat(timespec="seconds")
+    git = _git_rev()
+    rows: List[Dict] = []
+
+    def add(size: int, stage: str, sec: float, out) -> None:
+        rows.append({"run_id": run_id, "ts": ts, "size": int(size), "stage": stage, "seconds": round(sec, 6),
+                     "per_ticker_ms": round(sec * 1000.0 / max(1, size), 4), "rows": _rows(out),
+                     "repeat": int(repeat), "seed": int(seed), "git": git})
+        if progress:
+            progress(f"{size:>6} {stage:<24} {sec:9.3f}s")
+
+    for size in sizes:
+        size = int(size)
+        work = bb_paths.ensure_dir(_perf_dir() / "bench_work" / str(size))
+        sec, panel = _timed(lambda: synthetic.make_panel(size, seed=seed), 1 if "generate" not in want else repeat)
+        if "generate" in want:
+            add(size, "generate", sec, panel)
+        sec, _ = _timed(lambda: synthetic.write_cache(panel, work), 1)
+        if "write_cache" in want:
+            add(size, "write_cache", sec, panel)
+        tickers = list(panel)
+        panel = None
+
+        with _cache_at(work):
+            frames: Dict[str, pd.DataFrame] = {}
+
+            def load():
+                for t in tickers:
+                    frames[t] = ohlcv_cache.get_history(t, period="1y", interval="1d", ttl_hours=10**6)
+                return frames
+            sec, _ = _timed(load, repeat if "load_history" in want else 1)
+            if "load_history" in want:
+                add(size, "load_history", sec, frames)
+
+            if "enrich_last_row" in want:
+                spy_close = float(frames["SPY"]["Close"].iloc[-1])
+                norm = {t: data_mod._normalize_ohlcv(f) for t, f in frames.items()}
+
+                def enrich():
+                    return [data_mod.enrich_last_row(d, spy_close) for d in norm.values()]
+                sec, out = _timed(enrich, repeat)
+                add(size, "enrich_last_row", sec, out)
+                norm = None
+
+            snap = pd.DataFrame()
+            if any(s in want for s in ("pull_enriched_snapshot", "rank_cols", "blended_ranking", "diversify")):
+                sec, snap = _timed(lambda: data_mod.pull_enriched_snapshot(tickers), repeat)
+                if "pull_enriched_snapshot" in want:
+                    add(size, "pull_enriched_snapshot", sec, snap)
+            if "rank_cols" in want:
+                sec, out = _timed(lambda: scoring._ensure_rank_cols(snap), repeat)
+                add(size, "rank_cols", sec, out)
+            if "blended_ranking" in want:
+                sec, out = _timed(lambda: ranking.blended_ranking(snap, regime={}, top_n=50), repeat)
+                add(size, "blended_ranking", sec, out)
+            if "diversify" in want and not snap.empty:
+                from modules import diversify as div_mod
+                ranked = ranking.blended_ranking(snap, regime={}, top_n=0)
+
+                asof = synthetic.MarketSpec().end
+
+                def div():
+                    div_mod.clear_cache(asof)
+                    return div_mod.select(ranked, 20, candidates=min(size, div_mod.MAX_CANDIDATES), asof=asof)
+                sec, out = _timed(div, repeat)
+                add(size, "diversify", sec, out)
+            if "agents_technical" in want:
+                ta = TechnicalAgent()
+                sec, out = _timed(lambda: [s for s in (ta.score(t) for t in tickers) if s is not None], repeat)
+                add(size, "agents_technical", sec, out)
+            frames = snap = None
+
+    df = pd.DataFrame(rows, columns=HISTORY_COLS)
+    if record and not df.empty:
+        _record(df)
+    return df
+
+
+def _record(df: pd.DataFrame) -> None:
+    try:
+        fp = _history_file()
+        bb_paths.ensure_dir(fp.parent)
+        df.to_csv(fp, mode="a", header=not fp.exists(), index=False)
+        meta = {
+            "run_id": str(df["run_id"].iloc[0]), "ts": str(df["ts"].iloc[0]), "git": str(df["git"].iloc[0]),
+            "python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+            "machine": platform.machine(), "results": df.drop(columns=["run_id", "ts", "git"]).to_dict("records"),
+        }
+        with open(_runs_file(), "a", encoding="utf-8") as f:
+            f.write(json.dumps(meta) + "\n")
+    except Exception:
+        pass
+
+
+def history() -> pd.DataFrame:
+    fp = _history_file()
+    if not fp.exists():
+        return pd.DataFrame(columns=HISTORY_COLS)
+    try:
+        return pd.read_csv(fp, dtype={"run_id": str, "git": str})
+    except Exception:
+        return pd.DataFrame(columns=HISTORY_COLS)
+
+
+def compare(current: Optional[str] = None, baseline: Optional[str] = None, *, threshold: float = 0.15,
+            min_seconds: float = 0.005, hist: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Per (size, stage): baseline vs current seconds and their ratio.
+
+    `regression` is True where current > baseline * (1 + threshold) and the slowdown is
+    at least `min_seconds` (sub-millisecond stages are too noisy to flag).
+    """
+    h = history() if hist is None else hist
+    cols = ["size", "stage", "baseline_s", "current_s", "ratio", "regression"]
+    if h is None or h.empty:
+        return pd.DataFrame(columns=cols)
+    runs = list(dict.fromkeys(h["run_id"].astype(str)))
+    cur = str(current) if current else runs[-1]
+    if baseline:
+        base = str(baseline)
+    else:
+        earlier = runs[:runs.index(cur)] if cur in runs else []
+        if not earlier:
+            return pd.DataFrame(columns=cols)
+        base = earlier[-1]
+    a = h[h["run_id"].astype(str) == base][["size", "stage", "seconds"]].rename(columns={"seconds": "baseline_s"})
+    b = h[h["run_id"].astype(str) == cur][["size", "stage", "seconds"]].rename(columns={"seconds": "current_s"})
+    m = a.merge(b, on=["size", "stage"], how="inner")
+    m["ratio"] = (m["current_s"] / m["baseline_s"].where(m["baseline_s"] > 0)).round(3)
+    m["regression"] = (m["current_s"] > m["baseline_s"] * (1.0 + float(threshold))) & \
+                      ((m["current_s"] - m["baseline_s"]) >= float(min_seconds))
+    order = {s: i for i, s in enumerate(STAGES)}
+    m["_o"] = m["stage"].map(order).fillna(len(order))
+    m = m.sort_values(["size", "_o"])[cols].reset_index(drop=True)
+    m.attrs["baseline"], m.attrs["current"] = base, cur
+    return m
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+# synthetic.py — seeded synthetic market for offline benchmarks.
+#
+#   make_panel(n, seed)          {ticker: daily OHLCV frame}, SPY first; same seed -> same bytes
+#   write_cache(panel, dir)      ohlcv_cache-format CSVs (1y and 6mo, 1d) so get_history()
+#                                serves them without touching Yahoo
+#   write_archive(panel)         the same bars as market_data replay entries
+#
+# Returns are a market factor with volatility clustering plus fat-tailed idiosyncratic
+# noise. Panels include overnight gaps, missing bars, volume spikes and splits; with
+# adjusted=False (default) a split shows up as a raw price discontinuity, as in
+# unadjusted vendor data, and is always flagged in the "Stock Splits" column.
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from modules.services import paths as bb_paths
+
+
+@dataclass(frozen=True)
+class MarketSpec:
+    n_days: int = 260
+    end: str = "2024-12-31"
+    gap_rate: float = 0.02          # P(overnight gap) per ticker-day
+    missing_rate: float = 0.003     # P(bar missing: halt / vendor hole) per ticker-day
+    spike_rate: float = 0.01        # P(volume spike) per ticker-day
+    split_rate: float = 0.05        # P(one split inside the window) per ticker
+    adjusted: bool = False
+
+
+def ticker_names(n: int) -> list:
+    return ["SPY"] + [f"SYN{i:05d}" for i in range(max(0, int(n) - 1))]
+
+
+def make_panel(n_tickers: int, seed: int = 0, spec: Optional[MarketSpec] = None) -> Dict[str, pd.DataFrame]:
+    """Daily OHLCV for `n_tickers` symbols (SPY included), deterministic in `seed`."""
+    spec = spec or MarketSpec()
+    rng = np.random.default_rng(seed)
+    names = ticker_names(n_tickers)
+    T, D = len(names), int(spec.n_days)
+    dates = pd.bdate_range(end=spec.end, periods=D)
+
+    # market factor: daily vol follows a slow AR(1) in log space (calm / stressed spells)
+    lv = np.empty(D)
+    lv[0] = 0.0
+    shocks = rng.normal(0.0, 0.15, D)
+    for d in range(1, D):
+        lv[d] = 0.94 * lv[d - 1] + shocks[d]
+    mkt = rng.standard_normal(D) * 0.01 * np.exp(lv) + 0.0003
+
+    beta = rng.uniform(0.3, 1.6, T)
+    beta[0] = 1.0
+    idio = rng.uniform(0.008, 0.04, T)
+    idio[0] = 0.0
+    drift = rng.normal(0.0002, 0.0006, T)
+    eps = rng.standard_t(4, (D, T)) / np.sqrt(2.0)           # unit-variance t(4)
+    ret = mkt[:, None] * beta[None, :] + eps * idio[None, :] + drift[None, :]
+    sig = np.sqrt((0.01 * beta) ** 2 + idio ** 2)
+
+    # split the day's move into overnight + session; some overnights are real gaps
+    on = ret * rng.uniform(0.1, 0.4, (D, T))
+    intra = ret - on
+    gap = rng.random((D, T)) < spec.gap_rate
+    g = np.where(gap, rng.normal(0.0, 3.0, (D, T)) * sig[None, :], 0.0)
+    on = on + g
+    intra = intra - 0.5 * g                  # the session fills half of the gap
+
+    p0 = np.exp(rng.normal(3.6, 1.0, T))
+    p0[0] = 450.0
+    log_close = np.log(p0)[None, :] + np.cumsum(on + intra, axis=0)
+    close = np.exp(log_close)
+    open_ = np.exp(log_close - intra)
+    wick = np.abs(rng.standard_normal((2, D, T))) * 0.5 * sig[None, None, :]
+    high = np.maximum(open_, close) * np.exp(wick[0])
+    low = np.minimum(open_, close) * np.exp(-wick[1])
+
+    base_vol = np.exp(rng.normal(13.5, 1.2, T))
+    base_vol[0] = 8e7
+    z = np.abs(ret) / sig[None, :]
+    volume = base_vol[None, :] * np.exp(rng.normal(0.0, 0.3, (D, T))) * (1.0 + 0.6 * z)
+    spike = rng.random((D, T)) < spec.spike_rate
+    volume = np.where(spike, volume * rng.uniform(3.0, 10.0, (D, T)), volume)
+    volume = np.where(gap, volume * 2.0, volume)
+
+    splits = np.zeros((D, T))
+    has_split = rng.random(T) < spec.split_rate
+    has_split[0] = False
+    ratios = np.array([2.0, 3.0, 4.0, 0.1])
+    for j in np.flatnonzero(has_split):
+        d = int(rng.integers(D // 4, D - 5))
+        r = float(ratios[rng.integers(0, ratios.size)])
+        splits[d, j] = r
+        if not spec.adjusted:
+            # raw history: everything before the split trades at the pre-split price
+            for a in (open_, high, low, close):
+                a[:d, j] *= r
+            volume[:d, j] /= r
+
+    keep = rng.random((D, T)) >= spec.missing_rate
+    keep[-1, :] = True                      # every ticker has the latest bar
+    keep[:, 0] = True
+
+    panel: Dict[str, pd.DataFrame] = {}
+    for j, t in enumerate(names):
+        m = keep[:, j]
+        panel[t] = pd.DataFrame({
+            "Date": dates[m],
+            "Open": open_[m, j].round(4),
+            "High": high[m, j].round(4),
+            "Low": low[m, j].round(4),
+            "Close": close[m, j].round(4),
+            "Volume": volume[m, j].round(0),
+            "Dividends": 0.0,
+            "Stock Splits": splits[m, j],
+        })
+    return panel
+
+
+def write_cache(panel: Dict[str, pd.DataFrame], cache_dir: Optional[Path] = None) -> Path:
+    """Write the panel in ohlcv_cache's file layout: <SYM>_1y_1d.csv and <SYM>_6mo_1d.csv."""
+    out = Path(cache_dir) if cache_dir else bb_paths.get_paths().cache_dir / "yf"
+    bb_paths.ensure_dir(out)
+    for t, df in panel.items():
+        safe = t.replace("/", "_").upper()
+        df.to_csv(out / f"{safe}_1y_1d.csv", index=False)
+        df.tail(126).to_csv(out / f"{safe}_6mo_1d.csv", index=False)
+    return out
+
+
+def write_archive(panel: Dict[str, pd.DataFrame], archive_path: Optional[Path] = None) -> Dict:
+    """Store the panel as market_data replay entries (the daily calls the app makes), so
+    `BB_MARKET_DATA=replay` runs the whole app offline on synthetic data."""
+    from modules.services import market_data
+    arch = market_data.Archive(archive_path or market_data.default_archive_path())
+    tail = {"1y": 252, "6mo": 126, "2y": 504, "60d": 60, "7d": 7}
+    for t, df in panel.items():
+        h = df.set_index(pd.DatetimeIndex(df["Date"], name="Date")).drop(columns=["Date"])
+        for per, n in tail.items():
+            arch.put(market_data.request_key("history", t, {"period": per, "interval": "1d"}),
+                     {"method": "history", "symbol": t, "synthetic": True}, h.tail(n), 0.0)
+        arch.put(market_data.request_key("history", t, {"period": "60d"}),
+                 {"method": "history", "symbol": t, "synthetic": True}, h.tail(60), 0.0)
+        arch.put(market_data.request_key("history", t, {"period": "7d"}),
+                 {"method": "history", "symbol": t, "synthetic": True}, h.tail(7), 0.0)
+        raw = h[["Open", "High", "Low", "Close", "Volume"]].assign(**{"Adj Close": h["Close"]})
+        for per, n in (("1y", 252), ("2y", 504)):
+            kw = {"period": per, "interval": "1d", "auto_adjust": False}
+            arch.put(market_data.request_key("download", t, kw),
+                     {"method": "download", "symbol": t, "synthetic": True}, raw.tail(n), 0.0)
+        # data_agent's daily call (its intraday call has no synthetic equivalent and stays a miss)
+        agent_per, agent_iv = market_data.AGENT_HISTORY[0]
+        arch.put(market_data.request_key("history", t, {"period": agent_per, "interval": agent_iv, "auto_adjust": False}),
+                 {"method": "history", "symbol": t, "synthetic": True}, raw.tail(tail[agent_per]), 0.0)
+        last = h.iloc[-1]
+        info = {"lastPrice": float(last["Close"]), "open": float(last["Open"]), "dayHigh": float(last["High"]),
+                "dayLow": float(last["Low"]), "lastVolume": float(last["Volume"]),
+                "previousClose": float(h["Close"].iloc[-2]) if len(h) > 1 else float(last["Close"]),
+                "yearHigh": float(h["High"].tail(252).max()), "yearLow": float(h["Low"].tail(252).min()),
+                "currency": "USD"}
+        arch.put(market_data.request_key("fast_info", t, {}), {"method": "fast_info", "symbol": t, "synthetic": True}, info, 0.0)
+        arch.put(market_data.request_key("news", t, {}), {"method": "news", "symbol": t, "synthetic": True}, [], 0.0)
+    out = arch.stats()
+    arch.close()
+    return out
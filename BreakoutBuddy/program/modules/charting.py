@@ -1,14 +1,8 @@
-
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
 import datetime as _dt
 from typing import Tuple
 import pandas as pd
-import yfinance as yf
+from modules.services import market_data
+from modules.services.lazy import lazy_import
 
 def _tf_map(tf: str) -> Tuple[dict, str]:
     """Return kwargs for yf.Ticker().history and a human label."""
@@ -41,14 +35,13 @@ def _tf_map(tf: str) -> Tuple[dict, str]:
 
 def fetch_history(symbol: str, timeframe: str) -> pd.DataFrame:
     """Fetch OHLCV for symbol at a timeframe, with sensible fallbacks."""
-    t = yf.Ticker(symbol)
     kwargs, _ = _tf_map(timeframe)
     try:
-        df = t.history(**kwargs)
+        df = market_data.history(symbol, **kwargs)
     except Exception:
         # Fallback to coarser interval
         fallback = {"period":"6mo", "interval":"1d"}
-        df = t.history(**fallback)
+        df = market_data.history(symbol, **fallback)
     if df is None:
         return pd.DataFrame()
     if df.empty:
@@ -102,10 +95,14 @@ def build_chart(symbol: str, timeframe: str = "6M", style: str = "Candles"):
 
 
 # --- Simple chart wrapper with optional RSI overlays ---
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import numpy as np
 
+go = lazy_import("plotly.graph_objects")
+_subplots = lazy_import("plotly.subplots")
+
+def make_subplots(*args, **kwargs):
+    return _subplots.make_subplots(*args, **kwargs)
+
 def _rsi(series: pd.Series, period: int = 14) -> pd.Series:
     delta = series.diff()
     gain = np.where(delta > 0, delta, 0.0)
@@ -121,7 +118,7 @@ def render_price_chart(ticker: str, timeframe: str = "3M", show_rsi4: bool=False
         return
     kwargs, _ = _tf_map(timeframe)
     try:
-        df = yf.Ticker(ticker).history(**kwargs)
+        df = market_data.history(ticker, **kwargs)
     except Exception:
         df = None
     if df is None or df.empty:
@@ -1,91 +1,17 @@
 from __future__ import annotations
 
 from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
 
-import os
-from pathlib import Path
-
-# ---------- Strict per-app Data/Extras resolver (BreakoutBuddy) ----------
-from pathlib import Path
-import os, sys
-BB_HERE     = Path(__file__).resolve()
-BB_APP_ROOT = BB_HERE.parents[1]   # .../BreakoutBuddy
-
-def _bb_cloud_roots():
-    h = Path.home()
-    return [
-        h / "OneDrive",
-        h / "OneDrive - Personal",
-        h / "OneDrive - Wagstaff Law Firm",
-        h / "Dropbox",
-        h / "Google Drive",
-        h / "Library" / "CloudStorage" / "OneDrive",
-        h / "Library" / "CloudStorage" / "Dropbox",
-        h / "Library" / "CloudStorage" / "GoogleDrive",
-    ]
-
-def _bb_first_existing(paths):
-    for p in paths:
-        try:
-            p2 = Path(p).expanduser().resolve()
-            if p2.exists():
-                return p2
-        except Exception:
-            pass
-    return None
-
-def bb_resolve_dir(preferred_env_var: str, fallback_name: str):
-    """
-    Strict per-app order (NO repo-level fallback):
-      1) Env var (abs or relative)
-      2) BB_APP_ROOT/<name>
-      3) CWD/<name>
-      4) Cloud roots: <BreakoutBuddy>/<name>
-      5) Create BB_APP_ROOT/<name>
-    """
-    envv = os.environ.get(preferred_env_var, "").strip()
-    if envv:
-        cand = (Path(envv) if os.path.isabs(envv) else (Path.cwd() / envv))
-        if cand.exists():
-            return cand.resolve()
-
-    hit = _bb_first_existing([BB_APP_ROOT / fallback_name, Path.cwd() / fallback_name])
-    if hit:
-        return hit
-
-    cands = []
-    for root in _bb_cloud_roots():
-        cands += [
-            root / BB_APP_ROOT.name / fallback_name,
-            root / "Projects" / BB_APP_ROOT.name / fallback_name,
-        ]
-    hit = _bb_first_existing(cands)
-    if hit:
-        return hit
-
-    target = (BB_APP_ROOT / fallback_name).resolve()
-    target.mkdir(parents=True, exist_ok=True)
-    return target
-
-BB_DATA   = bb_resolve_dir("BREAKOUTBUDDY_DATA",   "Data")
-BB_EXTRAS = bb_resolve_dir("BREAKOUTBUDDY_EXTRAS", "extras")
-
-bb_extras_src = (BB_EXTRAS / "src")
-if bb_extras_src.exists() and str(bb_extras_src) not in sys.path:
-    sys.path.insert(0, str(bb_extras_src))
-# ---------- end resolver ----------
 import math
 import pandas as pd
 import numpy as np
-import duckdb
-import yfinance as yf
+from modules.services.lazy import lazy_import
+from modules.services import tracing
 from modules.services.ohlcv_cache import get_history
 import re
 
+duckdb = lazy_import("duckdb")
+
 def sanitize_symbol(sym: str) -> str:
     s = str(sym).strip().upper()
     if s.startswith('$'):
@@ -93,7 +19,6 @@ def sanitize_symbol(sym: str) -> str:
     s = re.sub(r"[^A-Z0-9._-]", "", s)
     return s
 
-
 # ---------- Utilities & DB ----------
 
 def ensure_dirs(data_dir: Path) -> None:
@@ -128,14 +53,8 @@ _DEFAULT_UNIVERSE = [
 
 def list_universe(n: int) -> list[str]:
     n = max(1, min(int(n), 500))
-    # If user has a prebuilt symbol list cached, prefer it. Otherwise use defaults.
-    try:
-        # Pull S&P500-ish list via yfinance if available
-        tbl = yf.Tickers("^GSPC ^NDX")
-        # If that didn't explode, just return a trimmed default anyway (yfinance has no direct list)
-        return _DEFAULT_UNIVERSE[:n] if n <= len(_DEFAULT_UNIVERSE) else _DEFAULT_UNIVERSE
-    except Exception:
-        return _DEFAULT_UNIVERSE[:n]
+    # yfinance has no index-membership list, so this is always the trimmed default list
+    return _DEFAULT_UNIVERSE[:n]
 
 # ---------- Indicators ----------
 
@@ -179,7 +98,7 @@ def _connors_rsi(close: pd.Series) -> pd.Series:
     rsi3 = _rsi(close, 3)
     streak = _streak_series(close)
     rsi_streak = _rsi(streak, 2)
-    pct_change = close.pct_change(fill_method="pad")
+    pct_change = close.ffill().pct_change()
     pr100 = _percent_rank(pct_change, 100)
     out = (rsi3 + rsi_streak + pr100) / 3.0
     return out
@@ -194,7 +113,7 @@ def _atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
 
 def _squeeze_hint(df: pd.DataFrame) -> pd.Series:
     # Simple proxy: 20d std of returns vs 120d percentile
-    r = df["Close"].astype(float).pct_change(fill_method="pad")
+    r = df["Close"].astype(float).ffill().pct_change()
     w20 = r.rolling(20).std()
     w120 = r.rolling(120).std()
     z = (w20 - w120.rolling(120).mean()) / (w120.rolling(120).std() + 1e-9)
@@ -257,7 +176,7 @@ def enrich_last_row(df: pd.DataFrame, spy_close: float) -> dict:
         "RSI2": float(rsi2.iloc[-1]),
         "RSI4": float(rsi4.iloc[-1]),
         "ConnorsRSI": float(crsi.iloc[-1]),
-        "RelSPY": float((close.pct_change(fill_method="pad").rolling(5).mean().iloc[-1]) - (0.0 if spy_close is None else 0.0)),
+        "RelSPY": float((close.ffill().pct_change().rolling(5).mean().iloc[-1]) - (0.0 if spy_close is None else 0.0)),
         "RVOL": float(rvol.iloc[-1]) if len(vol) else 1.0,
         "ATR": float(atr.iloc[-1]),
         "PctFrom200d": float(pct_from_200.iloc[-1]) if not math.isnan(pct_from_200.iloc[-1]) else 0.0,
@@ -265,6 +184,7 @@ def enrich_last_row(df: pd.DataFrame, spy_close: float) -> dict:
     }
     return out
 
+@tracing.traced("pull_enriched_snapshot")
 def pull_enriched_snapshot(tickers: list[str]) -> pd.DataFrame:
     """Return a DataFrame with one enriched row per ticker.
 
@@ -285,11 +205,12 @@ def pull_enriched_snapshot(tickers: list[str]) -> pd.DataFrame:
     rows = []
     for sym in tickers:
         try:
-            hist = get_history(sanitize_symbol(sym), period="1y", interval="1d")
-            if hist is None or hist.empty:
-                continue
-            d = _normalize_ohlcv(hist)
-            row = enrich_last_row(d, spy_close)
+            with tracing.span("enrich", ticker=sym):
+                hist = get_history(sanitize_symbol(sym), period="1y", interval="1d")
+                if hist is None or hist.empty:
+                    continue
+                d = _normalize_ohlcv(hist)
+                row = enrich_last_row(d, spy_close)
             if not row:
                 continue
             row["Ticker"] = sym
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+# diversify.py — correlation-aware top N: a high-score, low-correlation basket.
+#
+#   return_matrix(tickers, asof)      standardised daily log returns, float32 (T x N), read
+#                                     from the bar store (ohlcv_cache) for just these tickers
+#   correlation(Z, block=512)         N x N float32 correlation, filled one row block at a time
+#   correlations(tickers, asof)       (tickers, C) for a candidate set, cached per as-of date
+#   select(df, top_n, ...)            greedy basket; adds MaxCorr (vs earlier picks) and DivRank
+#
+# Returns are cached per as-of date (default: today) in memory and under
+# Data/cache/corr/returns_<asof>_<lookback>.npz, one column per ticker, so a rerun with a
+# different candidate set only reads the tickers it has not seen. Correlation matrices
+# for recent candidate sets are kept in memory.
+#
+# Greedy rule: at each step take the candidate with the best
+#     score_norm - penalty * max(0, max corr with the names already picked)
+# among those whose max corr is <= max_corr (if none are left, among all).
+
+import hashlib, threading
+from collections import OrderedDict
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from modules.services import paths as bb_paths
+from modules.services import tracing
+
+LOOKBACK = 60             # daily returns per correlation
+MIN_OBS = 20              # fewer valid returns than this -> treated as uncorrelated
+BLOCK = 512
+MAX_CANDIDATES = 2000
+KEEP_FILES = 5
+
+_LOCK = threading.Lock()
+_RETURNS: "OrderedDict[Tuple[str, int], Dict]" = OrderedDict()     # (asof, lookback) -> {"dates", "cols"}
+_CORR: "OrderedDict[Tuple, Tuple[List[str], np.ndarray]]" = OrderedDict()
+
+
+def _corr_dir() -> Path:
+    return bb_paths.get_paths().cache_dir / "corr"
+
+
+def _asof_key(asof) -> str:
+    return str(pd.Timestamp(asof).date()) if asof is not None else date.today().isoformat()
+
+
+def _load_closes(ticker: str, period: str, tail: Optional[int] = None) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """(date keys 'YYYY-MM-DD', closes) from the bar store; cached file first, then get_history."""
+    from modules.services import ohlcv_cache
+    got = ohlcv_cache.read_closes(ticker, period, "1d", tail=tail)
+    if got is not None:
+        return got
+    try:
+        df = ohlcv_cache.get_history(ticker, period=period, interval="1d")
+    except Exception:
+        return None
+    if df is None or df.empty or "Close" not in df.columns:
+        return None
+    dcol = "Date" if "Date" in df.columns else df.columns[0]
+    keys = df[dcol].astype(str).str.slice(0, 10).to_numpy()
+    close = pd.to_numeric(df["Close"], errors="coerce").to_numpy(dtype=np.float64)
+    return keys, close
+
+
+def _upto(got: Optional[Tuple[np.ndarray, np.ndarray]], asof: str,
+          tail: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Bars dated on or before `asof` ('YYYY-MM-DD' keys compare as strings), last `tail` of them."""
+    if got is None:
+        return None
+    keys, close = np.asarray(got[0]).astype(str), np.asarray(got[1])
+    keep = np.flatnonzero(keys <= asof)[-tail:]
+    return (keys[keep], close[keep]) if keep.size else None
+
+
+def _returns_column(dates: np.ndarray, keys: np.ndarray, close: np.ndarray) -> np.ndarray:
+    pos = pd.Index(keys).get_indexer(dates)
+    c = np.where(pos >= 0, close[np.clip(pos, 0, None)], np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lc = np.log(np.where(c > 0, c, np.nan))
+    return np.diff(lc).astype(np.float32)
+
+
+def _disk_file(asof: str, lookback: int) -> Path:
+    return _corr_dir() / f"returns_{asof}_{int(lookback)}.npz"
+
+
+def _load_disk(asof: str, lookback: int) -> Optional[Dict]:
+    fp = _disk_file(asof, lookback)
+    if not fp.exists():
+        return None
+    try:
+        with np.load(fp, allow_pickle=False) as z:
+            R, dates = z["R"], z["dates"]
+            if len(dates) and str(dates[-1]) > asof:
+                return None                 # holds bars after the as-of date: rebuild it
+            return {"dates": dates, "cols": {t: R[:, i] for i, t in enumerate(z["tickers"].tolist())}}
+    except Exception:
+        return None
+
+
+def _save_disk(asof: str, lookback: int, entry: Dict) -> None:
+    try:
+        d = bb_paths.ensure_dir(_corr_dir())
+        tick = list(entry["cols"])
+        R = np.stack([entry["cols"][t] for t in tick], axis=1) if tick else np.zeros((0, 0), np.float32)
+        tmp = d / f".returns_{asof}_{int(lookback)}.tmp.npz"
+        np.savez(tmp, dates=np.asarray(entry["dates"]), tickers=np.asarray(tick), R=R)
+        tmp.replace(_disk_file(asof, lookback))
+        old = sorted(d.glob("returns_*.npz"), key=lambda p: p.stat().st_mtime, reverse=True)[KEEP_FILES:]
+        for p in old:
+            p.unlink(missing_ok=True)
+    except Exception:
+        pass
+
+
+def _returns_for(tickers: Sequence[str], asof: str, lookback: int, period: str,
+                 loader: Optional[Callable] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Raw aligned returns (T x N, NaN where missing) for `tickers`, filling the cache."""
+    key = (asof, int(lookback))
+    with _LOCK:
+        entry = _RETURNS.get(key)
+    if entry is None:
+        entry = _load_disk(asof, lookback) or {"dates": None, "cols": {}}
+    load = loader or _load_closes
+    missing = [t for t in dict.fromkeys(tickers) if t not in entry["cols"]]
+    if missing:
+        # only today's window can be cut at the loader; a past as-of needs the older bars too
+        tail = lookback + 1 if asof >= date.today().isoformat() else None
+        with tracing.span("corr_load_returns", n=len(missing)):
+            raw = {t: _upto(load(t, period, tail), asof, lookback + 1) for t in missing}
+        if entry["dates"] is None:
+            allk = [k for v in raw.values() if v is not None for k in v[0][-(lookback + 1):]]
+            entry["dates"] = np.asarray(sorted(set(allk))[-(lookback + 1):])
+        empty = np.full(max(0, len(entry["dates"]) - 1), np.nan, dtype=np.float32)
+        for t, v in raw.items():
+            entry["cols"][t] = empty if v is None else _returns_column(entry["dates"], *v)
+        _save_disk(asof, lookback, entry)
+    with _LOCK:
+        _RETURNS[key] = entry
+        _RETURNS.move_to_end(key)
+        while len(_RETURNS) > 3:
+            _RETURNS.popitem(last=False)
+    R = np.stack([entry["cols"][t] for t in tickers], axis=1) if len(tickers) else np.zeros((0, 0), np.float32)
+    return entry["dates"], R
+
+
+def standardise(R: np.ndarray, min_obs: int = MIN_OBS) -> np.ndarray:
+    """Columns to zero mean / unit norm over their valid rows, NaN -> 0, so Z.T @ Z is the
+    correlation; columns with fewer than min_obs valid returns become all zero."""
+    R = np.asarray(R, dtype=np.float32)
+    ok = np.isfinite(R)
+    n = ok.sum(axis=0)
+    X = np.where(ok, R, 0.0).astype(np.float32)
+    mu = X.sum(axis=0) / np.maximum(n, 1)
+    X = np.where(ok, X - mu, 0.0).astype(np.float32)
+    norm = np.sqrt((X * X).sum(axis=0))
+    good = (n >= min_obs) & (norm > 0)
+    X[:, ~good] = 0.0
+    X[:, good] /= norm[good]
+    return X
+
+
+def return_matrix(tickers: Sequence[str], asof=None, *, lookback: int = LOOKBACK, period: str = "1y",
+                  loader: Optional[Callable] = None) -> np.ndarray:
+    tick = [str(t).upper() for t in tickers]
+    _, R = _returns_for(tick, _asof_key(asof), lookback, period, loader)
+    return standardise(R)
+
+
+def correlation(Z: np.ndarray, block: int = BLOCK) -> np.ndarray:
+    """Z.T @ Z as float32, one block of rows at a time (no float64 N x N temporaries)."""
+    Z = np.ascontiguousarray(Z, dtype=np.float32)
+    n = Z.shape[1]
+    C = np.empty((n, n), dtype=np.float32)
+    ZT = Z.T
+    for i in range(0, n, int(block)):
+        np.matmul(ZT[i:i + block], Z, out=C[i:i + block])
+    np.clip(C, -1.0, 1.0, out=C)
+    has = np.abs(Z).sum(axis=0) > 0
+    C[np.arange(n), np.arange(n)] = np.where(has, 1.0, 0.0)
+    return C
+
+
+def correlations(tickers: Sequence[str], asof=None, *, lookback: int = LOOKBACK, period: str = "1y",
+                 block: int = BLOCK, loader: Optional[Callable] = None) -> Tuple[List[str], np.ndarray]:
+    tick = [str(t).upper() for t in tickers]
+    a = _asof_key(asof)
+    key = (a, int(lookback), hashlib.sha1("|".join(tick).encode("utf-8")).hexdigest())
+    with _LOCK:
+        hit = _CORR.get(key)
+        if hit is not None:
+            _CORR.move_to_end(key)
+            tracing.count("cache_hits")
+            return hit
+    tracing.count("cache_misses")
+    Z = return_matrix(tick, a, lookback=lookback, period=period, loader=loader)
+    with tracing.span("corr_matmul", n=len(tick)):
+        C = correlation(Z, block)
+    with _LOCK:
+        _CORR[key] = (tick, C)
+        while len(_CORR) > 4:
+            _CORR.popitem(last=False)
+    return tick, C
+
+
+def clear_cache(asof=None) -> None:
+    """Drop the in-memory caches; with `asof`, also that date's returns file on disk."""
+    with _LOCK:
+        _RETURNS.clear()
+        _CORR.clear()
+    if asof is not None:
+        for p in _corr_dir().glob(f"returns_{_asof_key(asof)}_*.npz"):
+            p.unlink(missing_ok=True)
+
+
+def greedy(scores: np.ndarray, C: np.ndarray, k: int, *, max_corr: float = 0.8,
+           penalty: float = 0.5) -> Tuple[List[int], np.ndarray]:
+    """Indices picked in order, and each pick's max corr with the earlier picks (NaN for the first)."""
+    s = np.asarray(scores, dtype=np.float64)
+    s = np.where(np.isfinite(s), s, np.nanmin(s) if np.isfinite(s).any() else 0.0)
+    lo, hi = float(s.min()) if s.size else 0.0, float(s.max()) if s.size else 0.0
+    s = (s - lo) / (hi - lo) if hi > lo else np.zeros_like(s)
+    n = s.size
+    maxc = np.full(n, -1.0, dtype=np.float32)
+    avail = np.ones(n, dtype=bool)
+    picks: List[int] = []
+    at_pick = np.full(n, np.nan)
+    for _ in range(min(int(k), n)):
+        pool = avail & (maxc <= max_corr)
+        if not pool.any():
+            pool = avail
+        adj = np.where(pool, s - penalty * np.clip(maxc, 0.0, None), -np.inf)
+        j = int(np.argmax(adj))
+        picks.append(j)
+        avail[j] = False
+        if len(picks) > 1:
+            at_pick[j] = float(maxc[j])
+        np.maximum(maxc, C[j], out=maxc)
+    return picks, at_pick
+
+
+@tracing.traced("diversify")
+def select(df: pd.DataFrame, top_n: int, *, score_col: str = "FinalScore", candidates: Optional[int] = None,
+           max_corr: float = 0.8, penalty: float = 0.5, lookback: int = LOOKBACK, asof=None,
+           loader: Optional[Callable] = None) -> pd.DataFrame:
+    """Top `top_n` rows of `df` by a correlation-aware greedy pass over the best candidates.
+
+    Returns the basket sorted by score, with MaxCorr (max corr with higher-priority picks)
+    and DivRank (pick order). Falls back to a plain head() when there is nothing to correlate.
+    """
+    if df is None or df.empty or "Ticker" not in df.columns or not top_n or score_col not in df.columns:
+        return df.head(top_n) if df is not None and top_n else df
+    n_cand = min(MAX_CANDIDATES, int(candidates or max(int(top_n) * 5, 100)))
+    pool = (df.assign(_t=df["Ticker"].astype(str).str.upper())
+              .sort_values(score_col, ascending=False)
+              .drop_duplicates("_t")
+              .head(n_cand))
+    if len(pool) <= int(top_n):
+        return pool.drop(columns="_t")
+    _, C = correlations(pool["_t"].tolist(), asof, lookback=lookback, loader=loader)
+    picks, at_pick = greedy(pd.to_numeric(pool[score_col], errors="coerce").to_numpy(), C, int(top_n),
+                            max_corr=max_corr, penalty=penalty)
+    out = pool.iloc[picks].drop(columns="_t").copy()
+    out["MaxCorr"] = np.round(at_pick[picks], 3)
+    out["DivRank"] = np.arange(1, len(picks) + 1)
+    return out.sort_values(score_col, ascending=False)
@@ -1,18 +1,12 @@
 from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
 from pathlib import Path
 import pandas as pd
+from modules.services import paths as bb_paths
+from modules.services import tracing
 
 def _data_dir() -> Path:
-    d = Path(__file__).resolve().parents[1] / "modules" / "Data"
-    d.mkdir(parents=True, exist_ok=True)
-    return d
+    return bb_paths.data_dir()
 
 def _fallback_universe(n: int = 50) -> list[str]:
     base = [
@@ -22,6 +16,7 @@ def _fallback_universe(n: int = 50) -> list[str]:
     ]
     return base[:max(1, min(n, len(base)))]
 
+@tracing.traced("quick_scan", new_run=True)
 def quick_scan(limit: int = 500) -> int:
     data_dir = _data_dir()
     try:
@@ -35,7 +30,8 @@ def quick_scan(limit: int = 500) -> int:
         (data_dir / "ranked_latest.csv").write_text(rank.to_csv(index=False), encoding="utf-8")
         return len(df)
     try:
-        tickers = data_mod.list_universe(limit)
+        with tracing.span("list_universe"):
+            tickers = data_mod.list_universe(limit)
     except Exception:
         tickers = []
     try:
@@ -45,12 +41,14 @@ def quick_scan(limit: int = 500) -> int:
     if snap is None or snap.empty:
         syms = _fallback_universe( min(50, max(10, limit//10)) )
         snap = pd.DataFrame({"Ticker": syms, "P_up": 0.55, "RelSPY": 0.0, "RVOL": 1.1})
-    snap.to_csv(data_dir / "watchlist_snapshot_latest.csv", index=False)
+    with tracing.span("write_snapshot"):
+        snap.to_csv(data_dir / "watchlist_snapshot_latest.csv", index=False)
     try:
         ranked = scoring.rank_now(snap)
         if not isinstance(ranked, pd.DataFrame):
             ranked = ranked[-3] if isinstance(ranked, tuple) and len(ranked) >= 3 else snap
     except Exception:
         ranked = snap
-    (data_dir / "ranked_latest.csv").write_text(ranked.to_csv(index=False), encoding="utf-8")
+    with tracing.span("write_ranked"):
+        (data_dir / "ranked_latest.csv").write_text(ranked.to_csv(index=False), encoding="utf-8")
     return int(len(snap))
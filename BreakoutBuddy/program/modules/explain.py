@@ -1,13 +1,13 @@
 from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
 from typing import Dict, Any
 import math
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from .rules import Rule, convertible, evaluate, or_default, try_float
 def _risk_badge(row) -> str:
     try:
         rvol = float(row.get('RVOL', 1.0))
@@ -121,29 +121,20 @@ def explain_for_row(row: dict, *, allow_local_llm: bool = False) -> Dict[str, An
     if not allow_local_llm:
         return {'quick': quick, 'detailed': detailed, 'risk_badge': badge}
     try:
-        from .services import local_llm
-        if local_llm.is_available():
-            feats = {
-                'RelSPY': row.get('RelSPY', 0.0),
-                'RVOL': row.get('RVOL', 1.0),
-                'RSI4': row.get('RSI4', 50.0),
-                'ConnorsRSI': row.get('ConnorsRSI', 50.0),
-                'ChangePct': row.get('ChangePct', 0.0),
-                'SqueezeHint': row.get('SqueezeHint', 0),
-            }
-            prompt = ('You are a trading assistant. Give a short, neutral explanation (2-4 sentences) '
-                      'of intraday setup quality and risk for the following stock, based ONLY on these features. '
-                      'Avoid jargon; keep it actionable.\n\n'
-                      f"Ticker: {row.get('Ticker','?')}\n"
-                      f"Features: {feats}\n")
-            llm_text = local_llm.infer(prompt, max_tokens=140, temp=0.2)
-            if llm_text:
-                detailed = llm_text.strip()
-                return {'quick': quick, 'detailed': detailed, 'risk_badge': badge}
+        from .services import explain_service
+        llm_text = explain_service.explain_one(row)
+        if llm_text:
+            detailed = llm_text.strip()
+            return {'quick': quick, 'detailed': detailed, 'risk_badge': badge}
     except Exception:
         pass
     return {'quick': quick, 'detailed': detailed, 'risk_badge': badge}
 def explain_scan(df):
+    if isinstance(df, pd.DataFrame):
+        out = df.reset_index(drop=True)
+        ex = explain_frame(out, detailed=False)
+        out = out.assign(QuickWhy=ex["quick"].to_numpy(), RiskBadge=ex["risk_badge"].to_numpy())
+        return out
     rows = []
     for _, r in df.iterrows():
         d = explain_for_row(r.to_dict(), allow_local_llm=False)
@@ -151,8 +142,93 @@ def explain_scan(df):
         out['QuickWhy'] = d['quick']
         out['RiskBadge'] = d['risk_badge']
         rows.append(out)
-    try:
-        import pandas as pd
-        return pd.DataFrame(rows)
-    except Exception:
-        return rows
+    return pd.DataFrame(rows)
+
+
+# ---------- whole-frame version of the rule-based branch ----------
+# explain_frame(df).loc[i] matches explain_for_row(df.loc[i].to_dict()) without the LLM.
+
+_BADGES = np.array(['🟢 Low', '🟡 Medium', '🔴 High'], dtype=object)
+
+QUICK_RULES = [
+    Rule('rel_pos', 'pros', lambda c: c.rel > 0, 'RelSPY+'),
+    Rule('rvol_up', 'pros', lambda c: c.rvol > 1.2, 'RVOL↑'),
+    Rule('rsi_ok', 'pros', lambda c: (c.rsi >= 45) & (c.rsi <= 60), 'RSI ok'),
+    Rule('squeeze', 'pros', lambda c: c.sq > 0, 'Squeeze?'),
+    Rule('rel_neg', 'cons', lambda c: c.rel < 0, 'RelSPY-'),
+    Rule('thin_vol', 'cons', lambda c: c.rvol < 0.8, 'Thin vol'),
+    Rule('overbought', 'cons', lambda c: c.rsi >= 75, 'Overbought'),
+    Rule('oversold', 'cons', lambda c: c.rsi <= 25, 'Oversold'),
+    Rule('whippy', 'cons', lambda c: np.abs(c.chg) > 0.05, 'Whippy'),
+]
+
+DETAIL_RULES = [
+    Rule('strong_vs_spy', 'ctx', lambda c: c.rel > 0.02, 'showing strength vs SPY', 'rel'),
+    Rule('lagging_spy', 'ctx', lambda c: c.rel < -0.02, 'lagging SPY', 'rel'),
+    Rule('moved', 'ctx', lambda c: c.chg != 0,
+         lambda c, idx: [f"today {('up' if v > 0 else 'down')} {abs(v)*100:.1f}%" for v in c.chg[idx].tolist()]),
+    Rule('scored', 'ctx', lambda c: c.sc_ok, lambda c, idx: [f"score {v:.2f}" for v in c.sc[idx].tolist()]),
+    Rule('extended', 'mom', lambda c: c.rsi >= 70, "Momentum looks extended; RSI is elevated and could fade.", 'mom'),
+    Rule('washed_out', 'mom', lambda c: c.rsi <= 30, "Momentum is washed out; RSI is low and may stabilize or continue weak.", 'mom'),
+    Rule('balanced', 'mom', lambda c: (c.rsi >= 45) & (c.rsi <= 60), "Momentum is balanced; RSI sits in a neutral zone.", 'mom'),
+    Rule('mixed', 'mom', lambda c: True, "Momentum is mixed; not clearly overbought or oversold.", 'mom'),
+    Rule('crsi_stretch', 'mom_x', lambda c: c.crsi >= 70, " ConnorsRSI also indicates a short-term stretch.", 'crsi'),
+    Rule('crsi_exhaust', 'mom_x', lambda c: (c.crsi != 0) & (c.crsi <= 30), " ConnorsRSI hints at short-term exhaustion.", 'crsi'),
+    Rule('vol_strong', 'vol', lambda c: c.rvol >= 1.8, "Participation is strong with RVOL well above average.", 'vol'),
+    Rule('vol_above', 'vol', lambda c: c.rvol >= 1.2, "Volume is above normal, indicating active interest.", 'vol'),
+    Rule('vol_light', 'vol', lambda c: c.rvol <= 0.8, "Volume is light; signals may be less reliable.", 'vol'),
+    Rule('vol_avg', 'vol', lambda c: True, "Volume is near average.", 'vol'),
+    Rule('squeeze', 'struct', lambda c: c.sq > 0, "Range is compressing (squeeze), a break could travel quickly.", 'struct'),
+    Rule('atr_high', 'struct', lambda c: c.atrp >= 0.05, "Volatility is elevated; expect wider swings.", 'struct'),
+]
+
+
+def _score_col(df: pd.DataFrame):
+    for nm in ('Combined', 'FinalScore', 'HeuristicScore'):
+        if nm in df.columns:
+            return nm
+    return None
+
+
+def explain_frame(df: pd.DataFrame, *, detailed: bool = True) -> pd.DataFrame:
+    """explain_for_row for every row (rule-based, no LLM): quick, detailed, risk_badge, codes."""
+    cols = ['quick', 'detailed', 'risk_badge', 'codes']
+    if df is None or len(df) == 0:
+        return pd.DataFrame(columns=cols)
+    n = len(df)
+    # _risk_badge reads with float(row.get(...)); the others with `or` defaults
+    b_rvol, b_rsi = try_float(df, 'RVOL', 1.0), try_float(df, 'RSI4', 50.0)
+    heat = (b_rvol > 1.8).astype(int) + ((b_rsi > 70) | (b_rsi < 30)).astype(int)
+    badge = _BADGES[heat]
+    c = SimpleNamespace(
+        rel=or_default(df, 'RelSPY', 0.0), rvol=or_default(df, 'RVOL', 1.0),
+        rsi=or_default(df, 'RSI4', 50.0), crsi=or_default(df, 'ConnorsRSI', 50.0),
+        sq=or_default(df, 'SqueezeHint', 0.0), chg=or_default(df, 'ChangePct', 0.0),
+    )
+    tick = df['Ticker'].tolist() if 'Ticker' in df.columns else ['?'] * n
+    q = evaluate(QUICK_RULES, c, n)
+    quick = [f"{t}: [{' | '.join(p[:3] + k[:3])}] • Risk {b.split()[0]}"
+             for t, p, k, b in zip(tick, q['pros'], q['cons'], badge.tolist())]
+    codes = q['codes']
+    text = [''] * n
+    if detailed:
+        if 'ATRpct' in df.columns:
+            c.atrp = or_default(df, 'ATRpct', 0.0)
+        else:
+            c.atrp = or_default(df, 'ATR_Pct', 0.0)
+        sc = _score_col(df)
+        if sc is None:
+            c.sc, c.sc_ok = np.full(n, np.nan), np.zeros(n, dtype=bool)
+        else:
+            c.sc, c.sc_ok = try_float(df, sc, np.nan), convertible(df, sc)
+        d = evaluate(DETAIL_RULES, c, n)
+        text = []
+        for i in range(n):
+            ctx = ", ".join(d['ctx'][i]) if d['ctx'][i] else "standard conditions"
+            parts = [f"{tick[i]} is under {ctx}.", d['mom'][i][0] + "".join(d['mom_x'][i]), d['vol'][i][0]]
+            parts += d['struct'][i]
+            parts.append(f"Overall risk: {badge[i]}.")
+            text.append(" ".join(parts[:5]).strip())
+        codes = [a + b for a, b in zip(codes, d['codes'])]
+    return pd.DataFrame({'quick': quick, 'detailed': text, 'risk_badge': badge, 'codes': codes},
+                        index=df.index, columns=cols)
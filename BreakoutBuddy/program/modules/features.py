@@ -1,86 +1,14 @@
 from __future__ import annotations
 
 from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
 
-
-from pathlib import Path
-
-# ---------- Strict per-app Data/Extras resolver (BreakoutBuddy) ----------
-from pathlib import Path
-import os, sys
-BB_HERE     = Path(__file__).resolve()
-BB_APP_ROOT = BB_HERE.parents[1]   # .../BreakoutBuddy
-
-def _bb_cloud_roots():
-    h = Path.home()
-    return [
-        h / "OneDrive",
-        h / "OneDrive - Personal",
-        h / "OneDrive - Wagstaff Law Firm",
-        h / "Dropbox",
-        h / "Google Drive",
-        h / "Library" / "CloudStorage" / "OneDrive",
-        h / "Library" / "CloudStorage" / "Dropbox",
-        h / "Library" / "CloudStorage" / "GoogleDrive",
-    ]
-
-def _bb_first_existing(paths):
-    for p in paths:
-        try:
-            p2 = Path(p).expanduser().resolve()
-            if p2.exists():
-                return p2
-        except Exception:
-            pass
-    return None
-
-def bb_resolve_dir(preferred_env_var: str, fallback_name: str):
-    """
-    Strict per-app order (NO repo-level fallback):
-      1) Env var (abs or relative)
-      2) BB_APP_ROOT/<name>
-      3) CWD/<name>
-      4) Cloud roots: <BreakoutBuddy>/<name>
-      5) Create BB_APP_ROOT/<name>
-    """
-    envv = os.environ.get(preferred_env_var, "").strip()
-    if envv:
-        cand = (Path(envv) if os.path.isabs(envv) else (Path.cwd() / envv))
-        if cand.exists():
-            return cand.resolve()
-
-    hit = _bb_first_existing([BB_APP_ROOT / fallback_name, Path.cwd() / fallback_name])
-    if hit:
-        return hit
-
-    cands = []
-    for root in _bb_cloud_roots():
-        cands += [
-            root / BB_APP_ROOT.name / fallback_name,
-            root / "Projects" / BB_APP_ROOT.name / fallback_name,
-        ]
-    hit = _bb_first_existing(cands)
-    if hit:
-        return hit
-
-    target = (BB_APP_ROOT / fallback_name).resolve()
-    target.mkdir(parents=True, exist_ok=True)
-    return target
-
-BB_DATA   = bb_resolve_dir("BREAKOUTBUDDY_DATA",   "Data")
-BB_EXTRAS = bb_resolve_dir("BREAKOUTBUDDY_EXTRAS", "extras")
-
-bb_extras_src = (BB_EXTRAS / "src")
-if bb_extras_src.exists() and str(bb_extras_src) not in sys.path:
-    sys.path.insert(0, str(bb_extras_src))
-# ---------- end resolver ----------
 from typing import Iterable, Optional, Sequence
 import pandas as pd
-import duckdb
+from modules.services.lazy import lazy_import
+from modules.services.versions import bump_db_version
+from modules.services import dtypes
+
+duckdb = lazy_import("duckdb")
 
 # Columns we persist; extra columns are ignored safely.
 FEATURE_COLS: Sequence[str] = [
@@ -131,16 +59,24 @@ def persist_features(df: pd.DataFrame, db_path: Path | str, *, asof: Optional[pd
     if tmp.empty:
         return 0
     asof = pd.Timestamp.utcnow().floor("min") if asof is None else pd.Timestamp(asof)
+    if asof.tzinfo is not None:
+        asof = asof.tz_localize(None)   # TIMESTAMP column: naive, as everywhere else
+    tmp = dtypes.compact(tmp, inplace=True, categorical=False, float32=False)
     tmp.insert(0, "as_of", asof)
     con = duckdb.connect(str(db_path))
     _ensure_table(con)
     con.register("tmp_df", tmp)
-    con.execute("INSERT INTO features_history SELECT * FROM tmp_df")
+    con.execute("INSERT INTO features_history BY NAME SELECT * FROM tmp_df")
     con.unregister("tmp_df")
     con.close()
+    bump_db_version(db_path)
     return len(tmp)
 
-def load_features(db_path: Path | str, *, tickers: Optional[Iterable[str]] = None, latest: bool = True) -> pd.DataFrame:
+def load_features(db_path: Path | str, *, tickers: Optional[Iterable[str]] = None, latest: bool = True,
+                  compact: bool = True) -> pd.DataFrame:
+    """Latest row per ticker (or the full history with latest=False).
+    compact=True applies the dtype policy (services/dtypes.py) to what comes back.
+    """
     con = duckdb.connect(str(db_path))
     _ensure_table(con)
     if latest:
@@ -151,9 +87,57 @@ def load_features(db_path: Path | str, *, tickers: Optional[Iterable[str]] = Non
             df = con.execute("SELECT * FROM features_latest").df()
     else:
         if tickers:
-            q = "SELECT * FROM features_history WHERE upper(Ticker) IN (%s) ORDER BY asof DESC" % ",".join(['?']*len(list(tickers)))
+            q = "SELECT * FROM features_history WHERE upper(Ticker) IN (%s) ORDER BY as_of DESC" % ",".join(['?']*len(list(tickers)))
             df = con.execute(q, [t.upper() for t in tickers]).df()
         else:
-            df = con.execute("SELECT * FROM features_history ORDER BY asof DESC").df()
+            df = con.execute("SELECT * FROM features_history ORDER BY as_of DESC").df()
     con.close()
-    return df
+    return dtypes.compact(df, inplace=True) if compact else df
+
+
+# ---------- labels (forward outcome per features_history row) ----------
+
+def _ensure_labels_table(con: duckdb.DuckDBPyConnection) -> None:
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS features_labels (
+            as_of TIMESTAMP,
+            Ticker VARCHAR,
+            horizon_days INTEGER,
+            target_pct DOUBLE,
+            label INTEGER,
+            fwd_max_ret DOUBLE
+        );
+    """)
+
+def update_labels(con: duckdb.DuckDBPyConnection, *, horizon_days: int = 5, target_pct: float = 3.0) -> int:
+    """Label rows whose horizon has fully elapsed and that aren't labelled yet.
+
+    label = 1 when any later Close for the ticker within `horizon_days` reaches
+    Close * (1 + target_pct/100). Only rows past the last labelled as_of are scanned,
+    so the cost tracks new history, not total history. Returns rows added.
+    """
+    _ensure_table(con)
+    _ensure_labels_table(con)
+    hwm = con.execute(
+        "SELECT max(as_of) FROM features_labels WHERE horizon_days = ? AND target_pct = ?",
+        [int(horizon_days), float(target_pct)],
+    ).fetchone()[0]
+    cutoff = con.execute(
+        f"SELECT max(as_of) - INTERVAL {int(horizon_days)} DAY FROM features_history"
+    ).fetchone()[0]
+    if cutoff is None or (hwm is not None and cutoff <= hwm):
+        return 0
+    before = con.execute("SELECT count(*) FROM features_labels").fetchone()[0]
+    con.execute(f"""
+        INSERT INTO features_labels
+        SELECT f.as_of, f.Ticker, ?, ?,
+               CASE WHEN max(g.Close) >= f.Close * (1 + ? / 100.0) THEN 1 ELSE 0 END,
+               max(g.Close) / f.Close - 1
+        FROM features_history f
+        JOIN features_history g
+          ON g.Ticker = f.Ticker AND g.as_of > f.as_of
+         AND g.as_of <= f.as_of + INTERVAL {int(horizon_days)} DAY
+        WHERE f.as_of > coalesce(?, TIMESTAMP '1900-01-01') AND f.as_of <= ? AND f.Close > 0
+        GROUP BY f.as_of, f.Ticker, f.Close
+    """, [int(horizon_days), float(target_pct), float(target_pct), hwm, cutoff])
+    return int(con.execute("SELECT count(*) FROM features_labels").fetchone()[0] - before)
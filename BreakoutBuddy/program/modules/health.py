@@ -1,21 +1,14 @@
 from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
 from pathlib import Path
 import json
+from modules.services import paths as bb_paths
 
 def _program_root() -> Path:
     return Path(__file__).resolve().parents[1]
 
 def _data_dir() -> Path:
-    d = Path(__file__).resolve().parent / "Data"
-    d.mkdir(parents=True, exist_ok=True)
-    return d
+    return bb_paths.data_dir()
 
 def run_health_check() -> dict:
     root = _program_root()
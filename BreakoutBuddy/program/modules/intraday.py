@@ -0,0 +1,382 @@
+from __future__ import annotations
+
+# intraday.py — streaming intraday mode: replay 1m/5m bars, update indicators per bar
+# in O(1), and emit ranking deltas as events.
+#
+#   TickerState             rolling-window RSI2/RSI4, ATR, RVOL, RelSPY, squeeze state
+#   StreamRanker            per-bar update -> RankEvent list (enter / exit / move)
+#   load_replay(path)       CSV/parquet bars -> tidy frame (Datetime, Ticker, OHLCV)
+#   from_cache(tickers)     intraday bars through ohlcv_cache
+#   iter_bars(bars, speed)  time-ordered bar tuples, optionally paced in real time
+#   run_replay(bars)        drive a StreamRanker, report tick-to-rank latency percentiles
+#   benchmark(n_symbols)    synthetic session (500 symbols by default) through run_replay
+#
+# RSI2/RSI4, ATR, RVOL and SqueezeHint use the windows of modules/data.py (rolling means,
+# not Wilder smoothing), so they equal the batch values computed on the same bars. Two
+# columns are intraday definitions and differ from the batch ones on purpose:
+#   ChangePct  move since the session reference (ref_close, else the first bar's open);
+#              data.py measures it against the previous bar
+#   RelSPY     5-bar mean return minus SPY's; data.py does not subtract SPY (uses 0)
+
+import bisect, math, time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from modules.services.scoring import combined_score
+
+BAR_COLS = ["Datetime", "Ticker", "Open", "High", "Low", "Close", "Volume"]
+
+
+class Rolling:
+    """Fixed-length window with running sum / sum of squares (O(1) push)."""
+
+    __slots__ = ("n", "buf", "s", "ss", "_pushes")
+
+    def __init__(self, n: int):
+        self.n = int(n)
+        self.buf: deque = deque()
+        self.s = 0.0
+        self.ss = 0.0
+        self._pushes = 0
+
+    def push(self, x: float) -> None:
+        self.buf.append(x)
+        self.s += x
+        self.ss += x * x
+        if len(self.buf) > self.n:
+            old = self.buf.popleft()
+            self.s -= old
+            self.ss -= old * old
+        self._pushes += 1
+        if self._pushes % 4096 == 0:        # shed accumulated float drift now and then
+            self.s = math.fsum(self.buf)
+            self.ss = math.fsum(v * v for v in self.buf)
+
+    @property
+    def full(self) -> bool:
+        return len(self.buf) >= self.n
+
+    def mean(self) -> float:
+        return self.s / self.n if self.full else float("nan")
+
+    def std(self) -> float:
+        # sample stdev (ddof=1), like pandas rolling().std()
+        if not self.full or self.n < 2:
+            return float("nan")
+        var = (self.ss - self.s * self.s / self.n) / (self.n - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+
+class TickerState:
+    """Indicator state for one ticker; update() is O(1) per bar."""
+
+    __slots__ = ("ticker", "ref_close", "prev_close", "last", "gain2", "loss2", "gain4", "loss4",
+                 "tr", "vol", "ret5", "ret20", "ret120", "w120", "bars")
+
+    def __init__(self, ticker: str, ref_close: Optional[float] = None):
+        self.ticker = ticker
+        self.ref_close = ref_close
+        self.prev_close: Optional[float] = None
+        self.last: Dict[str, float] = {}
+        self.gain2, self.loss2 = Rolling(2), Rolling(2)
+        self.gain4, self.loss4 = Rolling(4), Rolling(4)
+        self.tr = Rolling(14)
+        self.vol = Rolling(20)
+        self.ret5 = Rolling(5)
+        self.ret20 = Rolling(20)
+        self.ret120 = Rolling(120)
+        self.w120 = Rolling(120)         # rolling 120-bar stdev, to z-score the 20-bar one
+        self.bars = 0
+
+    @staticmethod
+    def _rsi(gain: Rolling, loss: Rolling) -> float:
+        if not loss.full or loss.s <= 0.0:
+            return 50.0
+        rs = gain.s / loss.s
+        return 100.0 - 100.0 / (1.0 + rs)
+
+    def update(self, o: float, h: float, l: float, c: float, v: float, spy_ret5: float = 0.0) -> Dict[str, float]:
+        pc = self.prev_close
+        if self.ref_close is None:
+            self.ref_close = o if o == o and o > 0 else c
+        if pc is not None:
+            d = c - pc
+            g, ls = (d, 0.0) if d > 0 else (0.0, -d)
+            self.gain2.push(g); self.loss2.push(ls)
+            self.gain4.push(g); self.loss4.push(ls)
+            r = c / pc - 1.0 if pc else 0.0
+            self.ret5.push(r); self.ret20.push(r); self.ret120.push(r)
+            if self.ret120.full:
+                self.w120.push(self.ret120.std())
+            tr = max(h - l, abs(h - pc), abs(l - pc))
+        else:
+            tr = h - l
+        self.tr.push(tr)
+        self.vol.push(v if v == v else 0.0)
+        self.prev_close = c
+        self.bars += 1
+
+        vm = self.vol.mean()
+        rvol = v / vm if vm == vm and vm > 0 else 1.0
+        atr = self.tr.mean()
+        rel = self.ret5.mean()
+        w20, wm, ws = self.ret20.std(), self.w120.mean(), self.w120.std()
+        z = (w20 - wm) / (ws + 1e-9) if (w20 == w20 and wm == wm and ws == ws) else float("nan")
+        self.last = {
+            "Close": c,
+            "Volume": v,
+            "ChangePct": (c / self.ref_close - 1.0) * 100.0 if self.ref_close else 0.0,
+            "RSI2": self._rsi(self.gain2, self.loss2),
+            "RSI4": self._rsi(self.gain4, self.loss4),
+            "RVOL": rvol,
+            "ATR": atr if atr == atr else 0.0,
+            "RelSPY": (rel - spy_ret5) if rel == rel else 0.0,
+            "SqueezeHint": 1 if z < -0.5 else 0,
+        }
+        return self.last
+
+
+@dataclass
+class RankEvent:
+    ts: object
+    ticker: str
+    kind: str                 # "enter" | "exit" | "move"
+    rank: Optional[int]       # 1-based, None after an exit
+    prev_rank: Optional[int]
+    score: float
+    seq: int                  # bar sequence number that caused it
+
+
+@dataclass
+class StreamRanker:
+    """Keeps every ticker's score in a sorted list; each bar re-slots one ticker.
+
+    Events are emitted for the ticker that moved inside the top_n, entered it or left it,
+    plus the ticker it pushed out (or pulled in). Neighbours that merely shift by one
+    place are not reported.
+    """
+    top_n: int = 25
+    p_up: Dict[str, float] = field(default_factory=dict)     # daily model odds, if known
+    ref_close: Dict[str, float] = field(default_factory=dict)
+    spy: str = "SPY"
+    states: Dict[str, TickerState] = field(default_factory=dict)
+    scores: Dict[str, float] = field(default_factory=dict)
+    _order: List[Tuple[float, str]] = field(default_factory=list)
+    seq: int = 0
+
+    def _state(self, t: str) -> TickerState:
+        st = self.states.get(t)
+        if st is None:
+            st = self.states[t] = TickerState(t, self.ref_close.get(t))
+        return st
+
+    def rank_of(self, ticker: str) -> Optional[int]:
+        s = self.scores.get(ticker)
+        if s is None:
+            return None
+        return bisect.bisect_left(self._order, (-s, ticker)) + 1
+
+    def on_bar(self, ts, ticker: str, o: float, h: float, l: float, c: float, v: float) -> List[RankEvent]:
+        self.seq += 1
+        spy = self.states.get(self.spy)
+        spy_r5 = spy.ret5.mean() if spy is not None and ticker != self.spy else 0.0
+        ind = self._state(ticker).update(o, h, l, c, v, spy_r5 if spy_r5 == spy_r5 else 0.0)
+        score = float(combined_score(self.p_up.get(ticker, 0.5), ind["RelSPY"], ind["RVOL"]))
+        score *= 1.0 + 0.05 * ind["SqueezeHint"]
+
+        n = self.top_n
+        old = self.scores.get(ticker)
+        prev_rank = None
+        if old is not None:
+            i = bisect.bisect_left(self._order, (-old, ticker))
+            prev_rank = i + 1
+            del self._order[i]
+        key = (-score, ticker)
+        j = bisect.bisect_left(self._order, key)
+        self._order.insert(j, key)
+        self.scores[ticker] = score
+        rank = j + 1
+
+        was_in = prev_rank is not None and prev_rank <= n
+        now_in = rank <= n
+        ev: List[RankEvent] = []
+        if now_in and not was_in:
+            ev.append(RankEvent(ts, ticker, "enter", rank, prev_rank, score, self.seq))
+            if len(self._order) > n:            # whoever now sits at n+1 was pushed out
+                s, t = self._order[n]
+                ev.append(RankEvent(ts, t, "exit", None, n, -s, self.seq))
+        elif was_in and not now_in:
+            ev.append(RankEvent(ts, ticker, "exit", None, prev_rank, score, self.seq))
+            if len(self._order) >= n:           # and whoever moved up into slot n
+                s, t = self._order[n - 1]
+                ev.append(RankEvent(ts, t, "enter", n, n + 1, -s, self.seq))
+        elif now_in and rank != prev_rank:
+            ev.append(RankEvent(ts, ticker, "move", rank, prev_rank, score, self.seq))
+        return ev
+
+    def snapshot(self) -> pd.DataFrame:
+        """Current indicator values, best score first (pull_enriched_snapshot-like columns)."""
+        rows = []
+        for i, (s, t) in enumerate(self._order):
+            st = self.states[t]
+            rows.append({"Ticker": t, "Rank": i + 1, "Combined": -s, "P_up": self.p_up.get(t, 0.5),
+                         "Bars": st.bars, **st.last})
+        return pd.DataFrame(rows)
+
+
+# ---------- feeds ----------
+
+def _tidy(df: pd.DataFrame) -> pd.DataFrame:
+    d = df.copy()
+    if isinstance(d.columns, pd.MultiIndex):
+        d.columns = [c[0] for c in d.columns]
+    ren = {}
+    for c in d.columns:
+        lc = str(c).strip().lower()
+        if lc in ("datetime", "date", "timestamp", "time", "ts"):
+            ren[c] = "Datetime"
+        elif lc in ("ticker", "symbol"):
+            ren[c] = "Ticker"
+        elif lc in ("open", "high", "low", "close", "volume"):
+            ren[c] = lc.capitalize()
+    d = d.rename(columns=ren)
+    if "Datetime" not in d.columns or "Ticker" not in d.columns or "Close" not in d.columns:
+        return pd.DataFrame(columns=BAR_COLS)
+    d["Datetime"] = pd.to_datetime(d["Datetime"], errors="coerce", utc=True)
+    d["Ticker"] = d["Ticker"].astype(str).str.upper()
+    for c in ("Open", "High", "Low", "Close", "Volume"):
+        d[c] = pd.to_numeric(d[c], errors="coerce") if c in d.columns else np.nan
+    d["Open"] = d["Open"].fillna(d["Close"])
+    d["High"] = d["High"].fillna(d["Close"])
+    d["Low"] = d["Low"].fillna(d["Close"])
+    d["Volume"] = d["Volume"].fillna(0.0)
+    d = d.dropna(subset=["Datetime", "Close"])
+    return d[BAR_COLS].sort_values(["Datetime", "Ticker"], kind="stable").reset_index(drop=True)
+
+
+def load_replay(path: Path | str) -> pd.DataFrame:
+    """Bars from a local replay file (CSV or parquet; long format, one row per ticker-bar)."""
+    p = Path(path)
+    try:
+        df = pd.read_parquet(p) if p.suffix.lower() in (".parquet", ".pq") else pd.read_csv(p)
+    except Exception:
+        return pd.DataFrame(columns=BAR_COLS)
+    return _tidy(df)
+
+
+def from_cache(tickers: Sequence[str], *, interval: str = "5m", period: str = "5d") -> pd.DataFrame:
+    """Intraday bars for `tickers` via ohlcv_cache (served from Data/cache/yf when fresh)."""
+    from modules.services import ohlcv_cache
+    parts = []
+    for t in tickers:
+        try:
+            h = ohlcv_cache.get_history(str(t).upper(), period=period, interval=interval)
+            if h is None or h.empty:
+                continue
+            h = h.copy()
+            h["Ticker"] = str(t).upper()
+            parts.append(h)
+        except Exception:
+            continue
+    if not parts:
+        return pd.DataFrame(columns=BAR_COLS)
+    return _tidy(pd.concat(parts, ignore_index=True))
+
+
+def iter_bars(bars: pd.DataFrame, speed: Optional[float] = None) -> Iterator[tuple]:
+    """Yield (ts, ticker, o, h, l, c, v) in time order.
+
+    speed=None replays as fast as possible; speed=60 plays one minute of bars per second.
+    """
+    cols = [bars[c].to_numpy() for c in BAR_COLS]
+    ts_ns = bars["Datetime"].astype("int64").to_numpy() if speed else None
+    t0 = time.perf_counter()
+    for i, row in enumerate(zip(*cols)):
+        if speed:
+            due = (ts_ns[i] - ts_ns[0]) / 1e9 / float(speed)
+            lag = due - (time.perf_counter() - t0)
+            if lag > 0:
+                time.sleep(lag)
+        yield row
+
+
+# ---------- harness ----------
+
+def _pct(a: np.ndarray, q: float) -> float:
+    return round(float(np.percentile(a, q)), 4) if a.size else 0.0
+
+
+def run_replay(bars: pd.DataFrame, *, ranker: Optional[StreamRanker] = None, top_n: int = 25,
+               speed: Optional[float] = None, on_event: Optional[Callable[[RankEvent], None]] = None) -> Dict:
+    """Push every bar through a StreamRanker and time bar arrival -> events handed off.
+
+    Latency covers the indicator update, the re-rank and the on_event callbacks.
+    Returns counts, throughput and latency percentiles in milliseconds.
+    """
+    rk = ranker or StreamRanker(top_n=top_n)
+    lat = np.empty(len(bars), dtype=np.float64)
+    n_ev = 0
+    kinds: Dict[str, int] = {}
+    t_start = time.perf_counter()
+    i = 0
+    pc = time.perf_counter
+    for ts, t, o, h, l, c, v in iter_bars(bars, speed):
+        t0 = pc()
+        ev = rk.on_bar(ts, t, float(o), float(h), float(l), float(c), float(v))
+        if ev:
+            n_ev += len(ev)
+            for e in ev:
+                kinds[e.kind] = kinds.get(e.kind, 0) + 1
+                if on_event is not None:
+                    on_event(e)
+        lat[i] = (pc() - t0) * 1000.0
+        i += 1
+    wall = time.perf_counter() - t_start
+    lat = lat[:i]
+    return {
+        "bars": i,
+        "tickers": len(rk.states),
+        "events": n_ev,
+        "event_kinds": kinds,
+        "wall_s": round(wall, 4),
+        "bars_per_s": round(i / wall, 1) if wall > 0 else 0.0,
+        "latency_ms": {"p50": _pct(lat, 50), "p90": _pct(lat, 90), "p99": _pct(lat, 99),
+                       "p999": _pct(lat, 99.9), "max": _pct(lat, 100)},
+        "ranker": rk,
+    }
+
+
+def synthetic_session(n_symbols: int = 500, n_bars: int = 390, *, freq: str = "1min",
+                      seed: Optional[int] = 0, start: str = "2024-01-02 14:30") -> pd.DataFrame:
+    """Random-walk bars for `n_symbols` tickers over one session (long format)."""
+    rng = np.random.default_rng(seed)
+    ts = pd.date_range(start, periods=n_bars, freq=freq, tz="UTC")
+    names = ["SPY"] + [f"S{i:04d}" for i in range(max(0, n_symbols - 1))]
+    S = len(names)
+    vol = rng.uniform(0.0005, 0.003, S)
+    r = rng.standard_normal((n_bars, S)) * vol
+    close = rng.uniform(10, 300, S) * np.exp(np.cumsum(r, axis=0))
+    open_ = np.vstack([close[:1] / np.exp(r[:1]), close[:-1]])
+    wig = np.abs(rng.standard_normal((n_bars, S))) * vol * close
+    high = np.maximum(open_, close) + wig
+    low = np.minimum(open_, close) - wig
+    volume = rng.lognormal(9, 0.6, (n_bars, S)).round()
+    return pd.DataFrame({
+        "Datetime": np.repeat(ts, S),
+        "Ticker": np.tile(names, n_bars),
+        "Open": open_.ravel(), "High": high.ravel(), "Low": low.ravel(),
+        "Close": close.ravel(), "Volume": volume.ravel(),
+    })
+
+
+def benchmark(n_symbols: int = 500, n_bars: int = 390, *, top_n: int = 25, seed: Optional[int] = 0) -> Dict:
+    """Tick-to-rank latency for a synthetic session of n_symbols x n_bars 1-minute bars."""
+    bars = synthetic_session(n_symbols, n_bars, seed=seed)
+    out = run_replay(bars, top_n=top_n)
+    out.pop("ranker", None)
+    return out
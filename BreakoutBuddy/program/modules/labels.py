@@ -1,17 +1,11 @@
 from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
 import pandas as pd
 import numpy as np
-import yfinance as yf
+from modules.services import market_data
 
 def compute_labels_for_symbol(ticker: str, horizon: int = 5, target_pct: float = 3.0) -> pd.DataFrame:
-    df = yf.download(ticker, period="2y", interval="1d", auto_adjust=False, progress=False)
+    df = market_data.download(ticker, period="2y", interval="1d", auto_adjust=False, progress=False)
     if df is None or df.empty:
         return pd.DataFrame()
     df = df.rename_axis("Date").reset_index()
@@ -1,17 +1,22 @@
 from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
+import pickle, time
 import pandas as pd
 import numpy as np
-from typing import Tuple, Dict, Any
-from sklearn.linear_model import SGDClassifier
-from sklearn.metrics import roc_auc_score
-from sklearn.calibration import CalibratedClassifierCV
+from datetime import datetime
+from pathlib import Path
+from typing import Tuple, Dict, Any, Optional, TYPE_CHECKING
+from modules.services import paths as bb_paths
+from modules.services.lazy import lazy_import
+
+if TYPE_CHECKING:
+    from sklearn.calibration import CalibratedClassifierCV
+
+_sk_linear = lazy_import("sklearn.linear_model")
+_sk_metrics = lazy_import("sklearn.metrics")
+_sk_calibration = lazy_import("sklearn.calibration")
+_sk_pre = lazy_import("sklearn.preprocessing")
+duckdb = lazy_import("duckdb")
 
 FEATURES = ["RSI2","RSI4","ConnorsRSI","PctFrom200d","RelSPY","RVOL","ATR","SqueezeHint","CrowdRisk","RetailChaseRisk"]
 
@@ -21,17 +26,218 @@ def train_online(df_hist: pd.DataFrame) -> Tuple[CalibratedClassifierCV, Dict[st
         raise ValueError("No training rows")
     X = df[FEATURES].values
     y = df["label"].astype(int).values
-    base = SGDClassifier(loss="log_loss", penalty="l2", alpha=1e-4, max_iter=2000, random_state=0)
-    clf = CalibratedClassifierCV(base, method="sigmoid", cv=3)
+    base = _sk_linear.SGDClassifier(loss="log_loss", penalty="l2", alpha=1e-4, max_iter=2000, random_state=0)
+    clf = _sk_calibration.CalibratedClassifierCV(base, method="sigmoid", cv=3)
     clf.fit(X, y)
     proba = clf.predict_proba(X)[:,1]
-    auc = roc_auc_score(y, proba) if len(np.unique(y))>1 else 0.5
+    auc = _sk_metrics.roc_auc_score(y, proba) if len(np.unique(y))>1 else 0.5
     meta = {"auc": float(auc), "n": int(len(df))}
     return clf, meta
 
 def score_snapshot(model, snap_df: pd.DataFrame) -> pd.DataFrame:
     work = snap_df.copy()
-    X = work[FEATURES].fillna(0).values
+    if hasattr(model, "frame_to_X"):
+        # IncrementalModel: fixed scaler state, its own feature list
+        X = model.frame_to_X(work)
+    else:
+        X = work[FEATURES].fillna(0).values
     prob = model.predict_proba(X)[:,1]
     work["P_up"] = prob
     return work
+
+
+# ---------- incremental learner (streams features_history + features_labels) ----------
+
+INCR_VERSION = 1
+# What features_history actually stores (ATRpct derived in SQL, so it's price-scale free).
+STREAM_FEATURES = ["ChangePct","RelSPY","RVOL","RSI4","ConnorRSI","ATRpct","ADX","SqueezeOn","SqueezeHint","GapPct"]
+_SNAPSHOT_ALIASES = {"ConnorRSI": "ConnorsRSI"}
+
+
+def _state_path() -> Path:
+    return bb_paths.data_dir() / "models" / "incremental_learner.pkl"
+
+
+class IncrementalModel:
+    """SGD logistic model + running StandardScaler, Platt-calibrated on a rolling holdout.
+
+    Persisted with a version and high-water mark (`hwm`, last as_of consumed by training)
+    so the next retrain only streams rows after it.
+    """
+
+    def __init__(self, horizon_days: int = 5, target_pct: float = 3.0):
+        self.version = INCR_VERSION
+        self.features = list(STREAM_FEATURES)
+        self.horizon_days = int(horizon_days)
+        self.target_pct = float(target_pct)
+        self.scaler = _sk_pre.StandardScaler()
+        self.sgd = _sk_linear.SGDClassifier(loss="log_loss", penalty="l2", alpha=1e-4, random_state=0)
+        self.platt = (1.0, 0.0)
+        self.hwm = None
+        self.n_seen = 0
+        self.holdout_auc = None
+        self.holdout_n = 0
+        self.trained_at = None
+
+    @property
+    def fitted(self) -> bool:
+        return self.n_seen > 0 and hasattr(self.sgd, "coef_")
+
+    def partial_fit(self, X: np.ndarray, y: np.ndarray) -> None:
+        self.scaler.partial_fit(X)
+        self.sgd.partial_fit(self.scaler.transform(X), y, classes=np.array([0, 1]))
+        self.n_seen += int(len(y))
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        return self.sgd.decision_function(self.scaler.transform(X))
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        a, b = self.platt
+        z = np.clip(a * self.decision_function(X) + b, -30, 30)
+        p1 = 1.0 / (1.0 + np.exp(-z))
+        return np.column_stack([1.0 - p1, p1])
+
+    def frame_to_X(self, df: pd.DataFrame) -> np.ndarray:
+        work = df.copy()
+        for dst, src in _SNAPSHOT_ALIASES.items():
+            if dst not in work.columns and src in work.columns:
+                work[dst] = work[src]
+        if "ATRpct" not in work.columns and {"ATR", "Close"} <= set(work.columns):
+            work["ATRpct"] = pd.to_numeric(work["ATR"], errors="coerce") / pd.to_numeric(work["Close"], errors="coerce")
+        X = work.reindex(columns=self.features).apply(pd.to_numeric, errors="coerce")
+        # missing values -> running mean, i.e. 0 after scaling
+        means = getattr(self.scaler, "mean_", np.zeros(len(self.features)))
+        return X.fillna(pd.Series(means, index=self.features)).to_numpy(dtype=np.float64)
+
+
+def load_incremental(path: Optional[Path] = None) -> Optional[IncrementalModel]:
+    p = Path(path or _state_path())
+    if not p.exists():
+        return None
+    try:
+        with open(p, "rb") as f:
+            mdl = pickle.load(f)
+        if getattr(mdl, "version", None) != INCR_VERSION or list(getattr(mdl, "features", [])) != STREAM_FEATURES:
+            return None
+        return mdl
+    except Exception:
+        return None
+
+
+def save_incremental(mdl: IncrementalModel, path: Optional[Path] = None) -> Path:
+    p = Path(path or _state_path())
+    bb_paths.ensure_dir(p.parent)
+    tmp = p.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(mdl, f)
+    tmp.replace(p)
+    return p
+
+
+_STREAM_SQL = """
+    SELECT f.as_of, {cols}, l.label
+    FROM features_history f
+    JOIN features_labels l
+      ON l.as_of = f.as_of AND l.Ticker = f.Ticker AND l.horizon_days = ? AND l.target_pct = ?
+    WHERE f.as_of > ? AND f.as_of <= ?
+    ORDER BY f.as_of
+"""
+
+
+def _select_cols() -> str:
+    out = []
+    for c in STREAM_FEATURES:
+        if c == "ATRpct":
+            out.append("CASE WHEN f.Close > 0 THEN f.ATR / f.Close END AS ATRpct")
+        else:
+            out.append(f"f.{c}")
+    return ", ".join(out)
+
+
+def train_incremental(db_path: Optional[Path | str] = None, *, horizon_days: int = 5, target_pct: float = 3.0,
+                      chunk_rows: int = 50_000, holdout_days: int = 10, holdout_max: int = 20_000,
+                      reset: bool = False) -> Dict[str, Any]:
+    """Label new history, stream rows since the last run through partial_fit, re-calibrate.
+
+    The newest `holdout_days` of labelled rows are never trained on yet; they (capped at
+    `holdout_max`) refit the Platt scaling and give the AUC. As they age out of the window
+    they're consumed by the next run, so each run's cost is new rows + a fixed holdout.
+    """
+    from modules import features as feat_mod
+    t0 = time.perf_counter()
+    con = duckdb.connect(str(db_path or bb_paths.db_path()))
+    try:
+        labelled = feat_mod.update_labels(con, horizon_days=horizon_days, target_pct=target_pct)
+        mdl = None if reset else load_incremental()
+        if mdl is not None and (mdl.horizon_days, mdl.target_pct) != (int(horizon_days), float(target_pct)):
+            mdl = None
+        mdl = mdl or IncrementalModel(horizon_days, target_pct)
+
+        last = con.execute(
+            "SELECT max(as_of) FROM features_labels WHERE horizon_days = ? AND target_pct = ?",
+            [int(horizon_days), float(target_pct)],
+        ).fetchone()[0]
+        if last is None:
+            return {"trained": 0, "labelled": labelled, "n_seen": mdl.n_seen, "hwm": mdl.hwm}
+        train_cut = pd.Timestamp(last) - pd.Timedelta(days=int(holdout_days))
+        lo = mdl.hwm if mdl.hwm is not None else pd.Timestamp("1900-01-01")
+        params = [int(horizon_days), float(target_pct)]
+
+        trained, first, hwm = 0, None, mdl.hwm
+        if train_cut > pd.Timestamp(lo):
+            res = con.execute(_STREAM_SQL.format(cols=_select_cols()), params + [lo, train_cut])
+            vectors = max(1, int(chunk_rows) // 2048)
+            while True:
+                chunk = res.fetch_df_chunk(vectors)
+                if chunk is None or chunk.empty:
+                    break
+                chunk = chunk.dropna(subset=["label"])
+                if chunk.empty:
+                    continue
+                mdl.partial_fit(mdl.frame_to_X(chunk), chunk["label"].astype(int).to_numpy())
+                trained += len(chunk)
+                first = first if first is not None else chunk["as_of"].iloc[0]
+                hwm = chunk["as_of"].iloc[-1]
+        mdl.hwm = hwm
+
+        if mdl.fitted:
+            hold = con.execute(
+                _STREAM_SQL.format(cols=_select_cols()).replace("ORDER BY f.as_of", "ORDER BY f.as_of DESC LIMIT ?"),
+                params + [pd.Timestamp(mdl.hwm), pd.Timestamp(last), int(holdout_max)],
+            ).df().dropna(subset=["label"])
+            mdl.holdout_n = int(len(hold))
+            y = hold["label"].astype(int).to_numpy() if len(hold) else np.array([])
+            if len(np.unique(y)) > 1:
+                z = mdl.decision_function(mdl.frame_to_X(hold)).reshape(-1, 1)
+                lr = _sk_linear.LogisticRegression(C=1e4).fit(z, y)
+                mdl.platt = (float(lr.coef_[0][0]), float(lr.intercept_[0]))
+                mdl.holdout_auc = float(_sk_metrics.roc_auc_score(y, mdl.predict_proba(mdl.frame_to_X(hold))[:, 1]))
+            mdl.trained_at = datetime.now().isoformat(timespec="seconds")
+            save_incremental(mdl)
+            if trained:
+                _record_model(con, mdl, first, trained)
+        return {
+            "trained": trained, "labelled": labelled, "n_seen": mdl.n_seen,
+            "hwm": str(mdl.hwm) if mdl.hwm is not None else None,
+            "holdout_n": mdl.holdout_n, "holdout_auc": mdl.holdout_auc,
+            "seconds": round(time.perf_counter() - t0, 3),
+        }
+    finally:
+        con.close()
+
+
+def _record_model(con, mdl: IncrementalModel, first, trained: int) -> None:
+    try:
+        con.execute("""
+            CREATE TABLE IF NOT EXISTS models (
+                created_ts TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                algo TEXT, auc DOUBLE, train_start DATE, train_end DATE, features TEXT, train_size INTEGER
+            )
+        """)
+        con.execute(
+            "INSERT INTO models (algo, auc, train_start, train_end, features, train_size) VALUES (?, ?, ?, ?, ?, ?)",
+            [f"sgd_incremental_v{INCR_VERSION}", mdl.holdout_auc, pd.Timestamp(first).date(),
+             pd.Timestamp(mdl.hwm).date(), ",".join(mdl.features), int(trained)],
+        )
+    except Exception:
+        pass
@@ -1,10 +1,3 @@
-
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
 # meta_temporal_ensemble.py
 from typing import Dict, Any, Callable, List, Optional, Tuple, Union, Sequence
 from dataclasses import dataclass
@@ -1,8 +1,202 @@
+from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
+# montecarlo.py — vectorised price-path Monte Carlo for the whole universe.
+#
+# One (tickers x paths x horizon) float32 computation over the whole universe, run in
+# ticker chunks so peak memory stays near `max_chunk_mb` however big the universe is.
+#
+#   returns_matrix(closes)          daily log returns, NaN-padded (tickers x lookback)
+#   simulate(last, rets, ...)       bootstrap or GBM paths -> MCResult
+#   simulate_universe(tickers, ...) pulls history through ohlcv_cache, then simulate()
+#
+# P(hit) is "the path's running high touches last*(1+target) at any close within the
+# horizon", i.e. the breakout question, not just the terminal price.
 
-# montecarlo.py v1.0 (packed implementation).
+import warnings
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_TARGETS = (0.03, 0.05, 0.10)
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+@dataclass
+class MCResult:
+    tickers: List[str]
+    last: np.ndarray                # (T,)
+    targets: np.ndarray             # (K,) fractional moves, e.g. 0.05 = +5%
+    p_hit: np.ndarray               # (T, K) P(max close within horizon >= last*(1+target))
+    p_up: np.ndarray                # (T,)  P(terminal close > last)
+    quantiles: np.ndarray           # (Q,)
+    terminal_q: np.ndarray          # (T, Q) terminal price quantiles
+    bands: Optional[np.ndarray]     # (T, Q, H) per-day price quantiles, if requested
+    horizon: int
+    n_paths: int
+    method: str
+    meta: Dict = field(default_factory=dict)
+
+    def to_frame(self) -> pd.DataFrame:
+        out = pd.DataFrame({"Ticker": self.tickers, "Close": self.last})
+        for j, t in enumerate(self.targets):
+            out[f"MC_PHit_{t * 100:g}%"] = self.p_hit[:, j]
+        out["MC_PUp"] = self.p_up
+        for j, q in enumerate(self.quantiles):
+            out[f"MC_Q{int(round(q * 100)):02d}"] = self.terminal_q[:, j]
+        return out
+
+    def band_frame(self, ticker: str) -> pd.DataFrame:
+        """Per-day quantile band for one ticker (day 1..H), for charting."""
+        if self.bands is None:
+            return pd.DataFrame()
+        i = self.tickers.index(ticker)
+        cols = {f"Q{int(round(q * 100)):02d}": self.bands[i, j] for j, q in enumerate(self.quantiles)}
+        return pd.DataFrame(cols, index=pd.RangeIndex(1, self.horizon + 1, name="Day"))
+
+
+def returns_matrix(closes: Dict[str, Sequence[float]] | pd.DataFrame, lookback: int = 252):
+    """Daily log returns per ticker, right-aligned and NaN-padded to `lookback`.
+
+    `closes` is {ticker: closes} or a wide DataFrame (columns = tickers).
+    Returns (tickers, last_close (T,), rets (T, lookback) float32, n_valid (T,)).
+    """
+    items = closes.items() if isinstance(closes, dict) else ((c, closes[c]) for c in closes.columns)
+    tickers, last, rows, nval = [], [], [], []
+    for t, s in items:
+        c = pd.to_numeric(pd.Series(s), errors="coerce").dropna().to_numpy(dtype=np.float64)
+        c = c[c > 0]
+        if c.size < 3:
+            continue
+        r = np.diff(np.log(c))[-lookback:].astype(np.float32)
+        row = np.full(lookback, np.nan, dtype=np.float32)
+        row[lookback - r.size:] = r
+        tickers.append(str(t)); last.append(c[-1]); rows.append(row); nval.append(r.size)
+    if not rows:
+        return [], np.zeros(0, np.float32), np.zeros((0, lookback), np.float32), np.zeros(0, np.int32)
+    return tickers, np.asarray(last, np.float32), np.vstack(rows), np.asarray(nval, np.int32)
+
+
+def _chunk_size(n_paths: int, max_chunk_mb: float) -> int:
+    # live float32 (tickers x paths) arrays per chunk: running sum, running max, step draw
+    per_ticker = n_paths * 4 * 4
+    return max(1, int(max_chunk_mb * 1024 * 1024 // max(1, per_ticker)))
+
+
+def _compact(rets: np.ndarray, n_valid: np.ndarray) -> np.ndarray:
+    # Left-align the valid tail of each row so bootstrap indices are 0..n_valid-1.
+    L = rets.shape[1]
+    out = np.zeros_like(rets)
+    for i, n in enumerate(n_valid):
+        if n > 0:
+            out[i, :n] = rets[i, L - n:]
+    return out
+
+
+def simulate(last: np.ndarray, rets: np.ndarray, *, tickers: Optional[Sequence[str]] = None,
+             n_valid: Optional[np.ndarray] = None, n_paths: int = 10_000, horizon: int = 20,
+             method: str = "bootstrap", targets: Iterable[float] = DEFAULT_TARGETS,
+             quantiles: Iterable[float] = DEFAULT_QUANTILES, bands: bool = False,
+             seed: Optional[int] = None, max_chunk_mb: float = 256.0) -> MCResult:
+    """Simulate `n_paths` paths of `horizon` days for every ticker.
+
+    method="bootstrap" resamples each ticker's own daily log returns (fat tails, skew kept);
+    method="gbm" uses a normal with that ticker's mean/stdev.
+
+    The (horizon x paths) draws are made once and shared by every ticker (common random
+    numbers): each ticker's distribution is unchanged, cross-ticker comparisons get less
+    noisy, bootstrap paths replay the same calendar days across names (keeping their
+    co-movement), and results don't depend on chunking. Paths are advanced one day at a
+    time over a (tickers x paths) block, so the full cube is never materialised.
+    """
+    last = np.asarray(last, dtype=np.float32)
+    rets = np.asarray(rets, dtype=np.float32)
+    T, L = rets.shape
+    tickers = list(tickers) if tickers is not None else [str(i) for i in range(T)]
+    if n_valid is None:
+        n_valid = np.sum(np.isfinite(rets), axis=1).astype(np.int32)
+    n_valid = np.asarray(n_valid, dtype=np.int32)
+    tgt = np.asarray(list(targets), dtype=np.float32)
+    qs = np.asarray(list(quantiles), dtype=np.float64)
+    H, P, K, Q = int(horizon), int(n_paths), len(tgt), len(qs)
+    log_tgt = np.log1p(tgt)
+
+    p_hit = np.full((T, K), np.nan, np.float32)
+    p_up = np.full(T, np.nan, np.float32)
+    term_q = np.full((T, Q), np.nan, np.float32)
+    band_q = np.full((T, Q, H), np.nan, np.float32) if bands else None
+
+    rng = np.random.default_rng(seed)
+    method = "gbm" if str(method).lower() == "gbm" else "bootstrap"
+    if method == "bootstrap":
+        pool = _compact(rets, n_valid)
+        u = rng.random((H, P), dtype=np.float32)
+    else:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)   # all-NaN rows -> NaN, masked below
+            mu = np.nanmean(rets, axis=1).astype(np.float32)
+            sd = np.nanstd(rets, axis=1).astype(np.float32)
+        drift = np.nan_to_num(mu - 0.5 * sd ** 2)
+        sd = np.nan_to_num(sd)
+        z = rng.standard_normal((H, P), dtype=np.float32)
+
+    ok_all = n_valid > 1
+    step = _chunk_size(P, max_chunk_mb)
+    for a in range(0, T, step):
+        rows = np.arange(a, min(T, a + step))[ok_all[a:a + step]]
+        if rows.size == 0:
+            continue
+        n = rows.size
+        cum = np.zeros((n, P), np.float32)            # log(price / last)
+        peak = np.full((n, P), -np.inf, np.float32)
+        if method == "bootstrap":
+            chunk = pool[rows]
+            nv = n_valid[rows]
+            # tickers with the same history length share one index row per day
+            groups = [(int(v), np.flatnonzero(nv == v)) for v in np.unique(nv)]
+            d = np.empty((n, P), np.float32)
+        for h in range(H):
+            if method == "bootstrap":
+                for v, g in groups:
+                    ix = np.minimum((u[h] * v).astype(np.intp), v - 1)
+                    if g.size == n:
+                        np.take(chunk, ix, axis=1, out=d)
+                    else:
+                        d[g] = chunk[g][:, ix]
+            else:
+                d = z[h][None, :] * sd[rows][:, None]
+                d += drift[rows][:, None]
+            cum += d
+            np.maximum(peak, cum, out=peak)
+            if band_q is not None:
+                band_q[rows, :, h] = np.quantile(cum, qs, axis=1).T
+        p_hit[rows] = (peak[:, None, :] >= log_tgt[None, :, None]).mean(axis=2)
+        p_up[rows] = (cum > 0).mean(axis=1)
+        term_q[rows] = np.quantile(cum, qs, axis=1).T
+        del cum, peak
+
+    lc = last[:, None]
+    term_q = (np.exp(term_q) * lc).astype(np.float32)
+    if band_q is not None:
+        band_q = (np.exp(band_q) * lc[:, :, None]).astype(np.float32)
+
+    return MCResult(tickers=tickers, last=last, targets=tgt, p_hit=p_hit, p_up=p_up, quantiles=qs,
+                    terminal_q=term_q, bands=band_q, horizon=H, n_paths=P, method=method,
+                    meta={"seed": seed, "chunk_tickers": step, "lookback": L})
+
+
+def simulate_universe(tickers: Sequence[str], *, period: str = "1y", lookback: int = 252,
+                      **kwargs) -> MCResult:
+    """Convenience wrapper: daily closes via ohlcv_cache, then simulate()."""
+    from modules.services import ohlcv_cache
+    closes = {}
+    for t in tickers:
+        try:
+            df = ohlcv_cache.get_history(str(t), period=period, interval="1d")
+            if df is not None and not df.empty and "Close" in df.columns:
+                closes[str(t).upper()] = df["Close"]
+        except Exception:
+            continue
+    names, last, rets, nval = returns_matrix(closes, lookback=lookback)
+    return simulate(last, rets, tickers=names, n_valid=nval, **kwargs)
@@ -1,11 +1,5 @@
 from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
 import numpy as np
 import pandas as pd
 
@@ -14,8 +8,11 @@ def _ensure_col(df: pd.DataFrame, name: str, default: float = 0.0) -> pd.Series:
         df[name] = default
     return pd.to_numeric(df[name], errors="coerce").fillna(default)
 
-def blended_ranking(df: pd.DataFrame, regime: dict | None = None, top_n: int = 50) -> pd.DataFrame:
-    """Rank ideas using a simple, robust blend that tolerates missing columns."""
+def blended_ranking(df: pd.DataFrame, regime: dict | None = None, top_n: int = 50,
+                    diversify: bool = False, **div_opts) -> pd.DataFrame:
+    """Rank ideas using a simple, robust blend that tolerates missing columns.
+    diversify=True picks the top_n with diversify.select (correlation-aware) instead of head().
+    """
     work = df.copy()
 
     # Required/safe columns
@@ -65,4 +62,10 @@ def blended_ranking(df: pd.DataFrame, regime: dict | None = None, top_n: int = 5
         work["AgentBoost_exact"] = 0.0
 
     work = work.sort_values("FinalScore", ascending=False)
+    if diversify and top_n and 0 < top_n < len(work):
+        try:
+            from modules import diversify as div_mod
+            return div_mod.select(work, int(top_n), score_col="FinalScore", **div_opts)
+        except Exception:
+            pass
     return work.head(top_n if top_n and top_n > 0 else len(work))
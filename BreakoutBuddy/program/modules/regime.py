@@ -1,14 +1,8 @@
 from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
 import pandas as pd
-import yfinance as yf
 import math
+from modules.services import market_data
 
 def _pct_rank(s: pd.Series, window:int=252) -> pd.Series:
     return s.rolling(window).apply(lambda x: (x<=x.iloc[-1]).mean(), raw=False)
@@ -25,12 +19,12 @@ def _scalar(x):
         return float("nan")
 
 def compute_regime() -> dict:
-    spy = yf.download("SPY", period="1y", interval="1d", auto_adjust=False, progress=False)
-    vix = yf.download("^VIX", period="1y", interval="1d", auto_adjust=False, progress=False)
+    spy = market_data.download("SPY", period="1y", interval="1d", auto_adjust=False, progress=False)
+    vix = market_data.download("^VIX", period="1y", interval="1d", auto_adjust=False, progress=False)
     regime = {}
     if spy is not None and not spy.empty:
-        spy_trend = spy["Close"].pct_change(20, fill_method="pad").tail(1)
-        spy_vol = spy["Close"].pct_change(fill_method="pad").rolling(20).std().tail(1)
+        spy_trend = spy["Close"].ffill().pct_change(20).tail(1)
+        spy_vol = spy["Close"].ffill().pct_change().rolling(20).std().tail(1)
         regime["spy20d_trend"] = _scalar(spy_trend)
         regime["spy20d_vol"] = _scalar(spy_vol)
         ma200 = spy["Close"].rolling(200).mean()
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+# rules.py — declarative threshold rules evaluated over a whole frame at once.
+#
+#   Rule(code, kind, when, text, group=None)
+#       when(c)      boolean mask over the frame; `c` holds one float array per input
+#       text         a string, or text(c, idx) -> strings for the matching rows idx
+#       kind         output bucket ("pros", "cons", a sentence slot ...)
+#       group        rules sharing a group form an if/elif chain: the first match wins
+#   evaluate(rules, c, n)   {"codes": [[...] per row], kind: [[...] per row], ...}
+#
+# Column readers reproduce the per-row idioms used by advisor/explain, so the frame
+# versions give the same answers as the row-by-row ones (NaN included):
+#   or_default(df, col, d)   float(row.get(col, d) or d)      None / 0 / "" -> d, NaN stays NaN
+#   or_nan(df, col)          float(v) if (v := row.get(col)) is not None else nan
+#   try_float(df, col, d)    try: float(row.get(col, d)) except: d
+#   present(df, col)         row.get(col) is not None
+#   convertible(df, col)     float(row.get(col)) would not raise
+
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+Text = Union[str, Callable[[SimpleNamespace, np.ndarray], Sequence[str]]]
+
+
+@dataclass(frozen=True)
+class Rule:
+    code: str
+    kind: str
+    when: Callable[[SimpleNamespace], np.ndarray]
+    text: Text
+    group: Optional[str] = None
+
+
+def _floats(df: pd.DataFrame, col: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """(values, ok, is_none, is_empty_str): ok where float(v) would succeed."""
+    n = len(df)
+    if col not in df.columns:
+        z = np.zeros(n, dtype=bool)
+        return np.full(n, np.nan), z, np.ones(n, dtype=bool), z
+    s = df[col]
+    if pd.api.types.is_bool_dtype(s) or (pd.api.types.is_numeric_dtype(s) and not isinstance(s.dtype, pd.CategoricalDtype)):
+        try:
+            vals = s.to_numpy(dtype=np.float64, na_value=np.nan)
+            z = np.zeros(n, dtype=bool)
+            return vals, np.ones(n, dtype=bool), z, z
+        except Exception:
+            pass
+    obj = s.astype(object).to_numpy()
+    none = np.fromiter((v is None for v in obj), dtype=bool, count=n)
+    empty = np.fromiter((isinstance(v, str) and v == "" for v in obj), dtype=bool, count=n)
+    vals = pd.to_numeric(pd.Series(obj), errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    failed = np.isnan(vals) & ~pd.isna(pd.Series(obj)).to_numpy()
+    return vals, ~none & ~failed, none, empty
+
+
+def or_default(df: pd.DataFrame, col: str, default: float) -> np.ndarray:
+    vals, ok, none, empty = _floats(df, col)
+    out = vals.copy()
+    out[none | empty | (ok & (vals == 0))] = float(default)
+    return out
+
+
+def or_nan(df: pd.DataFrame, col: str) -> np.ndarray:
+    vals, _, none, _ = _floats(df, col)
+    return np.where(none, np.nan, vals)
+
+
+def try_float(df: pd.DataFrame, col: str, default: float) -> np.ndarray:
+    vals, ok, _, _ = _floats(df, col)
+    if col not in df.columns:
+        return np.full(len(df), float(default))
+    return np.where(ok, vals, float(default))
+
+
+def present(df: pd.DataFrame, col: str) -> np.ndarray:
+    return ~_floats(df, col)[2]
+
+
+def convertible(df: pd.DataFrame, col: str) -> np.ndarray:
+    """float(row.get(col)) would succeed (NaN counts; None and missing columns do not)."""
+    return _floats(df, col)[1]
+
+
+def ratio_safe(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """a / b, 0 where b == 0 (advisor._ratio_safe)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(b == 0, 0.0, a / np.where(b == 0, 1.0, b))
+
+
+def fmt(template: str, *names: str) -> Callable[[SimpleNamespace, np.ndarray], List[str]]:
+    """Text callable: template.format(*values) for the matching rows."""
+    def _f(c: SimpleNamespace, idx: np.ndarray) -> List[str]:
+        cols = [getattr(c, nm)[idx].tolist() for nm in names]
+        return [template.format(*vs) for vs in zip(*cols)]
+    return _f
+
+
+def _collect(arrs: List[np.ndarray], n: int) -> List[List]:
+    if not arrs:
+        return [[] for _ in range(n)]
+    if len(arrs) == 1:
+        return [[] if t is None else [t] for t in arrs[0].tolist()]
+    return [[t for t in row if t is not None] for row in zip(*(a.tolist() for a in arrs))]
+
+
+def evaluate(rules: Sequence[Rule], c: SimpleNamespace, n: int) -> Dict[str, List[List]]:
+    cols: Dict[str, List[np.ndarray]] = {r.kind: [] for r in rules}
+    codes: List[np.ndarray] = []
+    taken: Dict[str, np.ndarray] = {}
+    for r in rules:
+        m = np.asarray(r.when(c), dtype=bool)
+        if m.ndim == 0:
+            m = np.full(n, bool(m))
+        if r.group is not None:
+            prev = taken.get(r.group)
+            if prev is not None:
+                m = m & ~prev
+                taken[r.group] = prev | m
+            else:
+                taken[r.group] = m
+        idx = np.flatnonzero(m)
+        if not idx.size:
+            continue
+        txt = np.full(n, None, dtype=object)
+        if isinstance(r.text, str):
+            txt[idx] = r.text
+        else:
+            txt[idx] = np.array(list(r.text(c, idx)), dtype=object)
+        cols[r.kind].append(txt)
+        code = np.full(n, None, dtype=object)
+        code[idx] = r.code
+        codes.append(code)
+    out = {k: _collect(v, n) for k, v in cols.items()}
+    out["codes"] = _collect(codes, n)
+    return out
@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+# app_cache.py — shared Streamlit caches for the expensive BreakoutBuddy objects.
+#
+# Resources (one per process, shared by every session):
+#   get_connection()          DuckDB connection to Data/breakoutbuddy.duckdb
+#                             (close_connection() before the file is rewritten)
+#   get_model(path)           pickled/joblib model, reloaded only when the file changes
+# Data (copied per call, keyed so stale entries are never served):
+#   read_csv(path)            keyed on (path, size, mtime_ns); compact=True applies services/dtypes
+#   read_json(path)           keyed on (path, size, mtime_ns)
+#   agent_weights()           Data/agent_weights.json
+#   load_features(...)        keyed on the DuckDB version (file mtimes + write counter), compacted
+#   list_universe(n)          keyed on n + us_universe.csv signature, 1h TTL
+#   compute_regime()          15 min TTL (network)
+#   rank_now(settings)        keyed on the sidebar settings, 5 min TTL
+#
+# Hit/miss counters live in-process; stats() feeds the Admin tab.
+
+import functools, inspect, json, threading, time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from modules.services import dtypes
+from modules.services import paths as bb_paths
+from modules.services.lazy import lazy_import, optional_import
+from modules.services.versions import FileSig, file_signature, db_version, bump_db_version  # noqa: F401
+
+duckdb = lazy_import("duckdb")
+
+_LOCK = threading.Lock()
+_STATS: Dict[str, Dict[str, float]] = {}
+
+
+# ---------- decorators (fall back to functools outside Streamlit) ----------
+
+def _st():
+    return optional_import("streamlit")
+
+
+def _copy_out() -> bool:
+    # st.cache_data already hands back a copy; the functools fallback does not.
+    return _st() is None
+
+
+def _lru(maxsize: int):
+    """lru_cache that, like st.cache_*, passes `_name` arguments through without keying on
+    them (so they may be unhashable, e.g. a settings dict)."""
+    def deco(fn):
+        skip = {i for i, n in enumerate(inspect.signature(fn).parameters) if n.startswith("_")}
+        if not skip:
+            return lru_cache(maxsize=maxsize)(fn)
+        call = threading.local()
+
+        @lru_cache(maxsize=maxsize)
+        def keyed(*key):
+            return fn(*call.args, **call.kwargs)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            call.args, call.kwargs = args, kwargs
+            key = tuple(a for i, a in enumerate(args) if i not in skip)
+            return keyed(*key, *sorted((k, v) for k, v in kwargs.items() if not k.startswith("_")))
+
+        wrapper.cache_clear = keyed.cache_clear
+        return wrapper
+    return deco
+
+
+def _cache_data(ttl: Optional[float] = None, max_entries: Optional[int] = None):
+    st = _st()
+    if st is not None and hasattr(st, "cache_data"):
+        return st.cache_data(ttl=ttl, max_entries=max_entries, show_spinner=False)
+    return _lru(max_entries or 128)
+
+
+def _cache_resource(max_entries: Optional[int] = None):
+    st = _st()
+    if st is not None and hasattr(st, "cache_resource"):
+        return st.cache_resource(max_entries=max_entries, show_spinner=False)
+    return _lru(max_entries or 16)
+
+
+# ---------- metrics ----------
+
+def _stat(name: str) -> Dict[str, float]:
+    s = _STATS.get(name)
+    if s is None:
+        s = _STATS[name] = {"calls": 0, "misses": 0, "load_ms": 0.0}
+    return s
+
+
+def _call(name: str) -> None:
+    with _LOCK:
+        _stat(name)["calls"] += 1
+
+
+def _miss(name: str, t0: float) -> None:
+    with _LOCK:
+        s = _stat(name)
+        s["misses"] += 1
+        s["load_ms"] += (time.perf_counter() - t0) * 1000.0
+
+
+def stats() -> pd.DataFrame:
+    """One row per cache: calls, hits, misses, hit rate, total load time."""
+    with _LOCK:
+        rows = []
+        for name, s in sorted(_STATS.items()):
+            calls, misses = int(s["calls"]), int(s["misses"])
+            hits = max(0, calls - misses)
+            rows.append({
+                "cache": name, "calls": calls, "hits": hits, "misses": misses,
+                "hit_rate": round(hits / calls, 3) if calls else 0.0,
+                "load_ms": round(s["load_ms"], 1),
+            })
+    return pd.DataFrame(rows, columns=["cache", "calls", "hits", "misses", "hit_rate", "load_ms"])
+
+
+def reset_stats() -> None:
+    with _LOCK:
+        _STATS.clear()
+
+
+def clear_all() -> None:
+    """Drop every cached entry (resources included) and reset counters."""
+    for fn in (_read_csv_cached, _read_json_cached, _load_features_cached, _list_universe_cached,
+               _compute_regime_cached, _rank_now_cached, _model_cached, _connection_cached):
+        try:
+            fn.clear()
+        except AttributeError:
+            fn.cache_clear()
+        except Exception:
+            pass
+    reset_stats()
+
+
+# ---------- resources ----------
+
+@_cache_resource(max_entries=4)
+def _connection_cached(db_path: str):
+    t0 = time.perf_counter()
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    con = duckdb.connect(db_path)
+    _miss("duckdb_conn", t0)
+    return con
+
+
+def get_connection(db_path: Path | str | None = None):
+    """Shared DuckDB connection. Use `.cursor()` per thread for concurrent work."""
+    _call("duckdb_conn")
+    return _connection_cached(str(Path(db_path or bb_paths.db_path()).resolve()))
+
+
+def close_connection(db_path: Path | str | None = None) -> None:
+    """Close the shared connection (before the file is swapped out) and drop resource caches."""
+    try:
+        _connection_cached(str(Path(db_path or bb_paths.db_path()).resolve())).close()
+    except Exception:
+        pass
+    clear_all()
+
+
+def _load_model_file(path: str):
+    joblib = optional_import("joblib")
+    if joblib is not None:
+        return joblib.load(path)
+    import pickle
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+@_cache_resource(max_entries=8)
+def _model_cached(path: str, sig: FileSig, _loader: Optional[Callable[[str], Any]] = None):
+    t0 = time.perf_counter()
+    mdl = (_loader or _load_model_file)(path)
+    _miss("model", t0)
+    return mdl
+
+
+def get_model(path: Path | str, loader: Optional[Callable[[str], Any]] = None):
+    """Load a persisted model once; a new file (mtime/size) yields a fresh entry."""
+    _call("model")
+    sig = file_signature(path)
+    if sig is None:
+        return None
+    try:
+        return _model_cached(str(path), sig, loader)
+    except Exception:
+        return None
+
+
+# ---------- data ----------
+
+@_cache_data(max_entries=64)
+def _read_csv_cached(path: str, sig: FileSig, compact: bool = False) -> pd.DataFrame:
+    t0 = time.perf_counter()
+    try:
+        df = pd.read_csv(path)
+        if compact:
+            df = dtypes.compact(df, inplace=True)
+    except Exception:
+        df = pd.DataFrame()
+    _miss("csv", t0)
+    return df
+
+
+def read_csv(path: Path | str, *, compact: bool = False) -> pd.DataFrame:
+    """compact=True applies the dtype policy (categorical tickers, float32, int8 flags)."""
+    _call("csv")
+    sig = file_signature(path)
+    if sig is None:
+        return pd.DataFrame()
+    df = _read_csv_cached(str(path), sig, bool(compact))
+    return df.copy() if _copy_out() else df
+
+
+def read_data_csv(name: str) -> pd.DataFrame:
+    return read_csv(bb_paths.data_dir() / name)
+
+
+@_cache_data(max_entries=32)
+def _read_json_cached(path: str, sig: FileSig) -> Any:
+    t0 = time.perf_counter()
+    try:
+        obj = json.loads(Path(path).read_text(encoding="utf-8"))
+    except Exception:
+        obj = None
+    _miss("json", t0)
+    return obj
+
+
+def read_json(path: Path | str, default: Any = None) -> Any:
+    _call("json")
+    sig = file_signature(path)
+    if sig is None:
+        return default
+    obj = _read_json_cached(str(path), sig)
+    return default if obj is None else obj
+
+
+def agent_weights() -> Dict[str, float]:
+    w = read_json(bb_paths.data_dir() / "agent_weights.json", default={})
+    return dict(w) if isinstance(w, dict) else {}
+
+
+@_cache_data(max_entries=16)
+def _load_features_cached(db_path: str, tickers: Tuple[str, ...], latest: bool, version: Tuple[int, int, int],
+                          compact: bool = True) -> pd.DataFrame:
+    t0 = time.perf_counter()
+    from modules.features import load_features as _load
+    df = _load(db_path, tickers=list(tickers) or None, latest=latest, compact=compact)
+    _miss("features", t0)
+    return df
+
+
+def load_features(db_path: Path | str | None = None, *, tickers=None, latest: bool = True,
+                  compact: bool = True) -> pd.DataFrame:
+    _call("features")
+    p = str(Path(db_path or bb_paths.db_path()))
+    tick = tuple(sorted({str(t).upper() for t in (tickers or [])}))
+    df = _load_features_cached(p, tick, bool(latest), db_version(p), bool(compact))
+    return df.copy() if _copy_out() else df
+
+
+@_cache_data(ttl=3600, max_entries=8)
+def _list_universe_cached(n: int, sig: Optional[FileSig]) -> list:
+    t0 = time.perf_counter()
+    from modules import data as data_mod
+    out = list(data_mod.list_universe(n))
+    _miss("universe", t0)
+    return out
+
+
+def list_universe(n: int) -> list:
+    _call("universe")
+    return list(_list_universe_cached(int(n), file_signature(bb_paths.data_dir() / "us_universe.csv")))
+
+
+@_cache_data(ttl=900, max_entries=2)
+def _compute_regime_cached() -> dict:
+    t0 = time.perf_counter()
+    from modules import regime as regime_mod
+    out = regime_mod.compute_regime()
+    _miss("regime", t0)
+    return out
+
+
+def compute_regime() -> dict:
+    _call("regime")
+    return dict(_compute_regime_cached())
+
+
+def _settings_key(settings: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((str(k), repr(v)) for k, v in (settings or {}).items()))
+
+
+@_cache_data(ttl=300, max_entries=8)
+def _rank_now_cached(key: Tuple[Tuple[str, str], ...], universe_sig: Optional[FileSig], _settings: Dict[str, Any]):
+    t0 = time.perf_counter()
+    from modules.services import scoring as scoring_svc
+    out = scoring_svc.rank_now(dict(_settings))
+    _miss("rank_now", t0)
+    return out
+
+
+def rank_now(settings: Dict[str, Any]):
+    """scoring.rank_now() memoised on the sidebar settings (5 min TTL), so reruns from
+    unrelated widgets don't rescan the universe."""
+    _call("rank_now")
+    sig = file_signature(bb_paths.data_dir() / "us_universe.csv")
+    return _rank_now_cached(_settings_key(settings), sig, dict(settings or {}))
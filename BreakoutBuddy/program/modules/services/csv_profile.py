@@ -0,0 +1,470 @@
+from __future__ import annotations
+
+# csv_profile.py — streaming CSV profiler behind csv_qa.analyze_csv.
+#
+# Files are read in chunks (all columns as text, parsed per column) into mergeable
+# sketches, so memory is bounded by the chunk size, not the file:
+#   numeric    count / mean / M2 (Chan merge), min, max, bottom-k sample for quantiles
+#   text       null count, distinct estimate (KMV), constant-column check
+#   rows/keys  sorted 64-bit row hashes -> exact-ish duplicate rows / duplicate keys
+#   dates      set of distinct days -> span and gaps
+#
+# Profiles are cached keyed on (path, size, mtime_ns): in memory and as pickles under
+# Data/cache/csv_profile/. When a file only grew (same header, same bytes up to the
+# old end), just the appended bytes are read and merged into the saved sketches.
+
+import copy, hashlib, io, os, pickle, threading, time, warnings
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from modules.services import paths as bb_paths
+
+PROFILE_VERSION = 1
+CHUNK_ROWS = 100_000
+SAMPLE_K = 4096          # per numeric column, for quantiles / outlier estimate
+KMV_K = 1024             # per column, for distinct-count estimate
+FINGERPRINT_BYTES = 4096
+KEY_CANDIDATES = ("ticker", "symbol", "game", "draw", "id")
+
+_LOCK = threading.Lock()
+_MEM: Dict[str, Tuple[Tuple[int, int], "CsvProfile"]] = {}
+_U64 = np.uint64
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    # splitmix64 finaliser: cheap, well-spread uint64 priorities from row numbers
+    with np.errstate(over="ignore"):
+        z = x.astype(np.uint64) + _U64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> _U64(30))) * _U64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> _U64(27))) * _U64(0x94D049BB133111EB)
+        return z ^ (z >> _U64(31))
+
+
+def _sorted_unique(a: np.ndarray) -> np.ndarray:
+    # Sort-based dedupe; concatenated sorted runs make the stable sort a near-linear merge.
+    if a.size == 0:
+        return a
+    s = np.sort(a, kind="stable")
+    keep = np.empty(s.size, dtype=bool)
+    keep[0] = True
+    np.not_equal(s[1:], s[:-1], out=keep[1:])
+    return s[keep]
+
+
+def _bottom_k(pri: np.ndarray, val: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    if pri.size <= k:
+        return pri, val
+    idx = np.argpartition(pri, k - 1)[:k]
+    return pri[idx], val[idx]
+
+
+@dataclass
+class ColumnSketch:
+    name: str
+    salt: int
+    nonnull: int = 0
+    nulls: int = 0
+    # numeric part (values that parse as numbers)
+    n_num: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    vmin: float = float("inf")
+    vmax: float = float("-inf")
+    all_int: bool = True
+    s_pri: np.ndarray = field(default_factory=lambda: np.zeros(0, np.uint64))
+    s_val: np.ndarray = field(default_factory=lambda: np.zeros(0, np.float64))
+    textual: bool = False            # mostly non-numeric: stop parsing numbers
+    declared: str = ""               # dtype pandas guessed from the first rows
+    # distinct / constant
+    kmv: np.ndarray = field(default_factory=lambda: np.zeros(0, np.uint64))
+    first: Optional[str] = None
+    varied: bool = False
+    # dates (only for date-like columns)
+    days: Optional[set] = None
+
+    def update(self, s: pd.Series, row0: int, is_date: bool) -> None:
+        notna = s.notna().to_numpy()
+        nn = int(notna.sum())
+        self.nonnull += nn
+        self.nulls += int(len(s) - nn)
+        if nn == 0:
+            return
+        vals = s[notna]
+        # constant check + distinct sketch on the raw text
+        if not self.varied:
+            u = pd.unique(vals)
+            if self.first is None:
+                self.first = str(u[0])
+            if len(u) > 1 or str(u[0]) != self.first:
+                self.varied = True
+        h = _sorted_unique(pd.util.hash_pandas_object(vals, index=False, categorize=False).to_numpy())
+        self.kmv = _sorted_unique(np.concatenate([self.kmv, h[:KMV_K]]))[:KMV_K]
+        # numeric
+        if self.textual:
+            x = np.zeros(0)
+        elif pd.api.types.is_numeric_dtype(vals):
+            num = vals.to_numpy(dtype=np.float64)
+            ok = np.isfinite(num)
+            x = num[ok]
+        else:
+            try:
+                num = pd.to_numeric(vals).to_numpy(dtype=np.float64)
+            except (ValueError, TypeError):
+                num = pd.to_numeric(vals, errors="coerce").to_numpy(dtype=np.float64)
+            ok = np.isfinite(num)
+            x = num[ok]
+            if x.size < 0.5 * nn:
+                self.textual = True
+        if x.size:
+            n_b = x.size
+            mean_b = float(x.mean())
+            m2_b = float(((x - mean_b) ** 2).sum())
+            n = self.n_num + n_b
+            d = mean_b - self.mean
+            self.mean += d * n_b / n
+            self.m2 += m2_b + d * d * self.n_num * n_b / n
+            self.n_num = n
+            self.vmin = min(self.vmin, float(x.min()))
+            self.vmax = max(self.vmax, float(x.max()))
+            if self.all_int and not np.all(np.floor(x) == x):
+                self.all_int = False
+            rows = np.flatnonzero(notna)[ok] + row0
+            pri = _mix(rows.astype(np.uint64) ^ _U64(self.salt))
+            self.s_pri, self.s_val = _bottom_k(np.concatenate([self.s_pri, pri]),
+                                               np.concatenate([self.s_val, x]), SAMPLE_K)
+        if is_date:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                dt = pd.to_datetime(vals, errors="coerce", utc=True)
+                if dt.isna().mean() > 0.5:
+                    dt = pd.to_datetime(vals, errors="coerce", utc=True, format="mixed")
+            dd = dt.dropna().dt.floor("D").dt.tz_localize(None).to_numpy().astype("datetime64[D]").astype(np.int64)
+            if self.days is None:
+                self.days = set()
+            self.days.update(np.unique(dd).tolist())
+
+    @property
+    def is_numeric(self) -> bool:
+        return self.nonnull > 0 and self.n_num >= 0.95 * self.nonnull
+
+    def dtype(self) -> str:
+        # Same labels pandas would give: all-null and int-with-gaps columns are float64.
+        if self.nonnull == 0:
+            return "float64"
+        if self.is_numeric:
+            if self.declared.startswith("float"):
+                return "float64"
+            return "int64" if self.all_int and self.n_num == self.nonnull and self.nulls == 0 else "float64"
+        return "object"
+
+    def distinct(self) -> int:
+        if self.kmv.size < KMV_K:
+            return int(self.kmv.size)
+        kth = float(self.kmv[-1]) / float(np.iinfo(np.uint64).max)
+        return int((KMV_K - 1) / max(kth, 1e-18))
+
+    def numeric_summary(self) -> Dict[str, Any]:
+        if self.n_num == 0:
+            return {"min": None, "p25": None, "median": None, "mean": None, "p75": None, "max": None}
+        q = np.percentile(self.s_val, [25, 50, 75]) if self.s_val.size else [None] * 3
+        return {"min": self.vmin, "p25": float(q[0]), "median": float(q[1]), "mean": float(self.mean),
+                "p75": float(q[2]), "max": self.vmax}
+
+    def outliers_gt4sd(self) -> int:
+        if self.n_num < 2 or not self.s_val.size:
+            return 0
+        sd = (self.m2 / self.n_num) ** 0.5
+        frac = float((np.abs(self.s_val - self.mean) > 4.0 * (sd + 1e-9)).mean())
+        return int(round(frac * self.n_num))
+
+
+@dataclass
+class CsvProfile:
+    path: str
+    columns: List[str]
+    key_cols: List[str]
+    date_cols: List[str]
+    sketches: Dict[str, ColumnSketch]
+    rows: int = 0
+    row_hashes: np.ndarray = field(default_factory=lambda: np.zeros(0, np.uint64))
+    key_hashes: np.ndarray = field(default_factory=lambda: np.zeros(0, np.uint64))
+    dup_rows: int = 0
+    dup_keys: int = 0
+    offset: int = 0                  # bytes consumed (end of last full line)
+    head_fp: str = ""                # sha1 of the first FINGERPRINT_BYTES
+    tail_fp: str = ""                # sha1 of the FINGERPRINT_BYTES before `offset`
+    read_dtypes: Any = str             # dtype map used to parse this file (reused for appends)
+    version: int = PROFILE_VERSION
+
+    def update(self, df: pd.DataFrame) -> None:
+        row0 = self.rows
+        for c in self.columns:
+            s = df[c] if c in df.columns else pd.Series([None] * len(df), dtype=object)
+            self.sketches[c].update(s, row0, c in self.date_cols)
+        rh = pd.util.hash_pandas_object(df.reindex(columns=self.columns), index=False, categorize=False).to_numpy()
+        self.dup_rows += _merge_unique(self, "row_hashes", rh)
+        if self.key_cols:
+            kh = pd.util.hash_pandas_object(df.reindex(columns=self.key_cols), index=False, categorize=False).to_numpy()
+            self.dup_keys += _merge_unique(self, "key_hashes", kh)
+        self.rows += len(df)
+
+
+def _merge_unique(prof: CsvProfile, attr: str, h: np.ndarray) -> int:
+    """Merge chunk hashes into the sorted set on `prof`; return how many were repeats."""
+    old = getattr(prof, attr)
+    merged = _sorted_unique(np.concatenate([old, _sorted_unique(h)]))
+    setattr(prof, attr, merged)
+    return int(len(h) - (len(merged) - len(old)))
+
+
+def _date_like(cols: List[str]) -> List[str]:
+    return [c for c in cols if any(t in c.lower() for t in ("date", "asof", "as_of", "time"))]
+
+
+def _key_like(cols: List[str], date_cols: List[str]) -> List[str]:
+    keys = [c for c in cols if c.lower() in KEY_CANDIDATES]
+    if keys and date_cols:
+        return keys + date_cols[:1]
+    return keys or date_cols[:1]
+
+
+def _sha(b: bytes) -> str:
+    return hashlib.sha1(b).hexdigest()
+
+
+def _fingerprints(path: Path, offset: int) -> Tuple[str, str]:
+    with open(path, "rb") as f:
+        head = f.read(FINGERPRINT_BYTES)
+        f.seek(max(0, offset - FINGERPRINT_BYTES))
+        tail = f.read(min(offset, FINGERPRINT_BYTES))
+    return _sha(head), _sha(tail)
+
+
+def _complete_offset(path: Path, size: int) -> int:
+    """End of the last complete line (a writer may be mid-append)."""
+    if size == 0:
+        return 0
+    with open(path, "rb") as f:
+        pos = size
+        while pos > 0:
+            step = min(65536, pos)
+            f.seek(pos - step)
+            buf = f.read(step)
+            i = buf.rfind(b"\n")
+            if i >= 0:
+                return pos - step + i + 1
+            pos -= step
+    return 0
+
+
+class _Window(io.RawIOBase):
+    """Read-only view of bytes [start, end) of a file, so a half-written last line is never parsed."""
+
+    def __init__(self, path: Path, start: int, end: int):
+        self._f = open(path, "rb")
+        self._f.seek(start)
+        self._left = max(0, end - start)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = min(len(b), self._left)
+        if n <= 0:
+            return 0
+        data = self._f.read(n)
+        b[:len(data)] = data
+        self._left -= len(data)
+        return len(data)
+
+    def close(self) -> None:
+        try:
+            self._f.close()
+        finally:
+            super().close()
+
+
+def _sniff_dtypes(path: Path, end: int, nrows: int = 5000) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """(parse map, pandas' own guess) from the first rows: float64 for numeric-looking
+    columns, str for the rest.
+
+    Letting the C parser handle numbers is much faster than parsing text per chunk; if a
+    later chunk breaks the guess, profile() re-reads with everything as str.
+    """
+    src = io.BufferedReader(_Window(path, 0, end), buffer_size=1 << 20)
+    head = pd.read_csv(src, nrows=nrows, on_bad_lines="skip")
+    guess = {str(c): str(head[c].dtype) for c in head.columns}
+    parse = {str(c): ("float64" if pd.api.types.is_numeric_dtype(head[c]) and not pd.api.types.is_bool_dtype(head[c])
+                      else "str") for c in head.columns}
+    return parse, guess
+
+
+def _read_chunks(path: Path, start: int, end: int, names: Optional[List[str]], dtypes: Dict[str, str] | type,
+                 chunk_rows: int):
+    src = io.BufferedReader(_Window(path, start, end), buffer_size=1 << 20)
+    if names is None:
+        return pd.read_csv(src, dtype=dtypes, chunksize=chunk_rows, keep_default_na=True, on_bad_lines="skip")
+    return pd.read_csv(src, dtype=dtypes, chunksize=chunk_rows, header=None, names=names,
+                       keep_default_na=True, on_bad_lines="skip")
+
+
+def _cache_file(path: Path) -> Path:
+    h = hashlib.sha1(str(path).encode("utf-8")).hexdigest()[:16]
+    return bb_paths.get_paths().cache_dir / "csv_profile" / f"{path.stem[:40]}_{h}.pkl"
+
+
+def _load_saved(path: Path) -> Optional[Tuple[Tuple[int, int], CsvProfile]]:
+    fp = _cache_file(path)
+    if not fp.exists():
+        return None
+    try:
+        with open(fp, "rb") as f:
+            sig, prof = pickle.load(f)
+        if getattr(prof, "version", None) != PROFILE_VERSION:
+            return None
+        return sig, prof
+    except Exception:
+        return None
+
+
+def _save(path: Path, sig: Tuple[int, int], prof: CsvProfile) -> None:
+    try:
+        fp = _cache_file(path)
+        bb_paths.ensure_dir(fp.parent)
+        tmp = fp.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump((sig, prof), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, fp)
+    except Exception:
+        pass
+
+
+def _can_extend(path: Path, prof: CsvProfile, size: int) -> bool:
+    if size < prof.offset or prof.offset == 0:
+        return False
+    try:
+        head, tail = _fingerprints(path, prof.offset)
+    except Exception:
+        return False
+    return head == prof.head_fp and tail == prof.tail_fp
+
+
+def _consume(path: Path, start: int, end: int, prof: Optional[CsvProfile], dtypes, chunk_rows: int,
+             guess: Optional[Dict[str, str]] = None) -> CsvProfile:
+    names = prof.columns if prof is not None else None
+    reader = _read_chunks(path, start, end, names, dtypes, chunk_rows) if end > start else []
+    for chunk in reader:
+        if prof is None:
+            cols = [str(c) for c in chunk.columns]
+            dcols = _date_like(cols)
+            prof = CsvProfile(path=str(path), columns=cols, key_cols=_key_like(cols, dcols), date_cols=dcols,
+                              sketches={c: ColumnSketch(c, salt=i + 1) for i, c in enumerate(cols)},
+                              read_dtypes=dtypes)
+            for c in cols:
+                prof.sketches[c].declared = (guess or {}).get(c, "")
+        prof.update(chunk)
+    if prof is None:
+        raise ValueError("no rows")
+    return prof
+
+
+def profile(path: Path | str, *, chunk_rows: int = CHUNK_ROWS, use_cache: bool = True) -> Tuple[Optional[CsvProfile], Dict[str, Any]]:
+    """Return (profile, info). info["mode"] is cached | incremental | full | missing."""
+    t0 = time.perf_counter()
+    path = Path(path).resolve()
+    key = str(path)
+    try:
+        st_ = path.stat()
+    except Exception:
+        return None, {"mode": "missing", "seconds": 0.0, "bytes_read": 0}
+    sig = (int(st_.st_size), int(st_.st_mtime_ns))
+
+    prev = None
+    if use_cache:
+        with _LOCK:
+            prev = _MEM.get(key)
+        if prev is None:
+            prev = _load_saved(path)
+        if prev is not None and prev[0] == sig:
+            with _LOCK:
+                _MEM[key] = prev
+            return prev[1], {"mode": "cached", "seconds": round(time.perf_counter() - t0, 4), "bytes_read": 0}
+
+    end = _complete_offset(path, sig[0])
+    prof: Optional[CsvProfile] = None
+    mode, start = "full", 0
+    attempts = ("sniff", "text")
+    if prev is not None and _can_extend(path, prev[1], sig[0]):
+        try:
+            # work on a copy so a failed append never corrupts the cached profile
+            prof = _consume(path, prev[1].offset, end, copy.deepcopy(prev[1]), prev[1].read_dtypes, chunk_rows)
+            mode, start = "incremental", prev[1].offset
+        except Exception:
+            # the appended rows broke the numeric guess; sniffing the head again would too
+            prof, attempts = None, ("text",)
+    if prof is None:
+        for how in attempts:
+            try:
+                dt, guess = _sniff_dtypes(path, end) if how == "sniff" else (str, None)
+                prof = _consume(path, 0, end, None, dt, chunk_rows, guess)
+                break
+            except Exception:
+                prof = None
+        if prof is None:
+            return None, {"mode": "unreadable", "seconds": round(time.perf_counter() - t0, 4), "bytes_read": end}
+
+    prof.offset = end
+    prof.head_fp, prof.tail_fp = _fingerprints(path, end)
+    with _LOCK:
+        _MEM[key] = (sig, prof)
+    _save(path, sig, prof)
+    return prof, {"mode": mode, "seconds": round(time.perf_counter() - t0, 4), "bytes_read": end - start}
+
+
+def _date_report(days: Optional[set]) -> Dict[str, Any]:
+    if not days:
+        return {"min": None, "max": None, "distinct_days": 0, "max_gap_days": None, "gaps": []}
+    d = np.sort(np.fromiter(days, dtype=np.int64))
+    diffs = np.diff(d)
+    out = {
+        "min": str(np.datetime64(int(d[0]), "D")),
+        "max": str(np.datetime64(int(d[-1]), "D")),
+        "distinct_days": int(d.size),
+        "max_gap_days": int(diffs.max()) if diffs.size else 0,
+        "gaps": [],
+    }
+    if diffs.size:
+        typical = float(np.median(diffs))
+        big = np.flatnonzero(diffs > max(4.0, 3.0 * typical))
+        top = big[np.argsort(diffs[big])[::-1][:5]]
+        out["gaps"] = [{"after": str(np.datetime64(int(d[i]), "D")), "days": int(diffs[i])} for i in sorted(top)]
+    return out
+
+
+def to_report(prof: CsvProfile, info: Dict[str, Any]) -> Dict[str, Any]:
+    """The dict shape analyze_csv has always returned, plus keys/date gaps/profile info."""
+    rows = prof.rows
+    sk = prof.sketches
+    res: Dict[str, Any] = {"path": prof.path, "exists": True, "rows": int(rows), "cols": len(prof.columns)}
+    res["dtypes"] = {c: sk[c].dtype() for c in prof.columns}
+    na_counts = {c: int(sk[c].nulls) for c in prof.columns}
+    res["missing"] = {"count": na_counts, "pct": {c: (float(v) / rows if rows else 0.0) for c, v in na_counts.items()}}
+    res["duplicates"] = int(prof.dup_rows)
+    res["duplicate_keys"] = {"keys": list(prof.key_cols), "count": int(prof.dup_keys)} if prof.key_cols else {}
+    res["constant_cols"] = [c for c in prof.columns if not sk[c].varied and (sk[c].nulls == 0 or sk[c].nonnull == 0)]
+    res["distinct_est"] = {c: sk[c].distinct() for c in prof.columns}
+    numeric = [c for c in prof.columns if sk[c].is_numeric]
+    res["numeric"] = {c: sk[c].numeric_summary() for c in numeric}
+    res["outliers_gt4sd"] = {c: sk[c].outliers_gt4sd() for c in numeric}
+    res["dates"] = {c: _date_report(sk[c].days) for c in prof.date_cols}
+    res["profile"] = dict(info)
+    return res
+
+
+def clear_cache() -> None:
+    with _LOCK:
+        _MEM.clear()
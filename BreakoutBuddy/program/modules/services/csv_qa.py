@@ -1,12 +1,5 @@
 from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
-
 from pathlib import Path
 from typing import Dict, Any, List
 import pandas as pd
@@ -53,7 +46,21 @@ def _date_cols(df: pd.DataFrame) -> List[str]:
             guess.append(c)
     return guess
 
-def analyze_csv(path: Path) -> Dict[str, Any]:
+def analyze_csv(path: Path, *, use_cache: bool = True) -> Dict[str, Any]:
+    """Profile a CSV via the streaming, (path, size, mtime)-cached profiler.
+
+    Falls back to the in-memory pandas pass if the streaming profiler can't read it.
+    """
+    try:
+        from modules.services import csv_profile
+        prof, info = csv_profile.profile(Path(path), use_cache=use_cache)
+        if prof is not None:
+            return csv_profile.to_report(prof, info)
+    except Exception:
+        pass
+    return _analyze_csv_in_memory(Path(path))
+
+def _analyze_csv_in_memory(path: Path) -> Dict[str, Any]:
     df = _safe_read_csv(path)
     res: Dict[str, Any] = {"path": str(path), "exists": path.exists(), "rows": int(df.shape[0]), "cols": int(df.shape[1])}
     if df.empty:
@@ -125,6 +132,9 @@ def summarize_for_humans(qa: Dict[str, Any]) -> str:
     d = qa.get("duplicates", 0)
     if d:
         msg.append(f"{d} duplicate rows detected.")
+    dk = qa.get("duplicate_keys") or {}
+    if dk.get("count"):
+        msg.append(f"{dk['count']} repeated keys on ({', '.join(dk.get('keys', []))}).")
     consts = qa.get("constant_cols", [])
     if consts:
         msg.append(f"{len(consts)} constant columns: {', '.join(sorted(consts)[:8])}{'…' if len(consts)>8 else ''}.")
@@ -137,7 +147,8 @@ def summarize_for_humans(qa: Dict[str, Any]) -> str:
         parts = []
         for c, span in di.items():
             if span.get("min") or span.get("max"):
-                parts.append(f"{c} [{span.get('min','?')} → {span.get('max','?')}]")
+                gap = f", max gap {span['max_gap_days']}d" if span.get("max_gap_days") else ""
+                parts.append(f"{c} [{span.get('min','?')} → {span.get('max','?')}{gap}]")
         if parts:
             msg.append("Date spans: " + "; ".join(parts[:4]) + ("…" if len(parts)>4 else ""))
     return " ".join(msg)
@@ -0,0 +1,408 @@
+from __future__ import annotations
+
+# db_lifecycle.py — retention, downsampling, checkpoints and rewrites for the DuckDB files.
+#
+#   POLICIES                       per-table retention (see below)
+#   apply_retention(con)           delete rows past each table's policy; {table: rows deleted}
+#   downsample_features(con)       features_history older than RAW_DAYS -> last snapshot per
+#                                  ticker per day; features_labels rows left without a
+#                                  snapshot go too
+#   checkpoint(db)                 CHECKPOINT (merges the .wal into the file, reuses freed blocks)
+#   rewrite(db)                    copy every table into a fresh file and swap it in; the only
+#                                  way a DuckDB file actually shrinks after deletes
+#   table_sizes(db)                per table: rows, MB (blocks apportioned per table), plus the
+#                                  file, used/free blocks and .wal size
+#   record_sizes / growth(db)      size history under Data/perf/db_sizes.csv; rows/day and MB/day
+#   maintain(db, rewrite="auto")   all of the above; "auto" rewrites once free blocks pass
+#                                  REWRITE_FREE_RATIO and no other connection holds the file
+#   maybe_maintain(every_hours)    maintain() at most once per interval (app start, CLI)
+#
+# Policies (days are wall-clock from now; None = keep):
+#   AgentCache        AsOf        14 days (rows are per-run caches, re-fetched on a miss)
+#   scans             ts          180 days
+#   perf_spans        started_at  30 days
+#   AgentCalib        Date        365 days
+#   features_history  as_of       raw for 60 days, daily to 730 days, then dropped
+#   features_labels   as_of       follows features_history
+# Databases: Data/breakoutbuddy.duckdb, plus the older Data/buddy.duckdb when present.
+
+import gc, json, os, threading, time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from modules.services import paths as bb_paths
+from modules.services import tracing
+from modules.services.lazy import lazy_import
+from modules.services.versions import bump_db_version
+
+duckdb = lazy_import("duckdb")
+
+
+@dataclass(frozen=True)
+class Policy:
+    time_col: str
+    keep_days: Optional[int] = None     # drop rows older than this
+    raw_days: Optional[int] = None      # keep every snapshot this long, then one per day
+
+
+POLICIES: Dict[str, Policy] = {
+    "AgentCache": Policy("AsOf", keep_days=14),
+    "scans": Policy("ts", keep_days=180),
+    "perf_spans": Policy("started_at", keep_days=30),
+    "AgentCalib": Policy("Date", keep_days=365),
+    "features_history": Policy("as_of", keep_days=730, raw_days=60),
+}
+REWRITE_FREE_RATIO = 0.4     # rewrite when this share of the file's blocks is free
+SIZE_HISTORY_ROWS = 5000
+LEGACY_DBS = ("buddy.duckdb",)
+
+_LOCK = threading.Lock()
+
+
+def databases() -> List[Path]:
+    out = [bb_paths.db_path()]
+    out += [bb_paths.data_dir() / nm for nm in LEGACY_DBS if (bb_paths.data_dir() / nm).exists()]
+    return out
+
+
+def _connect(db: Path | str):
+    """The app's shared connection for the main DB (DuckDB allows one writer per process)."""
+    from modules.services import app_cache
+    return app_cache.get_connection(db).cursor()
+
+
+def _tables(con) -> List[str]:
+    try:
+        return [r[0] for r in con.execute(
+            "SELECT table_name FROM duckdb_tables() WHERE database_name = current_database() AND NOT temporary"
+        ).fetchall()]
+    except Exception:
+        return []
+
+
+def _columns(con, table: str) -> List[str]:
+    try:
+        return [r[1] for r in con.execute(f'PRAGMA table_info("{table}")').fetchall()]
+    except Exception:
+        return []
+
+
+def _cutoff(days: int, now=None) -> pd.Timestamp:
+    return (pd.Timestamp(now) if now is not None else pd.Timestamp.now()).floor("s") - pd.Timedelta(days=int(days))
+
+
+# ---------- retention ----------
+
+def apply_retention(con, policies: Optional[Dict[str, Policy]] = None, now=None) -> Dict[str, int]:
+    """Delete rows past keep_days for every table that exists; returns rows deleted per table."""
+    out: Dict[str, int] = {}
+    have = set(_tables(con))
+    for table, pol in (policies or POLICIES).items():
+        if table not in have or pol.keep_days is None or pol.time_col not in _columns(con, table):
+            continue
+        try:
+            n = con.execute(f'DELETE FROM "{table}" WHERE "{pol.time_col}" < ?',
+                            [_cutoff(pol.keep_days, now)]).fetchone()[0]
+            out[table] = int(n or 0)
+        except Exception:
+            out[table] = 0
+    return out
+
+
+def downsample_features(con, raw_days: Optional[int] = None, now=None) -> Dict[str, int]:
+    """Thin features_history past raw_days to each ticker's last snapshot of the day."""
+    pol = POLICIES["features_history"]
+    days = raw_days if raw_days is not None else pol.raw_days
+    have = set(_tables(con))
+    if days is None or "features_history" not in have:
+        return {}
+    out: Dict[str, int] = {}
+    try:
+        out["features_history"] = int(con.execute("""
+            DELETE FROM features_history f
+            WHERE f.as_of < ?
+              AND f.as_of < (SELECT max(g.as_of) FROM features_history g
+                             WHERE g.Ticker = f.Ticker AND CAST(g.as_of AS DATE) = CAST(f.as_of AS DATE))
+        """, [_cutoff(days, now)]).fetchone()[0] or 0)
+    except Exception:
+        out["features_history"] = 0
+    if "features_labels" in have:
+        try:
+            out["features_labels"] = int(con.execute("""
+                DELETE FROM features_labels l
+                WHERE NOT EXISTS (SELECT 1 FROM features_history f WHERE f.as_of = l.as_of AND f.Ticker = l.Ticker)
+            """).fetchone()[0] or 0)
+        except Exception:
+            out["features_labels"] = 0
+    return out
+
+
+# ---------- checkpoint / rewrite ----------
+
+def checkpoint(db: Path | str | None = None) -> bool:
+    try:
+        _connect(db or bb_paths.db_path()).execute("CHECKPOINT")
+        return True
+    except Exception:
+        return False
+
+
+def _file_info(con) -> Dict:
+    try:
+        r = con.execute("SELECT block_size, total_blocks, used_blocks, free_blocks FROM pragma_database_size() "
+                        "WHERE database_name = current_database()").fetchone()
+        bs, total, used, free = (int(x or 0) for x in r)
+        return {"block_size": bs, "total_blocks": total, "used_blocks": used, "free_blocks": free,
+                "free_ratio": round(free / total, 3) if total else 0.0}
+    except Exception:
+        return {"block_size": 0, "total_blocks": 0, "used_blocks": 0, "free_blocks": 0, "free_ratio": 0.0}
+
+
+def _sql_str(s: str) -> str:
+    """SQL string literal (ATTACH takes no bound parameters)."""
+    return "'" + str(s).replace("'", "''") + "'"
+
+
+def _held_elsewhere(src: Path) -> Optional[str]:
+    """Why src can't be swapped, or None. A read-only open fails while any other connection
+    has the file: in this process DuckDB refuses a second configuration of an open file, in
+    another one the file lock does."""
+    try:
+        probe = duckdb.connect(str(src), read_only=True)
+    except Exception as e:
+        return str(e)
+    probe.close()
+    return None
+
+
+def rewrite(db: Path | str | None = None) -> Dict:
+    """Copy the database into a fresh file and swap it in (sizes before/after in MB).
+
+    Closes the app's shared connection first and refuses while any other connection to the
+    file is open (module-level handles such as agents.cache, or another process), since
+    writes through those after the swap would be lost. The shared connection is reopened
+    afterwards either way.
+    """
+    from modules.services import app_cache
+    src = Path(db or bb_paths.db_path()).resolve()
+    tmp = src.with_name(src.name + ".rewrite")
+    before = _mb(src) + _mb(_wal(src))
+    with _LOCK:
+        app_cache.close_connection(src)
+        gc.collect()
+        try:
+            busy = _held_elsewhere(src)
+            if busy:
+                return {"db": src.name, "ok": False, "error": f"in use: {busy}"}
+            try:
+                con = duckdb.connect(str(src))
+            except Exception as e:
+                return {"db": src.name, "ok": False, "error": f"in use: {e}"}
+            try:
+                con.execute("CHECKPOINT")
+                name = con.execute("SELECT current_database()").fetchone()[0]
+                tmp.unlink(missing_ok=True)
+                con.execute(f"ATTACH {_sql_str(tmp.as_posix())} AS bb_rewrite")
+                con.execute(f'COPY FROM DATABASE "{name}" TO bb_rewrite')
+                con.execute("DETACH bb_rewrite")
+            except Exception as e:
+                con.close()
+                tmp.unlink(missing_ok=True)
+                return {"db": src.name, "ok": False, "error": str(e)}
+            con.close()
+            _wal(tmp).unlink(missing_ok=True)
+            os.replace(tmp, src)
+            _wal(src).unlink(missing_ok=True)
+        finally:
+            try:
+                app_cache.get_connection(src)      # fresh shared connection on the new file
+            except Exception:
+                pass
+    bump_db_version(src)
+    return {"db": src.name, "ok": True, "mb_before": round(before, 3), "mb_after": round(_mb(src), 3)}
+
+
+def _wal(p: Path) -> Path:
+    return p.with_name(p.name + ".wal")
+
+
+def _mb(p: Path) -> float:
+    try:
+        return p.stat().st_size / 1e6
+    except Exception:
+        return 0.0
+
+
+# ---------- sizes ----------
+
+def _table_bytes(con, tables: List[str], block_size: int) -> Dict[str, float]:
+    """Bytes per table: each block on disk is split evenly between the tables that use it."""
+    if not block_size:
+        return {}
+    owners: Dict[int, set] = {}
+    for t in tables:
+        try:
+            ids = con.execute(f"""
+                SELECT DISTINCT b FROM (
+                    SELECT block_id AS b FROM pragma_storage_info('{t}') WHERE persistent AND block_id IS NOT NULL
+                    UNION ALL
+                    SELECT unnest(additional_block_ids) FROM pragma_storage_info('{t}') WHERE persistent
+                ) WHERE b IS NOT NULL
+            """).fetchall()
+        except Exception:
+            ids = []
+        for (b,) in ids:
+            owners.setdefault(int(b), set()).add(t)
+    out = {t: 0.0 for t in tables}
+    for who in owners.values():
+        for t in who:
+            out[t] += block_size / len(who)
+    return out
+
+
+def table_sizes(db: Path | str | None = None) -> pd.DataFrame:
+    """One row per table (rows, mb) plus a '(file)' row with file, free-block and .wal sizes."""
+    p = Path(db or bb_paths.db_path())
+    cols = ["db", "table", "rows", "mb", "free_ratio", "wal_mb"]
+    if not p.exists():
+        return pd.DataFrame(columns=cols)
+    con = _connect(p)
+    info = _file_info(con)
+    tables = _tables(con)
+    sizes = _table_bytes(con, tables, info["block_size"])
+    rows = []
+    for t in tables:
+        try:
+            n = int(con.execute(f'SELECT count(*) FROM "{t}"').fetchone()[0])
+        except Exception:
+            n = 0
+        rows.append({"db": p.name, "table": t, "rows": n, "mb": round(sizes.get(t, 0.0) / 1e6, 3)})
+    rows.append({"db": p.name, "table": "(file)", "rows": sum(r["rows"] for r in rows), "mb": round(_mb(p), 3),
+                 "free_ratio": info["free_ratio"], "wal_mb": round(_mb(_wal(p)), 3)})
+    return pd.DataFrame(rows, columns=cols).sort_values(["table"], key=lambda s: s == "(file)", kind="stable")
+
+
+def _history_file() -> Path:
+    return bb_paths.get_paths().perf_dir / "db_sizes.csv"
+
+
+def record_sizes(sizes: pd.DataFrame) -> None:
+    if sizes is None or sizes.empty:
+        return
+    fp = _history_file()
+    try:
+        bb_paths.ensure_dir(fp.parent)
+        snap = sizes[["db", "table", "rows", "mb"]].assign(ts=datetime.now().isoformat(timespec="seconds"))
+        hist = pd.concat([pd.read_csv(fp), snap], ignore_index=True) if fp.exists() else snap
+        hist.tail(SIZE_HISTORY_ROWS).to_csv(fp, index=False)
+    except Exception:
+        pass
+
+
+def growth(db: Path | str | None = None, days: int = 7, sizes: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """table_sizes() plus rows/day and MB/day against the oldest recorded size within `days`."""
+    cur = sizes if sizes is not None else table_sizes(db)
+    if cur.empty:
+        return cur
+    cur = cur.assign(rows_per_day=float("nan"), mb_per_day=float("nan"))
+    fp = _history_file()
+    if not fp.exists():
+        return cur
+    try:
+        hist = pd.read_csv(fp, parse_dates=["ts"])
+    except Exception:
+        return cur
+    hist = hist[hist["ts"] >= pd.Timestamp.now() - pd.Timedelta(days=int(days))]
+    base = hist.sort_values("ts").drop_duplicates(["db", "table"], keep="first").set_index(["db", "table"])
+    for i, r in cur.iterrows():
+        key = (r["db"], r["table"])
+        if key not in base.index:
+            continue
+        b = base.loc[key]
+        span = (pd.Timestamp.now() - b["ts"]).total_seconds() / 86400.0
+        if span < 0.01:
+            continue
+        cur.at[i, "rows_per_day"] = round((r["rows"] - b["rows"]) / span, 1)
+        cur.at[i, "mb_per_day"] = round((r["mb"] - b["mb"]) / span, 4)
+    return cur
+
+
+# ---------- driver ----------
+
+@tracing.traced("db_maintain", new_run=True)
+def maintain(db: Path | str | None = None, *, rewrite_mode: str | bool = "auto", now=None) -> Dict:
+    """Retention, downsampling and a checkpoint on one DB; rewrite per `rewrite_mode`
+    (True, False, or "auto"). Sizes before/after are recorded for growth()."""
+    p = Path(db or bb_paths.db_path())
+    if not p.exists():
+        return {"db": p.name, "skipped": "missing"}
+    t0 = time.perf_counter()
+    before = table_sizes(p)
+    record_sizes(before)
+    con = _connect(p)
+    with _LOCK:
+        deleted = apply_retention(con, now=now)
+        for t, n in downsample_features(con, now=now).items():
+            deleted[t] = deleted.get(t, 0) + n
+    if any(deleted.values()):
+        bump_db_version(p)
+    checkpoint(p)
+    rep = {"db": p.name, "deleted": {t: n for t, n in deleted.items() if n}}
+    info = _file_info(_connect(p))
+    if rewrite_mode is True or (rewrite_mode == "auto" and info["free_ratio"] >= REWRITE_FREE_RATIO):
+        rep["rewrite"] = rewrite(p)
+    after = table_sizes(p)
+    record_sizes(after)
+    rep.update({"mb_before": float(before["mb"].iloc[-1]) if len(before) else 0.0,
+                "mb_after": float(after["mb"].iloc[-1]) if len(after) else 0.0,
+                "seconds": round(time.perf_counter() - t0, 2)})
+    return rep
+
+
+def _stamp_file() -> Path:
+    return bb_paths.get_paths().perf_dir / "db_lifecycle.json"
+
+
+def last_run() -> Optional[Dict]:
+    try:
+        return json.loads(_stamp_file().read_text(encoding="utf-8"))
+    except Exception:
+        return None
+
+
+def maybe_maintain(every_hours: float = 24.0, *, rewrite_mode: str | bool = False, force: bool = False) -> Optional[List[Dict]]:
+    """maintain() every database if the last run is older than `every_hours`; None when not due."""
+    prev = last_run()
+    if not force and prev:
+        try:
+            if time.time() - float(prev.get("ts", 0)) < every_hours * 3600.0:
+                return None
+        except Exception:
+            pass
+    reps = []
+    for db in databases():
+        try:
+            reps.append(maintain(db, rewrite_mode=rewrite_mode))
+        except Exception as e:
+            reps.append({"db": Path(db).name, "error": str(e)})
+    try:
+        bb_paths.ensure_dir(_stamp_file().parent)
+        _stamp_file().write_text(json.dumps({"ts": time.time(), "reports": reps}, default=str), encoding="utf-8")
+    except Exception:
+        pass
+    return reps
+
+
+def start_background(every_hours: float = 24.0) -> Optional[threading.Thread]:
+    """Run maybe_maintain() on a daemon thread (app start); no thread when it isn't due."""
+    prev = last_run()
+    if prev and time.time() - float(prev.get("ts", 0) or 0) < every_hours * 3600.0:
+        return None
+    th = threading.Thread(target=maybe_maintain, kwargs={"every_hours": every_hours}, name="bb-db-maintain",
+                          daemon=True)
+    th.start()
+    return th
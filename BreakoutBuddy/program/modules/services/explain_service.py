@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+# explain_service.py — local-LLM explanations that never hold up a render.
+#
+#   explain_rows(rows, budget_s)   cached LLM text per row, template text for the rest;
+#                                  misses are generated inside budget_s, then queued
+#                                  for a background worker so the next view is a hit
+#   explain_one(row, budget_s)     LLM text or None (caller keeps its template)
+#
+# Outputs are keyed by sha1(model id + generation params + prompt) and persisted to
+# Data/cache/llm_explanations.jsonl, so restarts and reruns don't regenerate them.
+
+import hashlib, json, os, threading, time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from modules.services import paths as bb_paths
+from modules.services import local_llm
+
+PROMPT_VERSION = 1
+MAX_TOKENS = 140
+TEMP = 0.2
+BATCH = 8
+LLM_BUDGET_S = float(os.environ.get("BB_LLM_BUDGET_S", "1.5") or 1.5)
+
+_LOCK = threading.Lock()
+_MEM: Dict[str, str] = {}
+_FAILED: set = set()
+_PENDING: "OrderedDict[str, str]" = OrderedDict()
+_WORKER: Optional[threading.Thread] = None
+_DISK_LOADED = False
+_STATS = {"hits": 0, "misses": 0, "generated": 0, "fallbacks": 0}
+
+
+def _cache_file() -> Path:
+    return bb_paths.get_paths().cache_dir / "llm_explanations.jsonl"
+
+
+def _num(v: Any) -> Any:
+    # Rounded plain floats keep prompts (and so cache keys) stable across reruns.
+    try:
+        return round(float(v), 3)
+    except Exception:
+        return v
+
+
+def build_prompt(row: Dict[str, Any]) -> str:
+    feats = {
+        'RelSPY': _num(row.get('RelSPY', 0.0)),
+        'RVOL': _num(row.get('RVOL', 1.0)),
+        'RSI4': _num(row.get('RSI4', 50.0)),
+        'ConnorsRSI': _num(row.get('ConnorsRSI', 50.0)),
+        'ChangePct': _num(row.get('ChangePct', 0.0)),
+        'SqueezeHint': _num(row.get('SqueezeHint', 0)),
+    }
+    return ('You are a trading assistant. Give a short, neutral explanation (2-4 sentences) '
+            'of intraday setup quality and risk for the following stock, based ONLY on these features. '
+            'Avoid jargon; keep it actionable.\n\n'
+            f"Ticker: {row.get('Ticker','?')}\n"
+            f"Features: {feats}\n")
+
+
+def cache_key(prompt: str, model: str) -> str:
+    h = hashlib.sha1()
+    h.update(f"v{PROMPT_VERSION}|{model}|{MAX_TOKENS}|{TEMP}\n".encode("utf-8"))
+    h.update(prompt.encode("utf-8"))
+    return h.hexdigest()
+
+
+def _load_disk() -> None:
+    global _DISK_LOADED
+    if _DISK_LOADED:
+        return
+    with _LOCK:
+        if _DISK_LOADED:
+            return
+        _DISK_LOADED = True
+        fp = _cache_file()
+        if not fp.exists():
+            return
+        try:
+            with open(fp, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        obj = json.loads(line)
+                        _MEM[str(obj["k"])] = str(obj["text"])
+                    except Exception:
+                        continue
+        except Exception:
+            pass
+
+
+def _store(pairs: Iterable[Tuple[str, str]]) -> None:
+    pairs = [(k, t) for k, t in pairs if t]
+    if not pairs:
+        return
+    with _LOCK:
+        for k, t in pairs:
+            _MEM[k] = t
+        _STATS["generated"] += len(pairs)
+        try:
+            fp = _cache_file()
+            bb_paths.ensure_dir(fp.parent)
+            with open(fp, "a", encoding="utf-8") as f:
+                for k, t in pairs:
+                    f.write(json.dumps({"k": k, "text": t}) + "\n")
+        except Exception:
+            pass
+
+
+def _generate(items: List[Tuple[str, str]], deadline: Optional[float]) -> Dict[str, str]:
+    """items: [(key, prompt)] -> {key: text} for whatever finished before the deadline."""
+    if not items:
+        return {}
+    texts = local_llm.infer_many([p for _, p in items], max_tokens=MAX_TOKENS, temp=TEMP, deadline=deadline)
+    got: Dict[str, str] = {}
+    for (k, _), t in zip(items, texts):
+        if t:
+            got[k] = t
+    _store(got.items())
+    return got
+
+
+def _worker() -> None:
+    global _WORKER
+    while True:
+        with _LOCK:
+            batch = []
+            while _PENDING and len(batch) < BATCH:
+                batch.append(_PENDING.popitem(last=False))
+            if not batch:
+                _WORKER = None
+                return
+        try:
+            got = _generate(batch, None)
+        except Exception:
+            got = {}
+        with _LOCK:
+            _FAILED.update(k for k, _ in batch if k not in got)
+
+
+def _enqueue(items: List[Tuple[str, str]]) -> None:
+    global _WORKER
+    with _LOCK:
+        for k, p in items:
+            if k not in _MEM and k not in _FAILED:
+                _PENDING[k] = p
+        if _PENDING and _WORKER is None:
+            _WORKER = threading.Thread(target=_worker, name="bb-llm-explain", daemon=True)
+            _WORKER.start()
+
+
+def _template(row: Dict[str, Any]) -> str:
+    try:
+        from modules import explain as explain_mod
+        return explain_mod._english_explanation(row)
+    except Exception:
+        return ""
+
+
+def explain_rows(rows: Iterable[Dict[str, Any]], *, budget_s: float = 0.0,
+                 background: bool = True) -> List[str]:
+    """One explanation per row. budget_s=0 means cache-or-template only (no blocking)."""
+    rows = [dict(r) for r in rows]
+    model = local_llm.model_id()
+    if not model:
+        return [_template(r) for r in rows]
+    _load_disk()
+    keys = []
+    todo: Dict[str, str] = {}
+    for r in rows:
+        p = build_prompt(r)
+        k = cache_key(p, model)
+        keys.append(k)
+        if k not in _MEM and k not in _FAILED:
+            todo.setdefault(k, p)
+    with _LOCK:
+        _STATS["hits"] += len(rows) - sum(1 for k in keys if k in todo)
+        _STATS["misses"] += sum(1 for k in keys if k in todo)
+    if todo and budget_s > 0:
+        got = _generate(list(todo.items()), time.perf_counter() + budget_s)
+        for k in got:
+            todo.pop(k, None)
+    if todo and background:
+        _enqueue(list(todo.items()))
+    out = []
+    for r, k in zip(rows, keys):
+        t = _MEM.get(k)
+        if not t:
+            with _LOCK:
+                _STATS["fallbacks"] += 1
+            t = _template(r)
+        out.append(t)
+    return out
+
+
+def explain_one(row: Dict[str, Any], *, budget_s: float = LLM_BUDGET_S) -> Optional[str]:
+    """Cached/LLM text for a single row, or None so the caller keeps its template."""
+    model = local_llm.model_id()
+    if not model:
+        return None
+    _load_disk()
+    p = build_prompt(dict(row))
+    k = cache_key(p, model)
+    if k in _MEM:
+        with _LOCK:
+            _STATS["hits"] += 1
+        return _MEM[k]
+    with _LOCK:
+        _STATS["misses"] += 1
+    got = _generate([(k, p)], time.perf_counter() + budget_s) if budget_s > 0 else {}
+    if k not in got:
+        _enqueue([(k, p)])
+    return got.get(k)
+
+
+def pending() -> int:
+    with _LOCK:
+        return len(_PENDING) + (1 if _WORKER is not None else 0)
+
+
+def stats() -> Dict[str, int]:
+    with _LOCK:
+        return dict(_STATS, cached=len(_MEM), pending=len(_PENDING))
@@ -1,16 +1,17 @@
 from __future__ import annotations
-from pathlib import Path
 import json, threading
+from modules.services import paths as bb_paths
 
 # Project root = BreakoutBuddy/
-PROJECT_DIR = Path(__file__).resolve().parents[3]
-FLAGS_PATH = PROJECT_DIR / "Data" / "admin_flags.json"
+PROJECT_DIR = bb_paths.get_paths().app_root
+FLAGS_PATH = bb_paths.data_dir() / "admin_flags.json"
 _LOCK = threading.Lock()
 
 _DEFAULTS = {
     "demo_mode": False,          # use neutral constants instead of live data
     "example_agents": False,     # route through example/placeholder agents
-    "freeze_scores": False       # keep scores constant (screenshots/demos)
+    "freeze_scores": False,      # keep scores constant (screenshots/demos)
+    "perf_tracing": False        # record timing spans to perf_spans (services/tracing)
 }
 
 def _read():
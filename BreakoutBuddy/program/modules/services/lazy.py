@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+# lazy.py — defer heavy / optional imports (yfinance, sklearn, duckdb, gpt4all,
+# plotly, ...) until first attribute access so module import stays cheap.
+
+import importlib
+import threading
+import types
+from typing import Any, Optional
+
+_LOCK = threading.Lock()
+_MISSING: dict[str, str] = {}
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy: `yf = lazy_import("yfinance")` then use `yf.Ticker(...)` as usual."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_name"] = name
+        self.__dict__["_lazy_mod"] = None
+
+    def _load(self) -> types.ModuleType:
+        mod = self.__dict__["_lazy_mod"]
+        if mod is None:
+            with _LOCK:
+                mod = self.__dict__["_lazy_mod"]
+                if mod is None:
+                    mod = importlib.import_module(self.__dict__["_lazy_name"])
+                    self.__dict__["_lazy_mod"] = mod
+        return mod
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_mod"] is not None else "not loaded"
+        return f"<lazy module {self.__dict__['_lazy_name']!r} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+def optional_import(name: str) -> Optional[types.ModuleType]:
+    """Import an optional dependency once; return None (and remember why) if unavailable."""
+    if name in _MISSING:
+        return None
+    try:
+        return importlib.import_module(name)
+    except Exception as e:
+        _MISSING[name] = f"{type(e).__name__}: {e}"
+        return None
+
+
+def is_loaded(mod: Any) -> bool:
+    if isinstance(mod, LazyModule):
+        return mod.__dict__["_lazy_mod"] is not None
+    return mod is not None
+
+
+def missing_optional() -> dict[str, str]:
+    return dict(_MISSING)
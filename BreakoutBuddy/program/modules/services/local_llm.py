@@ -1,30 +1,21 @@
 from __future__ import annotations
 
+import threading, time
 from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
-from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Sequence
+from modules.services import paths as bb_paths
+from modules.services.lazy import optional_import
 try:
     import json
 except Exception:
     json = None
 _gpt = None
 _model_file: Optional[Path] = None
+# One model per process; GPT4All handles are not safe to share across threads.
+_LOAD_LOCK = threading.Lock()
+_GEN_LOCK = threading.Lock()
 def _config_path() -> Path:
-    here = Path(__file__).resolve()
-    for up in [here, *here.parents]:
-        cand = up / "Data" / "llm_config.json"
-        if cand.exists():
-            return cand
-        if up.name == "program":
-            cand2 = up.parent / "Data" / "llm_config.json"
-            if cand2.exists():
-                return cand2
-    return (here.parent / "Data" / "llm_config.json")
+    return bb_paths.data_dir() / "llm_config.json"
 def _read_model_dir() -> Optional[Path]:
     try:
         cfg_p = _config_path()
@@ -53,9 +44,7 @@ def _pick_model(dir_path: Path) -> Optional[Path]:
             return cand
     return ggufs[0]
 def is_available() -> bool:
-    try:
-        from gpt4all import GPT4All  # noqa: F401
-    except Exception:
+    if optional_import("gpt4all") is None:
         return False
     d = _read_model_dir()
     if not d:
@@ -66,23 +55,39 @@ def _ensure_model_loaded() -> Optional[object]:
     global _gpt, _model_file
     if _gpt is not None:
         return _gpt
-    try:
-        from gpt4all import GPT4All
-    except Exception:
-        return None
-    d = _read_model_dir()
-    if not d:
-        return None
-    mf = _pick_model(d)
-    if not mf:
-        return None
-    try:
-        _model_file = mf
-        _gpt = GPT4All(model_name=mf.name, model_path=str(mf.parent), allow_download=False)
-        return _gpt
-    except Exception:
-        _gpt = None
-        return None
+    with _LOAD_LOCK:
+        if _gpt is not None:
+            return _gpt
+        gpt4all = optional_import("gpt4all")
+        if gpt4all is None:
+            return None
+        d = _read_model_dir()
+        if not d:
+            return None
+        mf = _pick_model(d)
+        if not mf:
+            return None
+        try:
+            _model_file = mf
+            _gpt = gpt4all.GPT4All(model_name=mf.name, model_path=str(mf.parent), allow_download=False)
+            return _gpt
+        except Exception:
+            _gpt = None
+            return None
+
+def model_id() -> str:
+    """Identity of whatever infer() would use right now ('' if nothing). Part of cache keys."""
+    if optional_import("gpt4all") is not None:
+        d = _read_model_dir()
+        mf = _model_file or (_pick_model(d) if d else None)
+        if mf is not None:
+            try:
+                return f"gpt4all:{mf.name}:{mf.stat().st_size}"
+            except Exception:
+                return f"gpt4all:{mf.name}"
+    import os
+    url = os.environ.get("LLMBRIDGE_URL") or ""
+    return f"api:{url}" if url else ""
 
 def _infer_via_simple_api(prompt: str, *, max_tokens: int = 160, temp: float = 0.2) -> Optional[str]:
     """Optional tiny HTTP fallback if LLMBRIDGE_URL is set.
@@ -114,16 +119,21 @@ def _infer_via_simple_api(prompt: str, *, max_tokens: int = 160, temp: float = 0
 
 
 
+def _generate(mdl, prompt: str, max_tokens: int, temp: float) -> Optional[str]:
+    try:
+        with _GEN_LOCK:
+            out = mdl.generate(prompt, max_tokens=max_tokens, temp=temp)
+        return out.strip() if isinstance(out, str) else str(out).strip()
+    except Exception:
+        return None
+
+
 def infer(prompt: str, *, max_tokens: int = 160, temp: float = 0.2) -> Optional[str]:
     mdl = _ensure_model_loaded()
     if mdl is not None:
-        try:
-            out = mdl.generate(prompt, max_tokens=max_tokens, temp=temp)
-            if isinstance(out, str):
-                return out.strip()
-            return str(out).strip()
-        except Exception:
-            pass
+        out = _generate(mdl, prompt, max_tokens, temp)
+        if out:
+            return out
     # Local not available or failed; attempt optional simple API
     api_text = _infer_via_simple_api(prompt, max_tokens=max_tokens, temp=temp)
     if api_text:
@@ -131,16 +141,34 @@ def infer(prompt: str, *, max_tokens: int = 160, temp: float = 0.2) -> Optional[
     return None
 
 
+def infer_many(prompts: Sequence[str], *, max_tokens: int = 160, temp: float = 0.2,
+               deadline: Optional[float] = None) -> List[Optional[str]]:
+    """Run a batch through the one loaded model. Duplicate prompts are generated once.
+    Stops at `deadline` (time.perf_counter() value); unfinished slots come back as None.
+    With a deadline, a model that isn't loaded yet is not loaded here (that alone takes seconds)."""
+    out: List[Optional[str]] = [None] * len(prompts)
+    done: dict = {}
+    if deadline is not None and _gpt is None and optional_import("gpt4all") is not None and _read_model_dir():
+        return out
+    mdl = _ensure_model_loaded()
+    for i, p in enumerate(prompts):
+        if p in done:
+            out[i] = done[p]
+            continue
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        txt = _generate(mdl, p, max_tokens, temp) if mdl is not None else None
+        if not txt:
+            txt = _infer_via_simple_api(p, max_tokens=max_tokens, temp=temp)
+        done[p] = out[i] = txt
+    return out
+
+
 # --- lightweight config/state helpers expected by Admin tab ---
 _cfg_cache = {"model_dir":"", "preferred":""}
 
 def _cfg_file() -> Path:
-    here = Path(__file__).resolve()
-    for up in [here, *here.parents]:
-        cand = up / "Data" / "llm_config.json"
-        if cand.exists() or up.name == "program":
-            return cand
-    return here.parent / "Data" / "llm_config.json"
+    return _config_path()
 
 def _load_cfg():
     global _cfg_cache
@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+# market_data.py — one doorway to yfinance, with record / replay.
+#
+#   history(sym, **kw)     yf.Ticker(sym).history(**kw)
+#   download(sym, **kw)    yf.download(sym, **kw)
+#   news(sym)              yf.Ticker(sym).news
+#   fast_info(sym)         dict(yf.Ticker(sym).fast_info)
+#
+# Mode comes from BB_MARKET_DATA (or set_mode()/using()):
+#   live     straight to yfinance (default)
+#   record   live, and every response is stored in the archive
+#   replay   served from the archive only; never touches the network
+#
+# The archive is a zip (deflate) at Data/cache/market_archive.zip, or BB_MARKET_ARCHIVE.
+# Entries are keyed by the call and its normalised arguments and keep the recorded
+# latency. Replay can inject latency:
+#   BB_REPLAY_LATENCY_MS   fixed ms per call, or "recorded" to replay what was measured
+#   BB_REPLAY_JITTER_MS    +/- jitter, seeded per request (BB_REPLAY_SEED)
+# so the same archive and settings give the same timings on every run. A replay
+# miss returns what yfinance returns for an unknown symbol (an empty frame / list),
+# or raises ReplayMiss with BB_REPLAY_STRICT=1.
+
+import contextlib, hashlib, json, os, pickle, threading, time, warnings, zipfile
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+from modules.services import paths as bb_paths
+from modules.services import tracing
+from modules.services.lazy import lazy_import
+
+yf = lazy_import("yfinance")
+
+MODES = ("live", "record", "replay")
+
+
+class ReplayMiss(KeyError):
+    """The archive has no recording for this call (strict replay only)."""
+
+
+def _norm(v: Any) -> Any:
+    if isinstance(v, (datetime, pd.Timestamp)):
+        return str(pd.Timestamp(v))
+    if isinstance(v, date):
+        return v.isoformat()
+    if isinstance(v, (list, tuple)):
+        return [_norm(x) for x in v]
+    return v
+
+
+def request_key(method: str, symbol: str, kwargs: Dict[str, Any]) -> str:
+    kw = {k: _norm(v) for k, v in sorted(kwargs.items()) if k not in ("progress", "threads")}
+    blob = json.dumps([method, str(symbol).upper(), kw], sort_keys=True, default=str)
+    h = hashlib.sha1(blob.encode("utf-8")).hexdigest()[:20]
+    safe = str(symbol).upper().replace("/", "_").replace("^", "_")
+    return f"{method}/{safe}/{h}.pkl"
+
+
+# ---------- archive ----------
+
+class Archive:
+    """Zip of pickled responses; appends are serialised, reads reuse one open handle."""
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._zr: Optional[zipfile.ZipFile] = None
+        self._names: Optional[set] = None
+
+    def _reader(self) -> Optional[zipfile.ZipFile]:
+        if self._zr is None and self.path.exists():
+            try:
+                self._zr = zipfile.ZipFile(self.path, "r")
+                self._names = set(self._zr.namelist())
+            except Exception:
+                self._zr, self._names = None, set()
+        return self._zr
+
+    def keys(self) -> set:
+        with self._lock:
+            self._reader()
+            return set(self._names or ())
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            zr = self._reader()
+            if zr is None or key not in (self._names or ()):
+                return None
+            try:
+                return pickle.loads(zr.read(key))
+            except Exception:
+                return None
+
+    def put(self, key: str, request: Dict[str, Any], data: Any, elapsed_ms: float) -> None:
+        payload = pickle.dumps({"request": request, "recorded_at": datetime.now().isoformat(timespec="seconds"),
+                                "elapsed_ms": float(elapsed_ms), "data": data}, protocol=4)
+        with self._lock:
+            if self._zr is not None:
+                self._zr.close()
+                self._zr, self._names = None, None
+            bb_paths.ensure_dir(self.path.parent)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning)     # re-recording a key: last entry wins
+                with zipfile.ZipFile(self.path, "a", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as zw:
+                    zw.writestr(key, payload)
+
+    def stats(self) -> Dict[str, Any]:
+        ks = self.keys()
+        by: Dict[str, int] = {}
+        for k in ks:
+            by[k.split("/", 1)[0]] = by.get(k.split("/", 1)[0], 0) + 1
+        size = self.path.stat().st_size if self.path.exists() else 0
+        return {"path": str(self.path), "entries": len(ks), "by_method": by, "size_mb": round(size / 1e6, 2)}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._zr is not None:
+                self._zr.close()
+            self._zr, self._names = None, None
+
+
+def default_archive_path() -> Path:
+    env = os.environ.get("BB_MARKET_ARCHIVE", "").strip()
+    return Path(env) if env else bb_paths.get_paths().cache_dir / "market_archive.zip"
+
+
+# ---------- provider ----------
+
+def _empty(method: str) -> Any:
+    if method == "news":
+        return []
+    if method == "fast_info":
+        return {}
+    return pd.DataFrame()
+
+
+def _live(method: str, symbol: str, kwargs: Dict[str, Any]) -> Any:
+    tracing.count("net_calls")
+    if method == "history":
+        return yf.Ticker(symbol).history(**kwargs)
+    if method == "download":
+        kw = dict(kwargs)
+        kw.setdefault("progress", False)
+        return yf.download(symbol, **kw)
+    if method == "news":
+        return list(getattr(yf.Ticker(symbol), "news", None) or [])
+    if method == "fast_info":
+        fi = getattr(yf.Ticker(symbol), "fast_info", None)
+        try:
+            return {k: fi[k] for k in fi.keys()} if fi is not None else {}
+        except Exception:
+            return {}
+    raise ValueError(f"unknown market_data method: {method}")
+
+
+@dataclass
+class Provider:
+    mode: str = "live"
+    archive: Optional[Archive] = None
+    latency_ms: Optional[float] = None     # None = no injected latency
+    recorded_latency: bool = False
+    jitter_ms: float = 0.0
+    seed: int = 0
+    strict: bool = False
+    stats: Dict[str, int] = field(default_factory=lambda: {"live": 0, "recorded": 0, "replayed": 0, "misses": 0})
+
+    def _sleep(self, key: str, entry: Dict[str, Any]) -> None:
+        ms = float(entry.get("elapsed_ms", 0.0)) if self.recorded_latency else float(self.latency_ms or 0.0)
+        if self.jitter_ms:
+            h = int(hashlib.sha1(f"{self.seed}|{key}".encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF
+            ms += (2.0 * h - 1.0) * float(self.jitter_ms)
+        if ms > 0:
+            time.sleep(ms / 1000.0)
+
+    def call(self, method: str, symbol: str, **kwargs) -> Any:
+        if self.mode == "live" or self.archive is None:
+            self.stats["live"] += 1
+            return _live(method, symbol, kwargs)
+        key = request_key(method, symbol, kwargs)
+        if self.mode == "replay":
+            entry = self.archive.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                if self.strict:
+                    raise ReplayMiss(key)
+                return _empty(method)
+            self.stats["replayed"] += 1
+            tracing.count("cache_hits")
+            self._sleep(key, entry)
+            data = entry.get("data")
+            return data.copy() if isinstance(data, pd.DataFrame) else data
+        # record
+        t0 = time.perf_counter()
+        data = _live(method, symbol, kwargs)
+        ms = (time.perf_counter() - t0) * 1000.0
+        self.stats["live"] += 1
+        try:
+            self.archive.put(key, {"method": method, "symbol": str(symbol).upper(),
+                                   "kwargs": {k: _norm(v) for k, v in kwargs.items()}}, data, ms)
+            self.stats["recorded"] += 1
+        except Exception:
+            pass
+        return data
+
+
+_LOCK = threading.Lock()
+_PROVIDER: Optional[Provider] = None
+
+
+def _from_env() -> Provider:
+    mode = os.environ.get("BB_MARKET_DATA", "live").strip().lower() or "live"
+    if mode not in MODES:
+        mode = "live"
+    lat = os.environ.get("BB_REPLAY_LATENCY_MS", "").strip().lower()
+    return Provider(
+        mode=mode,
+        archive=Archive(default_archive_path()) if mode != "live" else None,
+        latency_ms=None if lat in ("", "recorded") else float(lat),
+        recorded_latency=(lat == "recorded"),
+        jitter_ms=float(os.environ.get("BB_REPLAY_JITTER_MS", "0") or 0),
+        seed=int(os.environ.get("BB_REPLAY_SEED", "0") or 0),
+        strict=os.environ.get("BB_REPLAY_STRICT", "").strip().lower() in ("1", "true", "yes"),
+    )
+
+
+def get_provider() -> Provider:
+    global _PROVIDER
+    if _PROVIDER is None:
+        with _LOCK:
+            if _PROVIDER is None:
+                _PROVIDER = _from_env()
+    return _PROVIDER
+
+
+def set_mode(mode: str, *, archive: Path | str | None = None, latency_ms: float | str | None = None,
+             jitter_ms: float = 0.0, seed: int = 0, strict: bool = False) -> Provider:
+    """Swap the process-wide provider (latency_ms="recorded" replays measured latency)."""
+    global _PROVIDER
+    mode = str(mode).lower()
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}")
+    arch = Archive(archive or default_archive_path()) if mode != "live" else None
+    with _LOCK:
+        _PROVIDER = Provider(mode=mode, archive=arch,
+                             latency_ms=None if latency_ms in (None, "recorded") else float(latency_ms),
+                             recorded_latency=(latency_ms == "recorded"), jitter_ms=float(jitter_ms),
+                             seed=int(seed), strict=bool(strict))
+        return _PROVIDER
+
+
+@contextlib.contextmanager
+def using(mode: str, **kwargs):
+    """Temporarily switch provider: `with market_data.using("replay", latency_ms=20): ...`"""
+    global _PROVIDER
+    prev = _PROVIDER
+    prov = set_mode(mode, **kwargs)
+    try:
+        yield prov
+    finally:
+        if prev is not None and prev.archive is not None and prev is not prov:
+            prev.archive.close()        # drop a read handle opened before this run appended
+        with _LOCK:
+            _PROVIDER = prev
+
+
+# ---------- call sites ----------
+
+def history(symbol: str, **kwargs) -> pd.DataFrame:
+    return get_provider().call("history", symbol, **kwargs)
+
+
+def download(symbol: str, **kwargs) -> pd.DataFrame:
+    return get_provider().call("download", symbol, **kwargs)
+
+
+def news(symbol: str) -> list:
+    return get_provider().call("news", symbol)
+
+
+def fast_info(symbol: str) -> dict:
+    return get_provider().call("fast_info", symbol)
+
+
+# history() variants modules/agents/data_agent requests with its default config
+AGENT_HISTORY = (("1y", "1d"), ("5d", "30m"))
+
+
+def record_universe(tickers, *, daily=("1y", "6mo", "2y"), intraday=(("5d", "5m"),),
+                    progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """Capture the calls the app makes for `tickers` so a replay run can go fully offline.
+
+    The previous provider (and its mode) is put back on return.
+    """
+    global _PROVIDER
+    prev = get_provider()
+    prov = prev
+    if prov.mode != "record":
+        prov = set_mode("record", archive=prov.archive.path if prov.archive else None)
+    try:
+        for t in tickers:
+            t = str(t).upper()
+            for per in daily:
+                _safe(lambda: history(t, period=per, interval="1d"))
+            for per in ("1y", "2y"):
+                _safe(lambda: download(t, period=per, interval="1d", auto_adjust=False, progress=False))
+            for per, iv in intraday:
+                _safe(lambda: history(t, period=per, interval=iv))
+            for per, iv in AGENT_HISTORY:
+                _safe(lambda: history(t, period=per, interval=iv, auto_adjust=False))
+            _safe(lambda: history(t, period="60d"))
+            _safe(lambda: history(t, period="7d"))
+            _safe(lambda: news(t))
+            _safe(lambda: fast_info(t))
+            if progress:
+                progress(t)
+        return prov.archive.stats() if prov.archive else {}
+    finally:
+        if prev.archive is not None and prev is not prov:
+            prev.archive.close()        # drop a read handle opened before this run appended
+        with _LOCK:
+            _PROVIDER = prev
+
+
+def _safe(fn: Callable[[], Any]) -> None:
+    try:
+        fn()
+    except Exception:
+        pass
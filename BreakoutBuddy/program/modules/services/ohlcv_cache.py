@@ -1,48 +1,36 @@
 from __future__ import annotations
 
 from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
-
-from pathlib import Path
+import numpy as np
 import pandas as pd
 import time
-import yfinance as yf
-
-
-from pathlib import Path as _P
-
-def _resolve_data_dir_cache():
-    here = _P(__file__).resolve()
-    candidates = [
-        here.parents[3] / "Data",          # BreakoutBuddy/Data  (repo-level)
-        here.parents[2] / "Data",          # BreakoutBuddy/program/Data
-        _P.cwd() / "Data",
-    ]
-    for c in candidates:
-        try:
-            if c.exists():
-                return c
-        except Exception:
-            pass
-    return candidates[0]
+from modules.services import paths as bb_paths
+from modules.services import market_data
+from modules.services import tracing
 
-DATA_DIR = _resolve_data_dir_cache()
-try:
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-except Exception:
-    pass
-
-CACHE_DIR = DATA_DIR / "cache" / "yf"
-CACHE_DIR.mkdir(parents=True, exist_ok=True)
+DATA_DIR = bb_paths.data_dir()
+CACHE_DIR = bb_paths.get_paths().cache_dir / "yf"
 
 def _cache_file(symbol: str, period: str, interval: str) -> Path:
     safe = symbol.replace("/", "_").upper()
     return CACHE_DIR / f"{safe}_{period}_{interval}.csv"
 
+def read_closes(symbol: str, period: str = "1y", interval: str = "1d", tail: int | None = None):
+    """(dates as 'YYYY-MM-DD', closes) straight from the cached CSV, any age; None if there
+    is no usable file. A plain split parse (~5x faster than read_csv) for bulk readers."""
+    fp = _cache_file(symbol, period, interval)
+    try:
+        lines = fp.read_bytes().splitlines()
+        hdr = lines[0].decode("utf-8").split(",")
+        di = hdr.index("Date") if "Date" in hdr else 0
+        ci = hdr.index("Close")
+        rows = [r.split(b",") for r in (lines[1:] if tail is None else lines[1:][-int(tail):]) if r]
+        dates = [r[di][:10].decode("ascii") for r in rows]
+        closes = np.array([float(r[ci]) if r[ci] else np.nan for r in rows], dtype=np.float64)
+    except Exception:
+        return None
+    return (np.asarray(dates), closes) if dates else None
+
 def get_history(symbol: str, period: str = "1y", interval: str = "1d", ttl_hours: int = 12, retries: int = 2) -> pd.DataFrame:
     fp = _cache_file(symbol, period, interval)
     now = time.time()
@@ -52,15 +40,18 @@ def get_history(symbol: str, period: str = "1y", interval: str = "1d", ttl_hours
             if age_h <= ttl_hours:
                 df = pd.read_csv(fp)
                 if not df.empty:
+                    tracing.count("cache_hits")
                     return df
         except Exception:
             pass
+    tracing.count("cache_misses")
     last_err = None
     for _ in range(max(1, retries)):
         try:
-            df = yf.Ticker(symbol).history(period=period, interval=interval)
+            df = market_data.history(symbol, period=period, interval=interval)
             if df is not None and not df.empty:
                 out = df.reset_index().rename(columns={"index":"Date"})
+                bb_paths.ensure_dir(CACHE_DIR)
                 out.to_csv(fp, index=False)
                 return out
         except Exception as e:
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+# paths.py — one BreakoutBuddy path service per process.
+#
+# Every module used to carry its own copy of the cloud-root resolver and ran it
+# (plus a couple of mkdirs) at import time. Resolution now happens once, on
+# first use, and the result is cached for the life of the process.
+
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+import os, sys
+
+_HERE = Path(__file__).resolve()
+_PROGRAM_DIR = _HERE.parents[2]     # .../BreakoutBuddy/program
+_APP_ROOT = _PROGRAM_DIR.parent     # .../BreakoutBuddy
+
+
+def _cloud_roots() -> list[Path]:
+    h = Path.home()
+    return [
+        h / "OneDrive",
+        h / "OneDrive - Personal",
+        h / "OneDrive - Wagstaff Law Firm",
+        h / "Dropbox",
+        h / "Google Drive",
+        h / "Library" / "CloudStorage" / "OneDrive",
+        h / "Library" / "CloudStorage" / "Dropbox",
+        h / "Library" / "CloudStorage" / "GoogleDrive",
+    ]
+
+
+def _first_existing(paths) -> Path | None:
+    for p in paths:
+        try:
+            p2 = Path(p).expanduser().resolve()
+            if p2.exists():
+                return p2
+        except Exception:
+            pass
+    return None
+
+
+def resolve_dir(preferred_env_var: str, fallback_name: str) -> Path:
+    """
+    Strict per-app order (NO repo-level fallback):
+      1) Env var (abs or relative)
+      2) <BreakoutBuddy>/<name>
+      3) CWD/<name>
+      4) Cloud roots: <BreakoutBuddy>/<name>
+      5) Create <BreakoutBuddy>/<name>
+    """
+    envv = os.environ.get(preferred_env_var, "").strip()
+    if envv:
+        cand = (Path(envv) if os.path.isabs(envv) else (Path.cwd() / envv))
+        if cand.exists():
+            return cand.resolve()
+
+    hit = _first_existing([_APP_ROOT / fallback_name, Path.cwd() / fallback_name])
+    if hit:
+        return hit
+
+    cands = []
+    for root in _cloud_roots():
+        cands += [
+            root / _APP_ROOT.name / fallback_name,
+            root / "Projects" / _APP_ROOT.name / fallback_name,
+        ]
+    hit = _first_existing(cands)
+    if hit:
+        return hit
+
+    target = (_APP_ROOT / fallback_name).resolve()
+    target.mkdir(parents=True, exist_ok=True)
+    return target
+
+
+@dataclass(frozen=True)
+class BBPaths:
+    app_root: Path
+    program_dir: Path
+    modules_dir: Path
+    data_dir: Path
+    extras_dir: Path
+
+    @property
+    def db_path(self) -> Path:
+        return self.data_dir / "breakoutbuddy.duckdb"
+
+    @property
+    def cache_dir(self) -> Path:
+        return self.data_dir / "cache"
+
+    @property
+    def perf_dir(self) -> Path:
+        return self.data_dir / "perf"
+
+
+@lru_cache(maxsize=1)
+def get_paths() -> BBPaths:
+    """Resolve Data/extras once and cache the result for the process."""
+    modules_dir = Path(os.environ.get("BREAKOUTBUDDY_MODULES_DIR", str(_PROGRAM_DIR / "modules"))).resolve()
+    paths = BBPaths(
+        app_root=_APP_ROOT,
+        program_dir=_PROGRAM_DIR,
+        modules_dir=modules_dir,
+        data_dir=resolve_dir("BREAKOUTBUDDY_DATA", "Data"),
+        extras_dir=resolve_dir("BREAKOUTBUDDY_EXTRAS", "extras"),
+    )
+    extras_src = paths.extras_dir / "src"
+    if extras_src.exists() and str(extras_src) not in sys.path:
+        sys.path.insert(0, str(extras_src))
+    return paths
+
+
+def data_dir() -> Path:
+    return get_paths().data_dir
+
+
+def extras_dir() -> Path:
+    return get_paths().extras_dir
+
+
+def db_path() -> Path:
+    return get_paths().db_path
+
+
+def ensure_dir(p: Path) -> Path:
+    """mkdir on demand (callers write here), instead of at import."""
+    p.mkdir(parents=True, exist_ok=True)
+    return p
+
+
+def __getattr__(name: str):
+    # Back-compat for `from ...paths import BB_DATA, BB_EXTRAS`
+    if name == "BB_DATA":
+        return get_paths().data_dir
+    if name == "BB_EXTRAS":
+        return get_paths().extras_dir
+    if name == "BB_APP_ROOT":
+        return get_paths().app_root
+    raise AttributeError(name)
@@ -1,26 +1,25 @@
 from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
+import numpy as np
 import pandas as pd
 from pathlib import Path
+from modules.services import paths as bb_paths
+from modules.services import tracing
 
 def _data_dir() -> Path:
-    d = Path(__file__).resolve().parents[1] / "Data"
-    d.mkdir(parents=True, exist_ok=True)
-    return d
+    return bb_paths.data_dir()
+
+def combined_score(p_up, rel_spy, rvol):
+    """0..100 blend of model odds, relative strength and relative volume (scalars or Series)."""
+    return np.clip(p_up * 70.0 + rel_spy * 10.0 + (rvol - 1.0) * 20.0, 0, 100)
 
 def _ensure_rank_cols(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
     if "Combined" not in df.columns:
-        pu = pd.to_numeric(df.get("P_up", 0.5), errors="coerce").fillna(0.5)
-        rel = pd.to_numeric(df.get("RelSPY", 0.0), errors="coerce").fillna(0.0)
-        rv  = pd.to_numeric(df.get("RVOL", 1.0), errors="coerce").fillna(1.0)
-        df["Combined"] = (pu * 70.0 + rel * 10.0 + (rv - 1.0) * 20.0).clip(0, 100)
+        pu = pd.to_numeric(df.get("P_up", pd.Series(0.5, index=df.index)), errors="coerce").fillna(0.5)
+        rel = pd.to_numeric(df.get("RelSPY", pd.Series(0.0, index=df.index)), errors="coerce").fillna(0.0)
+        rv  = pd.to_numeric(df.get("RVOL", pd.Series(1.0, index=df.index)), errors="coerce").fillna(1.0)
+        df["Combined"] = combined_score(pu, rel, rv)
     try:
         from modules.services import agents_service as AS
         df = AS.enrich_scores(df)
@@ -36,16 +35,48 @@ def _fallback_rows(n: int) -> pd.DataFrame:
     ][: max(1, n)]
     return _ensure_rank_cols(pd.DataFrame({"Ticker": syms, "P_up": 0.55, "RelSPY": 0.0, "RVOL": 1.1}))
 
+def _top(ranked: pd.DataFrame, top_n: int, diversify: bool) -> pd.DataFrame:
+    """head(top_n), or a correlation-aware basket of top_n when diversify is on."""
+    if diversify:
+        try:
+            from modules import diversify as div_mod
+            sort_col = "Combined_with_agents" if "Combined_with_agents" in ranked.columns else "Combined"
+            with tracing.span("diversify_top"):
+                return div_mod.select(ranked, top_n, score_col=sort_col).reset_index(drop=True)
+        except Exception:
+            pass
+    return ranked.head(top_n)
+
+def _add_montecarlo(ranked: pd.DataFrame) -> pd.DataFrame:
+    """MC_* odds (montecarlo.simulate_universe, 20 trading days) merged onto the ranked rows."""
+    if ranked.empty or "Ticker" not in ranked.columns:
+        return ranked
+    try:
+        from modules import montecarlo as mc
+        with tracing.span("montecarlo_top"):
+            res = mc.simulate_universe(ranked["Ticker"].astype(str).str.upper().tolist(),
+                                       n_paths=5_000, horizon=20, seed=0)
+        mcf = res.to_frame().drop(columns=["Close"])
+    except Exception:
+        return ranked
+    out = ranked.drop(columns=[c for c in mcf.columns if c != "Ticker" and c in ranked.columns])
+    out["_mc_key"] = out["Ticker"].astype(str).str.upper()
+    out = out.merge(mcf.rename(columns={"Ticker": "_mc_key"}), on="_mc_key", how="left")
+    return out.drop(columns=["_mc_key"])
+
 def _persist_ranked(df: pd.DataFrame) -> None:
     try:
         (_data_dir() / "ranked_latest.csv").write_text(df.to_csv(index=False), encoding="utf-8")
     except Exception:
         pass
 
+@tracing.traced("rank_now")
 def rank_now(arg) -> pd.DataFrame | tuple:
     if isinstance(arg, pd.DataFrame):
-        df = _ensure_rank_cols(arg)
-        _persist_ranked(df)
+        with tracing.span("rank_cols"):
+            df = _ensure_rank_cols(arg)
+        with tracing.span("persist_ranked"):
+            _persist_ranked(df)
         return df
     try:
         settings = dict(arg)
@@ -59,16 +90,22 @@ def rank_now(arg) -> pd.DataFrame | tuple:
     try:
         from modules import data as data_mod
         from modules import regime as regime_mod
-        tickers = data_mod.list_universe(uni_n)
+        with tracing.span("list_universe"):
+            tickers = data_mod.list_universe(uni_n)
         snap = data_mod.pull_enriched_snapshot(tickers)
-        ranked = _ensure_rank_cols(snap)
+        with tracing.span("rank_cols"):
+            ranked = _ensure_rank_cols(snap)
         if top_n and 0 < top_n < len(ranked):
-            ranked = ranked.head(top_n)
+            ranked = _top(ranked, top_n, bool(settings.get("diversify", False)))
+        if settings.get("montecarlo", False):
+            ranked = _add_montecarlo(ranked)
         try:
-            regime = regime_mod.compute_regime()
+            with tracing.span("compute_regime"):
+                regime = regime_mod.compute_regime()
         except Exception:
             regime = {}
-        _persist_ranked(ranked)
+        with tracing.span("persist_ranked"):
+            _persist_ranked(ranked)
         return snap, regime, ranked, None, None
     except Exception:
         ranked = _fallback_rows(top_n)
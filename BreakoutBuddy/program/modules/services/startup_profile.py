@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+# startup_profile.py — import-time profiler + cold-start tracking.
+#
+#   profile_imports()      run `python -X importtime` on the app's import set in a
+#                          fresh interpreter and return the slowest imports
+#   record_first_paint()   called by app_main after the first full render
+#   history()              rows from Data/perf/startup_history.csv
+
+import csv, os, re, subprocess, sys, time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from modules.services import paths as bb_paths
+
+# What app_main pulls in before the first paint.
+APP_IMPORTS = [
+    "pandas",
+    "streamlit",
+    "modules.data",
+    "modules.regime",
+    "modules.services.enrich",
+    "modules.services.scoring",
+    "modules.services.agents_service",
+    "modules.tabs.sidebar",
+    "modules.tabs.dashboard",
+    "modules.ui.watchlist_page",
+    "modules.tabs.report",
+    "modules.tabs.agents_tab",
+    "modules.tabs.admin",
+    "modules.tabs.about",
+    "modules.tabs.explore",
+    "modules.ui.plain_english",
+    "modules.ui.single_ticker_analyzer",
+]
+
+HISTORY_COLS = ["ts", "kind", "total_ms", "slowest", "slowest_ms", "python"]
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+_FIRST_PAINT_DONE = False
+
+
+def _history_file() -> Path:
+    return bb_paths.get_paths().perf_dir / "startup_history.csv"
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    rows = []
+    for line in stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        self_us, cum_us, indent, name = m.groups()
+        rows.append({
+            "module": name,
+            "self_ms": int(self_us) / 1000.0,
+            "cumulative_ms": int(cum_us) / 1000.0,
+            "depth": (len(indent) - 1) // 2,
+        })
+    return rows
+
+
+def profile_imports(modules: Optional[List[str]] = None, top: int = 25, sort_by: str = "cumulative_ms",
+                    record: bool = True) -> Dict:
+    """Import `modules` in a fresh interpreter with -X importtime.
+
+    Returns {"total_ms", "wall_ms", "slowest": [rows...], "errors"}. `total_ms` is the sum of
+    top-level cumulative times, i.e. what a cold start pays for imports alone.
+    """
+    mods = list(modules or APP_IMPORTS)
+    p = bb_paths.get_paths()
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([str(p.program_dir), str(p.modules_dir), env.get("PYTHONPATH", "")])
+    code = "\n".join(
+        f"try:\n    import {m}\nexcept Exception as e:\n    print('ERR {m}', type(e).__name__, e)" for m in mods
+    )
+    t0 = time.perf_counter()
+    res = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=str(p.program_dir),
+                         env=env, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - t0) * 1000.0
+    rows = parse_importtime(res.stderr or "")
+    total_ms = sum(r["cumulative_ms"] for r in rows if r["depth"] == 0)
+    key = sort_by if sort_by in ("self_ms", "cumulative_ms") else "cumulative_ms"
+    slowest = sorted(rows, key=lambda r: r[key], reverse=True)[: max(1, int(top))]
+    errors = [ln for ln in (res.stdout or "").splitlines() if ln.startswith("ERR ")]
+    out = {"total_ms": round(total_ms, 1), "wall_ms": round(wall_ms, 1), "slowest": slowest, "errors": errors}
+    if record:
+        top_row = max((r for r in rows if r["depth"] == 0), key=lambda r: r["cumulative_ms"], default=None)
+        _append_history("imports", total_ms, top_row)
+    return out
+
+
+def _append_history(kind: str, total_ms: float, top_row: Optional[Dict] = None) -> None:
+    try:
+        fp = _history_file()
+        bb_paths.ensure_dir(fp.parent)
+        new = not fp.exists()
+        with open(fp, "a", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            if new:
+                w.writerow(HISTORY_COLS)
+            w.writerow([
+                datetime.now().isoformat(timespec="seconds"), kind, round(float(total_ms), 1),
+                (top_row or {}).get("module", ""), round(float((top_row or {}).get("cumulative_ms", 0.0)), 1),
+                sys.version.split()[0],
+            ])
+    except Exception:
+        pass
+
+
+def record_first_paint(elapsed_ms: float) -> bool:
+    """Log the first full render of this process (cold start). Later reruns are ignored."""
+    global _FIRST_PAINT_DONE
+    if _FIRST_PAINT_DONE:
+        return False
+    _FIRST_PAINT_DONE = True
+    _append_history("first_paint", elapsed_ms)
+    return True
+
+
+def history(kind: Optional[str] = None, limit: int = 50) -> List[Dict]:
+    fp = _history_file()
+    if not fp.exists():
+        return []
+    try:
+        with open(fp, newline="", encoding="utf-8") as f:
+            rows = [r for r in csv.DictReader(f) if kind is None or r.get("kind") == kind]
+        return rows[-int(limit):]
+    except Exception:
+        return []
+
+
+def format_report(rep: Dict) -> str:
+    lines = [f"Import total: {rep.get('total_ms', 0):.1f} ms (subprocess wall {rep.get('wall_ms', 0):.1f} ms)"]
+    lines.append(f"{'cumulative_ms':>14} {'self_ms':>9}  module")
+    for r in rep.get("slowest", []):
+        lines.append(f"{r['cumulative_ms']:>14.1f} {r['self_ms']:>9.1f}  {'  ' * r['depth']}{r['module']}")
+    for e in rep.get("errors", []):
+        lines.append(e)
+    return "\n".join(lines)
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+# tracing.py — per-stage timing spans written to the perf_spans DuckDB table.
+#
+#   with tracing.run("quick_scan"):          groups spans under one run id
+#       with tracing.span("enrich", ticker="AAPL"):
+#           ...
+#           tracing.count("net_calls")       counters roll up into enclosing spans
+#   @tracing.traced("nightly_auto_tune")     decorator form
+#
+#   stage_stats(runs=20)    p50/p95 ms per stage over the most recent runs
+#   slowest_tickers(...)    worst per-ticker spans
+#   recent_runs(...)        one row per run
+#
+# Off by default. Enable with BB_TRACE=1 or the "perf_tracing" admin flag; while off,
+# span()/run() return a shared no-op context and traced() calls straight through, so
+# the cost is one global check. Spans are buffered and written when the outermost run
+# (or span) closes.
+
+import contextvars, functools, itertools, json, os, sys, threading, time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from modules.services import paths as bb_paths
+from modules.services.lazy import optional_import
+
+TABLE = "perf_spans"
+FLUSH_AT = 500
+COUNTERS = ("net_calls", "cache_hits", "cache_misses")
+
+_ENABLED: Optional[bool] = None
+_LOCK = threading.Lock()
+_BUF: List[tuple] = []
+_IDS = itertools.count(1)
+_CUR: contextvars.ContextVar = contextvars.ContextVar("bb_span", default=None)
+_RUN: contextvars.ContextVar = contextvars.ContextVar("bb_run", default=None)
+_TABLE_READY = False
+
+
+def _resolve() -> bool:
+    env = os.environ.get("BB_TRACE", "").strip().lower()
+    if env:
+        return env in ("1", "true", "yes", "on")
+    try:
+        from modules.services import feature_flags
+        return bool(feature_flags.get_flags().get("perf_tracing", False))
+    except Exception:
+        return False
+
+
+def enabled() -> bool:
+    global _ENABLED
+    if _ENABLED is None:
+        _ENABLED = _resolve()
+    return _ENABLED
+
+
+def enable(on: bool = True) -> None:
+    global _ENABLED
+    _ENABLED = bool(on)
+
+
+def disable() -> None:
+    enable(False)
+
+
+# ---------- memory ----------
+
+def _rss_mb() -> tuple:
+    """(current RSS, process peak RSS) in MB; psutil if present, else resource (POSIX)."""
+    ps = optional_import("psutil")
+    if ps is not None:
+        try:
+            mi = ps.Process().memory_info()
+            peak = getattr(mi, "peak_wset", None) or getattr(mi, "peak_rss", None) or mi.rss
+            return mi.rss / 1e6, peak / 1e6
+        except Exception:
+            pass
+    try:
+        import resource
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = kb / 1e6 if sys.platform == "darwin" else kb / 1e3   # bytes on macOS, KiB elsewhere
+        return None, peak
+    except Exception:
+        return None, None
+
+
+# ---------- spans ----------
+
+class _Noop:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs) -> None:
+        pass
+
+
+_NOOP = _Noop()
+
+
+class _Span:
+    __slots__ = ("id", "parent", "stage", "ticker", "attrs", "counts", "t0", "started", "_tok", "_run_tok", "run_id")
+
+    def __init__(self, stage: str, ticker: Optional[str], attrs: Dict[str, Any], new_run: bool):
+        self.stage = str(stage)
+        self.ticker = None if ticker is None else str(ticker)
+        self.attrs = attrs
+        self.counts: Dict[str, int] = {}
+        self.id = next(_IDS)
+        self._run_tok = None
+        if new_run or _RUN.get() is None:
+            rid = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self.id}"
+            self._run_tok = _RUN.set(rid)
+        self.run_id = _RUN.get()
+        par = _CUR.get()
+        self.parent = par.id if par is not None and not new_run else None
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self._tok = _CUR.set(self)
+        self.started = datetime.now()
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, et, ev, tb):
+        ms = (time.perf_counter() - self.t0) * 1000.0
+        _CUR.reset(self._tok)
+        par = _CUR.get()
+        if par is not None and par.run_id == self.run_id:
+            for k, v in self.counts.items():
+                par.counts[k] = par.counts.get(k, 0) + v
+        rss, peak = _rss_mb()
+        row = (self.run_id, self.id, self.parent, self.stage, self.ticker, self.started, ms,
+               et is None, None if et is None else f"{et.__name__}: {ev}"[:300],
+               self.counts.get("net_calls", 0), self.counts.get("cache_hits", 0),
+               self.counts.get("cache_misses", 0), rss, peak,
+               json.dumps(self.attrs, default=str) if self.attrs else None)
+        with _LOCK:
+            _BUF.append(row)
+            big = len(_BUF) >= FLUSH_AT
+        if self._run_tok is not None:
+            _RUN.reset(self._run_tok)
+            flush()
+        elif big:
+            flush()
+        return False
+
+
+def span(stage: str, ticker: Optional[str] = None, **attrs):
+    """Time a block as one span of the current run (a new run if there is none)."""
+    if not (_ENABLED if _ENABLED is not None else enabled()):
+        return _NOOP
+    return _Span(stage, ticker, attrs, False)
+
+
+def run(name: str, **attrs):
+    """Start a new run id; spans opened inside belong to it."""
+    if not (_ENABLED if _ENABLED is not None else enabled()):
+        return _NOOP
+    return _Span(name, None, attrs, True)
+
+
+def traced(stage: Optional[str] = None, *, new_run: bool = False):
+    """Decorator form of span()/run(); the stage defaults to the function name."""
+    def deco(fn: Callable):
+        name = stage or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            if not (_ENABLED if _ENABLED is not None else enabled()):
+                return fn(*a, **kw)
+            with _Span(name, None, {}, new_run):
+                return fn(*a, **kw)
+        return wrapper
+    return deco
+
+
+def count(name: str, n: int = 1) -> None:
+    """Add to a counter (net_calls, cache_hits, cache_misses, ...) on the current span."""
+    if not _ENABLED:
+        return
+    sp = _CUR.get()
+    if sp is not None:
+        sp.counts[name] = sp.counts.get(name, 0) + int(n)
+
+
+def current_run_id() -> Optional[str]:
+    return _RUN.get()
+
+
+# ---------- storage ----------
+
+def _con():
+    from modules.services import app_cache
+    return app_cache.get_connection(bb_paths.db_path()).cursor()
+
+
+def _ensure_table(con) -> None:
+    global _TABLE_READY
+    if _TABLE_READY:
+        return
+    con.execute(f"""
+        CREATE TABLE IF NOT EXISTS {TABLE} (
+            run_id TEXT,
+            span_id BIGINT,
+            parent_id BIGINT,
+            stage TEXT,
+            ticker TEXT,
+            started_at TIMESTAMP,
+            duration_ms DOUBLE,
+            ok BOOLEAN,
+            error TEXT,
+            net_calls INTEGER,
+            cache_hits INTEGER,
+            cache_misses INTEGER,
+            rss_mb DOUBLE,
+            peak_rss_mb DOUBLE,
+            attrs TEXT
+        )
+    """)
+    _TABLE_READY = True
+
+
+def flush() -> int:
+    """Write buffered spans; returns how many were written (0 on any DB error)."""
+    with _LOCK:
+        rows = list(_BUF)
+        _BUF.clear()
+    if not rows:
+        return 0
+    try:
+        con = _con()
+        _ensure_table(con)
+        con.executemany(f"INSERT INTO {TABLE} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+    except Exception:
+        return 0
+
+
+def _query(sql: str, params: Optional[list] = None):
+    import pandas as pd
+    try:
+        con = _con()
+        _ensure_table(con)
+        return con.execute(sql, params or []).df()
+    except Exception:
+        return pd.DataFrame()
+
+
+def _recent(runs: int) -> str:
+    return f"""
+        WITH r AS (SELECT run_id FROM {TABLE} GROUP BY run_id ORDER BY max(started_at) DESC LIMIT {int(runs)})
+        SELECT s.* FROM {TABLE} s JOIN r USING (run_id)
+    """
+
+
+def recent_runs(limit: int = 20):
+    return _query(f"""
+        SELECT run_id,
+               arg_min(stage, started_at) AS name,
+               min(started_at) AS started_at,
+               max(duration_ms) FILTER (WHERE parent_id IS NULL) AS total_ms,
+               count(*) AS spans,
+               sum(net_calls) FILTER (WHERE parent_id IS NULL) AS net_calls,
+               max(peak_rss_mb) AS peak_rss_mb,
+               bool_and(ok) AS ok
+        FROM {TABLE} GROUP BY run_id ORDER BY started_at DESC LIMIT {int(limit)}
+    """)
+
+
+def stage_stats(runs: int = 20):
+    """p50/p95 per stage across the last `runs` runs (per-ticker spans included)."""
+    return _query(f"""
+        SELECT stage, count(*) AS n,
+               round(quantile_cont(duration_ms, 0.5), 2) AS p50_ms,
+               round(quantile_cont(duration_ms, 0.95), 2) AS p95_ms,
+               round(max(duration_ms), 2) AS max_ms,
+               sum(net_calls) AS net_calls,
+               sum(cache_hits) AS cache_hits,
+               sum(cache_misses) AS cache_misses,
+               round(sum(cache_hits) / nullif(sum(cache_hits) + sum(cache_misses), 0), 3) AS hit_rate,
+               round(max(peak_rss_mb), 1) AS peak_rss_mb
+        FROM ({_recent(runs)}) GROUP BY stage ORDER BY p95_ms DESC
+    """)
+
+
+def slowest_tickers(limit: int = 20, runs: int = 20):
+    return _query(f"""
+        SELECT ticker, stage, count(*) AS n,
+               round(quantile_cont(duration_ms, 0.5), 2) AS p50_ms,
+               round(max(duration_ms), 2) AS max_ms,
+               sum(net_calls) AS net_calls
+        FROM ({_recent(runs)}) WHERE ticker IS NOT NULL
+        GROUP BY ticker, stage ORDER BY max_ms DESC LIMIT {int(limit)}
+    """)
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+# versions.py — cheap invalidation keys for cached reads.
+#
+# file_signature(path)  (resolved path, size, mtime_ns) or None
+# db_version(db)        (db mtime_ns, wal mtime_ns, in-process write counter)
+# bump_db_version(db)   writers call this after INSERT/DELETE so cached readers refresh
+#                       even when DuckDB hasn't flushed the file yet.
+
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from modules.services import paths as bb_paths
+
+FileSig = Tuple[str, int, int]
+
+_LOCK = threading.Lock()
+_DB_WRITES: Dict[str, int] = {}
+
+
+def file_signature(path: Path | str) -> Optional[FileSig]:
+    try:
+        p = Path(path)
+        st_ = p.stat()
+        return (str(p.resolve()), int(st_.st_size), int(st_.st_mtime_ns))
+    except Exception:
+        return None
+
+
+def _db_key(db_path: Path | str | None) -> str:
+    return str(Path(db_path or bb_paths.db_path()).resolve())
+
+
+def bump_db_version(db_path: Path | str | None = None) -> int:
+    key = _db_key(db_path)
+    with _LOCK:
+        _DB_WRITES[key] = _DB_WRITES.get(key, 0) + 1
+        return _DB_WRITES[key]
+
+
+def db_version(db_path: Path | str | None = None) -> Tuple[int, int, int]:
+    p = Path(_db_key(db_path))
+    sig = file_signature(p)
+    wal = file_signature(p.with_name(p.name + ".wal"))
+    with _LOCK:
+        writes = _DB_WRITES.get(str(p), 0)
+    return (sig[2] if sig else 0, wal[2] if wal else 0, writes)
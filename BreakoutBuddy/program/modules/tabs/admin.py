@@ -1,99 +1,14 @@
 from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
-
 import streamlit as st
 from pathlib import Path
 
-# ---------- Strict per-app Data/Extras resolver (BreakoutBuddy) ----------
-from pathlib import Path
-import os, sys
-BB_HERE     = Path(__file__).resolve()
-BB_APP_ROOT = BB_HERE.parents[1]   # .../BreakoutBuddy
-
-def _bb_cloud_roots():
-    h = Path.home()
-    return [
-        h / "OneDrive",
-        h / "OneDrive - Personal",
-        h / "OneDrive - Wagstaff Law Firm",
-        h / "Dropbox",
-        h / "Google Drive",
-        h / "Library" / "CloudStorage" / "OneDrive",
-        h / "Library" / "CloudStorage" / "Dropbox",
-        h / "Library" / "CloudStorage" / "GoogleDrive",
-    ]
-
-def _bb_first_existing(paths):
-    for p in paths:
-        try:
-            p2 = Path(p).expanduser().resolve()
-            if p2.exists():
-                return p2
-        except Exception:
-            pass
-    return None
-
-def bb_resolve_dir(preferred_env_var: str, fallback_name: str):
-    """
-    Strict per-app order (NO repo-level fallback):
-      1) Env var (abs or relative)
-      2) BB_APP_ROOT/<name>
-      3) CWD/<name>
-      4) Cloud roots: <BreakoutBuddy>/<name>
-      5) Create BB_APP_ROOT/<name>
-    """
-    envv = os.environ.get(preferred_env_var, "").strip()
-    if envv:
-        cand = (Path(envv) if os.path.isabs(envv) else (Path.cwd() / envv))
-        if cand.exists():
-            return cand.resolve()
-
-    hit = _bb_first_existing([BB_APP_ROOT / fallback_name, Path.cwd() / fallback_name])
-    if hit:
-        return hit
-
-    cands = []
-    for root in _bb_cloud_roots():
-        cands += [
-            root / BB_APP_ROOT.name / fallback_name,
-            root / "Projects" / BB_APP_ROOT.name / fallback_name,
-        ]
-    hit = _bb_first_existing(cands)
-    if hit:
-        return hit
-
-    target = (BB_APP_ROOT / fallback_name).resolve()
-    target.mkdir(parents=True, exist_ok=True)
-    return target
-
-BB_DATA   = bb_resolve_dir("BREAKOUTBUDDY_DATA",   "Data")
-BB_EXTRAS = bb_resolve_dir("BREAKOUTBUDDY_EXTRAS", "extras")
-
-bb_extras_src = (BB_EXTRAS / "src")
-if bb_extras_src.exists() and str(bb_extras_src) not in sys.path:
-    sys.path.insert(0, str(bb_extras_src))
-# ---------- end resolver ----------
 import pandas as pd
+from modules.services import paths as bb_paths
+from modules.services import app_cache
 
 def _data_dir() -> Path:
-    here = Path(__file__).resolve()
-    for up in [here, *here.parents]:
-        cand = up / "Data"
-        if cand.is_dir():
-            return cand
-        if up.name == "modules":
-            cand2 = up.parent / "Data"
-            if cand2.is_dir():
-                return cand2
-    fb = here.parent / "Data"
-    fb.mkdir(parents=True, exist_ok=True)
-    return fb
+    return bb_paths.data_dir()
 
 def _load_csv_any(names):
     d = _data_dir()
@@ -101,7 +16,7 @@ def _load_csv_any(names):
         p = d / nm
         if p.exists():
             try:
-                return pd.read_csv(p), p
+                return app_cache.read_csv(p), p
             except Exception:
                 pass
     return pd.DataFrame(), None
@@ -190,6 +105,11 @@ def _section_llm():
             ranked = _llm.rank_models(models)
             st.table({"Model": [m for m,_ in ranked], "Score": [round(s,2) for _,s in ranked]})
         st.write("Status"); st.json(_llm.status())
+        try:
+            from modules.services import explain_service as _es
+            st.write("Explanation cache"); st.json(_es.stats())
+        except Exception:
+            pass
         if st.button("Test model (~2s)"):
             try:
                 m = _llm.open_model()
@@ -257,6 +177,33 @@ def _section_maintenance():
                     pass
         st.success(f"Cleanup complete. Removed ~{removed} items.")
 
+    st.subheader("Database")
+    try:
+        from modules.services import db_lifecycle as dbl
+    except Exception as e:
+        st.info(f"DB lifecycle unavailable: {e}")
+        return
+    prev = dbl.last_run()
+    if prev:
+        st.caption(f"Last maintenance: {pd.Timestamp(prev.get('ts', 0), unit='s'):%Y-%m-%d %H:%M} (runs daily at app start)")
+    st.dataframe(pd.concat([dbl.growth(db) for db in dbl.databases()], ignore_index=True),
+                 hide_index=True, width='stretch')
+    st.caption("Retention: " + ", ".join(
+        f"{t} {p.keep_days}d" + (f" (daily after {p.raw_days}d)" if p.raw_days else "") for t, p in dbl.POLICIES.items()))
+    c1, c2 = st.columns(2)
+    with c1:
+        if st.button("Apply retention + checkpoint", key="admin_db_maintain"):
+            with st.spinner("Maintaining…"):
+                st.json(dbl.maybe_maintain(force=True))
+    with c2:
+        if st.button("Rewrite (shrink file)", key="admin_db_rewrite",
+                     help="Copies every table into a fresh file. Closes the shared connection; avoid during a scan."):
+            with st.spinner("Rewriting…"):
+                st.session_state["admin_db_rewrite_result"] = [dbl.rewrite(db) for db in dbl.databases()]
+            st.rerun()      # so app_main's `conn` is the reopened shared connection, not the closed one
+        if "admin_db_rewrite_result" in st.session_state:
+            st.json(st.session_state.pop("admin_db_rewrite_result"))
+
 def render_admin_tab(**kwargs):
     st.header("Admin")
     tabs = st.tabs(["Agents & Rank", "Local LLMs", "Data QA", "Maintenance"])
@@ -273,8 +220,7 @@ def render_admin_tab(**kwargs):
 def _section_regime():
     st.subheader("Market Regime")
     try:
-        from modules.regime import compute_regime
-        reg = compute_regime()
+        reg = app_cache.compute_regime()
         if isinstance(reg, dict) and reg:
             cols = st.columns(min(4, max(1, len(reg))))
             i = 0
@@ -287,14 +233,71 @@ def _section_regime():
     except Exception as e:
         st.info(f"Regime unavailable: {e}")
 
+def _section_cache():
+    st.subheader("Caches")
+    st.caption("Hit/miss counters for this server process. Misses include the load time; hits cost ~nothing.")
+    df = app_cache.stats()
+    if df.empty:
+        st.info("No cached reads yet.")
+    else:
+        st.dataframe(df, hide_index=True, width='stretch')
+    if st.button("Clear caches", key="admin_clear_caches"):
+        app_cache.clear_all()
+        st.success("Caches cleared; next reads reload from disk/network.")
+    with st.expander("Frame memory (raw vs dtype policy)"):
+        if st.button("Measure", key="admin_mem_report"):
+            from modules.services import dtypes
+            d = bb_paths.data_dir()
+            rows = []
+            for nm in ("snapshot_latest.csv", "ranked_latest.csv", "bb_snapshot.csv"):
+                if (d / nm).exists():
+                    raw = pd.read_csv(d / nm)
+                    rows.append((nm, raw, dtypes.compact(raw)))
+            try:
+                raw = app_cache.load_features(latest=False, compact=False)
+                rows.append(("features_history", raw, dtypes.compact(raw)))
+            except Exception:
+                pass
+            out = [{k: v for k, v in dtypes.compare(a, b, nm).items() if k != "columns"} for nm, a, b in rows]
+            st.dataframe(pd.DataFrame(out), hide_index=True, width='stretch')
+
+def _section_perf():
+    st.subheader("Performance")
+    from modules.services import tracing
+    on = st.toggle("Record timing spans", value=tracing.enabled(), key="admin_perf_tracing",
+                   help="Writes per-stage spans (scan, rank, agents, per-ticker enrich) to the perf_spans table.")
+    if on != tracing.enabled():
+        tracing.enable(on)
+        try:
+            from modules.services import feature_flags
+            feature_flags.set_flags(perf_tracing=on)
+        except Exception:
+            pass
+    runs = st.slider("Recent runs", 5, 200, 20, key="admin_perf_runs")
+    stats = tracing.stage_stats(runs)
+    if stats.empty:
+        st.info("No spans recorded yet. Enable recording and run a scan.")
+        return
+    st.markdown("**Per stage (ms)**")
+    st.dataframe(stats, hide_index=True, width='stretch')
+    c1, c2 = st.columns(2)
+    with c1:
+        st.markdown("**Slowest tickers**")
+        st.dataframe(tracing.slowest_tickers(20, runs), hide_index=True, width='stretch')
+    with c2:
+        st.markdown("**Recent runs**")
+        st.dataframe(tracing.recent_runs(runs), hide_index=True, width='stretch')
+
 def render_admin_tab(**kwargs):
     st.header("Admin")
-    tabs = st.tabs(["Agents & Rank", "Local LLMs", "Data QA", "Maintenance", "Market Regime"])
+    tabs = st.tabs(["Agents & Rank", "Local LLMs", "Data QA", "Maintenance", "Market Regime", "Cache", "Performance"])
     with tabs[0]: _section_agents_rank()
     with tabs[1]: _section_llm()
     with tabs[2]: _section_csv_qa()
     with tabs[3]: _section_maintenance()
     with tabs[4]: _section_regime()
+    with tabs[5]: _section_cache()
+    with tabs[6]: _section_perf()
 
 
     # Extra tools
@@ -1,10 +1,3 @@
-
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
 # --- Patch module: Maintenance with Calibrate, Scan, Health, and stale note ---
 def _section_maintenance():
     import streamlit as st
@@ -1,20 +1,13 @@
 from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
-
 import streamlit as st
 import pandas as pd
 
 # Try to import our new helpers; fall back gracefully if unavailable.
 try:
-    from modules.explain import explain_for_row
+    from modules.explain import explain_for_row, explain_frame
 except Exception:
-    explain_for_row = None  # type: ignore
+    explain_for_row = explain_frame = None  # type: ignore
 
 try:
     from modules.services.augment_csv import augment_ranked_csv
@@ -28,9 +21,9 @@ def _add_quick_cols(df: pd.DataFrame) -> pd.DataFrame:
         return df
     if "QuickWhy" in df.columns and "RiskBadge" in df.columns:
         return df  # already present
-    exps = df.apply(lambda r: explain_for_row(r.to_dict()), axis=1)
-    df["QuickWhy"] = [e.get("quick","") for e in exps]
-    df["RiskBadge"] = [e.get("risk_badge","") for e in exps]
+    exps = explain_frame(df, detailed=False)
+    df["QuickWhy"] = exps["quick"].to_numpy()
+    df["RiskBadge"] = exps["risk_badge"].to_numpy()
     return df
 
 def render_dashboard_table(ranked_csv_path: str | None, df: pd.DataFrame | None) -> pd.DataFrame:
@@ -1,15 +1,10 @@
 from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
 import streamlit as st
-from pathlib import Path
 import pandas as pd
 from modules import explain as explain_mod
+from modules.services import paths as bb_paths
+from modules.services import app_cache
 
 def render_explore_tab(
     *,
@@ -19,14 +14,14 @@ def render_explore_tab(
     enrich_features_fn,
 ):
     st.subheader("Explore Snapshot")
-    DATA_DIR = Path("Data")
+    DATA_DIR = bb_paths.data_dir()
     snap_path = DATA_DIR / "snapshot_latest.csv"
 
     # Try CSV first
     snap = None
     if snap_path.exists():
         try:
-            snap = pd.read_csv(snap_path)
+            snap = app_cache.read_csv(snap_path, compact=True)
         except Exception:
             snap = None
 
@@ -1,30 +1,13 @@
 from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
-
 import streamlit as st
-import pandas as pd
 from pathlib import Path
 from modules import explain as explain_mod
+from modules.services import paths as bb_paths
+from modules.services import app_cache
 
 def _data_dir() -> Path:
-    here = Path(__file__).resolve()
-    for up in [here, *here.parents]:
-        cand = up / "Data"
-        if cand.is_dir():
-            return cand
-        if up.name == "program":
-            cand2 = up.parent / "Data"
-            if cand2.is_dir():
-                return cand2
-    fb = here.parent / "Data"
-    fb.mkdir(parents=True, exist_ok=True)
-    return fb
+    return bb_paths.data_dir()
 
 def render_report_tab(**kwargs):
     st.header("Report")
@@ -33,7 +16,7 @@ def render_report_tab(**kwargs):
         st.info("No ranked CSV yet. Run a rank once.")
         return
     try:
-        df = pd.read_csv(p)
+        df = app_cache.read_csv(p, compact=True)
     except Exception as e:
         st.error(f"Failed to read ranked CSV: {e}")
         return
@@ -1,11 +1,5 @@
 from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
 from dataclasses import dataclass
 import streamlit as st
 from modules.glossary import render_sidebar_help
@@ -19,6 +13,8 @@ class SidebarSettings:
     friendly: bool
     auto_scan: bool
     typed_symbol: str
+    diversify: bool = False
+    montecarlo: bool = False
 
 def render_sidebar(*, default_universe: int = 300, default_topn: int = 25, default_agent_weight: float = 0.30, has_agents: bool = False) -> SidebarSettings:
     st.sidebar.header("Controls")
@@ -32,6 +28,10 @@ def render_sidebar(*, default_universe: int = 300, default_topn: int = 25, defau
     agent_weight = float(st.sidebar.slider("Agent blend weight", 0.0, 1.0, float(default_agent_weight), 0.05)) if has_agents else 0.0
     friendly = st.sidebar.toggle("Plain-English Why", value=True)
     auto_scan = st.sidebar.toggle("Auto-scan", value=True)
+    diversify = st.sidebar.toggle("Diversify Top N", value=False,
+                                  help="Skip names that move with ones already picked (60-day return correlation).")
+    montecarlo = st.sidebar.toggle("Monte Carlo odds", value=False,
+                                   help="Simulate 20 trading days of price paths for the Top N and add MC_* columns (odds of touching +3/5/10%).")
     typed_symbol = ""
     st.session_state["bb_analyze_ticker"] = typed_symbol
     render_sidebar_help(st)
@@ -44,4 +44,6 @@ def render_sidebar(*, default_universe: int = 300, default_topn: int = 25, defau
         friendly=friendly,
         auto_scan=auto_scan,
         typed_symbol=typed_symbol,
+        diversify=diversify,
+        montecarlo=montecarlo,
     )
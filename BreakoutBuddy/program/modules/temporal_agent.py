@@ -1,12 +1,5 @@
 from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
-
 # temporal_agent.py
 # A tiny, dependency-light "temporal helper" you can drop into any project.
 # Baseline model + optional Kozyrev-style time-energy correction.
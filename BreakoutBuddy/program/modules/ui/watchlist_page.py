@@ -1,36 +1,20 @@
 from __future__ import annotations
 
-from pathlib import Path
-import os
-PROJECT_DIR = Path(__file__).resolve().parent
-(PROJECT_DIR / "data").mkdir(exist_ok=True, parents=True)
-(PROJECT_DIR / "assets").mkdir(exist_ok=True, parents=True)
-
-
 import streamlit as st
 import pandas as pd
 from pathlib import Path
 from datetime import datetime, timedelta
+from modules.services import paths as bb_paths
+from modules.services import app_cache
 
 COLUMNS_ALL = [
     "Ticker","Open","High","Low","Close","Volume",
     "Combined","P_up","Risk","RelSPY","RVOL","RSI4","ConnorsRSI",
-    "SqueezeHint","ChangePct","AgentBoost_exact","QuickWhy","RiskBadge"
+    "SqueezeHint","ChangePct","AgentBoost_exact","QuickWhy","RiskBadge","Explanation"
 ]
 
 def _data_dir() -> Path:
-    here = Path(__file__).resolve()
-    for up in [here, *here.parents]:
-        cand = up / "Data"
-        if cand.is_dir():
-            return cand
-        if up.name == "program":
-            cand2 = up.parent / "Data"
-            if cand2.is_dir():
-                return cand2
-    fb = here.parent / "Data"
-    fb.mkdir(parents=True, exist_ok=True)
-    return fb
+    return bb_paths.data_dir()
 
 def _mtime(p: Path) -> float:
     try:
@@ -42,7 +26,7 @@ def _load_csv(name: str) -> tuple[pd.DataFrame, str, float]:
     p = _data_dir() / name
     if p.exists():
         try:
-            df = pd.read_csv(p)
+            df = app_cache.read_csv(p)
             ts = datetime.fromtimestamp(_mtime(p)).strftime("%Y-%m-%d %H:%M")
             return df, ts, _mtime(p)
         except Exception:
@@ -105,19 +89,16 @@ def _connors_rsi(close: pd.Series) -> float:
     return float((rsi4 + streak_rsi + pct_rank) / 3.0)
 
 def _fetch_minimal_rows(tickers: list[str]) -> pd.DataFrame:
-    try:
-        import yfinance as yf
-    except Exception:
-        return pd.DataFrame(columns=COLUMNS_ALL)
+    from modules.services import market_data
     rows = []
     spy = None
     try:
-        spy = yf.Ticker("SPY").history(period="7d")["Close"]
+        spy = market_data.history("SPY", period="7d")["Close"]
     except Exception:
         spy = None
     for t in tickers:
         try:
-            hist = yf.Ticker(t).history(period="60d")
+            hist = market_data.history(t, period="60d")
             if hist is None or hist.empty:
                 continue
             h = hist.tail(30).copy()
@@ -172,18 +153,13 @@ def _ensure_explanations(df: pd.DataFrame) -> pd.DataFrame:
         from modules import explain as explain_mod
     except Exception:
         return df
-    qs = []; rb = []
-    for _, row in df.iterrows():
-        try:
-            exp = explain_mod.explain_for_row(row, allow_local_llm=True)
-            qs.append(exp.get("quick",""))
-            rb.append(exp.get("risk_badge",""))
-        except Exception:
-            qs.append("")
-            rb.append("")
+    try:
+        exp = explain_mod.explain_frame(df, detailed=False)
+    except Exception:
+        return df
     out = df.copy()
-    out["QuickWhy"] = qs
-    out["RiskBadge"] = rb
+    out["QuickWhy"] = exp["quick"].to_numpy()
+    out["RiskBadge"] = exp["risk_badge"].to_numpy()
     return out
 
 def _order_cols(df: pd.DataFrame) -> pd.DataFrame:
@@ -296,11 +272,14 @@ def render_watchlist_page(*, conn=None, settings=None, **kwargs):
 
     try:
         from modules import explain as explain_mod
-        qs = []; rb = []
-        for _, row in snap.iterrows():
-            exp = explain_mod.explain_for_row(row, allow_local_llm=True)
-            qs.append(exp.get("quick","")); rb.append(exp.get("risk_badge",""))
-        snap["QuickWhy"] = qs; snap["RiskBadge"] = rb
+        exp = explain_mod.explain_frame(snap, detailed=False)
+        snap["QuickWhy"] = exp["quick"].to_numpy(); snap["RiskBadge"] = exp["risk_badge"].to_numpy()
+    except Exception:
+        pass
+    # LLM text comes from cache; misses show the template and are generated in the background.
+    try:
+        from modules.services import explain_service
+        snap["Explanation"] = explain_service.explain_rows(snap.to_dict("records"), budget_s=0.0)
     except Exception:
         pass
 
@@ -314,10 +293,11 @@ def render_watchlist_page(*, conn=None, settings=None, **kwargs):
         if sel:
             row = snap[snap["Ticker"].astype(str) == sel].iloc[0].to_dict()
             try:
-                from modules import explain as explain_mod
-                exp = explain_mod.explain_for_row(row, allow_local_llm=True)
                 st.markdown("### Why (detailed)")
-                st.write(exp.get("detailed",""))
+                st.write(row.get("Explanation") or "")
+                from modules.services import explain_service
+                if explain_service.pending():
+                    st.caption("Local model explanations are still generating; they'll show on the next refresh.")
             except Exception:
                 st.info("Explanation module unavailable.")
 
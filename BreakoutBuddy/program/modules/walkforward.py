@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+# walkforward.py — replay the rankers over every stored as-of date and score them.
+#
+#   run(db_path, k=(10, 20), horizons=(1, 2, 3, 5, 10), workers=4)
+#       one row per (as_of, engine): universe size, base rate, P@K, top-K hit rate at
+#       each horizon, top-K turnover vs the previous date. Checkpointed per date under
+#       Data/perf/walkforward/<run key>.csv, so an interrupted run resumes where it left off.
+#   summary(results)    per engine: dates, mean P@K, lift over base rate, decay, turnover
+#
+# Dates are the last snapshot of each calendar day in features_history. Labels come from
+# features_labels (filled here with features.update_labels for every horizon): a hit is
+# a close >= target_pct above the as-of close within the horizon. Only labelled rows
+# count, so the last `max(horizons)` days are partly or fully skipped.
+#
+# Engines (name -> scorer over one date's frame; higher is better):
+#   combined         scoring.combined_score (what rank_now sorts by, before agents)
+#   blended          ranking.blended_ranking FinalScore
+#   <Flag>           combined, restricted to rows with Flag == 1, for every engine flag
+#                    column the history stores (SqueezeOn, BreakoutOK, ...)
+# features_history does not store every engine input (P_up, CrowdRisk, RetailChaseRisk
+# are computed at rank time), and the scorers fill missing ones with a constant. Each
+# row lists those inputs under `defaulted`; an engine whose score comes out constant on
+# a date is skipped for that date. Ties rank by Ticker, so top-K never depends on the
+# order DuckDB returns rows in.
+# Dates are evaluated in worker processes (workers=1 runs in-process).
+
+import hashlib, json, os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from modules.services import paths as bb_paths
+from modules.services import tracing
+from modules.services.lazy import lazy_import
+
+duckdb = lazy_import("duckdb")
+
+FLAG_ENGINES = ["BreakoutOK", "CrosserOK", "BoxOK", "RetailFadeOK", "SqueezeOn"]
+ENGINE_INPUTS = {
+    "combined": ("P_up", "RelSPY", "RVOL"),
+    "blended": ("P_up", "CrowdRisk", "RetailChaseRisk", "SqueezeHint"),
+}
+RESULT_VERSION = 2        # bump when result columns change, so old checkpoints are not appended to
+CHUNK_DATES = 8
+
+
+# ---------- engines ----------
+
+def _combined(df: pd.DataFrame) -> pd.Series:
+    from modules.services import scoring
+    num = lambda c, d: pd.to_numeric(df[c], errors="coerce").fillna(d) if c in df.columns else pd.Series(d, index=df.index)
+    return pd.Series(scoring.combined_score(num("P_up", 0.5), num("RelSPY", 0.0), num("RVOL", 1.0)), index=df.index)
+
+
+def _blended(df: pd.DataFrame) -> pd.Series:
+    from modules import ranking
+    return ranking.blended_ranking(df, regime=None, top_n=0)["FinalScore"].reindex(df.index)
+
+
+def _flagged(flag: str) -> Callable[[pd.DataFrame], pd.Series]:
+    def score(df: pd.DataFrame) -> pd.Series:
+        s = _combined(df)
+        on = pd.to_numeric(df[flag], errors="coerce").fillna(0) >= 1
+        return s.where(on)
+    return score
+
+
+def _defaulted(name: str, df: pd.DataFrame) -> List[str]:
+    """Inputs of engine `name` that are absent or constant in df (the scorer sees a constant)."""
+    cols = ENGINE_INPUTS.get(name, ENGINE_INPUTS["combined"])
+    return [c for c in cols if c not in df.columns or pd.to_numeric(df[c], errors="coerce").nunique() <= 1]
+
+
+def engines_for(columns: Iterable[str]) -> Dict[str, Callable[[pd.DataFrame], pd.Series]]:
+    out: Dict[str, Callable[[pd.DataFrame], pd.Series]] = {"combined": _combined, "blended": _blended}
+    for f in FLAG_ENGINES:
+        if f in set(columns):
+            out[f] = _flagged(f)
+    return out
+
+
+# ---------- data ----------
+
+def _prepare_labels(con, horizons: Sequence[int], target_pct: float) -> Dict[int, int]:
+    from modules import features as feat_mod
+    return {int(h): feat_mod.update_labels(con, horizon_days=int(h), target_pct=target_pct) for h in horizons}
+
+
+def _load(con, horizons: Sequence[int], target_pct: float, start=None, end=None) -> pd.DataFrame:
+    hs = [int(h) for h in horizons]
+    pivots = ", ".join(f"max(CASE WHEN l.horizon_days = {h} THEN l.label END) AS hit_{h}d" for h in hs)
+    where, params = [], [float(target_pct)]
+    if start is not None:
+        where.append("f.as_of >= ?")
+        params.append(pd.Timestamp(start))
+    if end is not None:
+        where.append("f.as_of <= ?")
+        params.append(pd.Timestamp(end))
+    sql = f"""
+        SELECT f.*, {pivots}
+        FROM features_history f
+        JOIN (SELECT max(as_of) AS as_of FROM features_history GROUP BY CAST(as_of AS DATE)) d USING (as_of)
+        LEFT JOIN features_labels l
+          ON l.as_of = f.as_of AND l.Ticker = f.Ticker AND l.target_pct = ?
+         AND l.horizon_days IN ({", ".join(str(h) for h in hs)})
+        {"WHERE " + " AND ".join(where) if where else ""}
+        GROUP BY ALL
+        ORDER BY f.as_of
+    """
+    return con.execute(sql, params).df()
+
+
+# ---------- per-date evaluation (runs in workers) ----------
+
+def _eval_date(as_of, frame: pd.DataFrame, engines: Sequence[str], ks: Sequence[int], horizons: Sequence[int],
+               main: int) -> List[Dict]:
+    lab = frame[frame[f"hit_{main}d"].notna()].reset_index(drop=True)
+    if lab.empty:
+        return []
+    scorers = engines_for(lab.columns)
+    kmax = max(ks)
+    base = float(lab[f"hit_{main}d"].mean())
+    rows = []
+    for name in engines:
+        fn = scorers.get(name)
+        if fn is None:
+            continue
+        s = pd.to_numeric(fn(lab), errors="coerce")
+        cand = s.notna()
+        if not cand.any() or (cand.sum() > 1 and s[cand].nunique() <= 1):
+            continue                    # nothing to rank, or every candidate ties
+        ranked = pd.DataFrame({"s": s[cand], "t": lab.loc[cand, "Ticker"].astype(str)})
+        order = ranked.sort_values(["s", "t"], ascending=[False, True], kind="mergesort").index[:kmax]
+        top = lab.loc[order]
+        row = {"as_of": str(pd.Timestamp(as_of)), "engine": name, "universe": int(len(lab)),
+               "candidates": int(cand.sum()), "base_rate": round(base, 4),
+               "defaulted": " ".join(_defaulted(name, lab)),
+               "top": " ".join(top["Ticker"].astype(str))}
+        for k in ks:
+            row[f"P@{k}"] = round(float(top[f"hit_{main}d"].head(k).mean()), 4)
+        for h in horizons:
+            v = top[f"hit_{int(h)}d"].dropna()
+            row[f"hit_{int(h)}d"] = round(float(v.mean()), 4) if len(v) else np.nan
+        rows.append(row)
+    return rows
+
+
+def _eval_chunk(items: List, engines: Sequence[str], ks: Sequence[int], horizons: Sequence[int], main: int) -> List[Dict]:
+    out: List[Dict] = []
+    for as_of, frame in items:
+        out.extend(_eval_date(as_of, frame, engines, ks, horizons, main))
+    return out
+
+
+# ---------- driver ----------
+
+def _checkpoint_dir() -> Path:
+    return bb_paths.get_paths().perf_dir / "walkforward"
+
+
+def run_key(db_path, engines, ks, horizons, target_pct, main) -> str:
+    blob = json.dumps([str(Path(db_path).resolve()), list(engines), list(ks), list(horizons), float(target_pct), int(main),
+                       RESULT_VERSION])
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:12]
+
+
+def _turnover(df: pd.DataFrame, kmax: int) -> pd.Series:
+    out = pd.Series(np.nan, index=df.index)
+    for _, g in df.sort_values("as_of").groupby("engine", sort=False):
+        prev = None
+        for i, top in zip(g.index, g["top"].fillna("")):
+            cur = set(top.split())
+            if prev is not None and cur:
+                out[i] = round(1.0 - len(cur & prev) / float(max(len(cur), 1)), 4)
+            prev = cur
+    return out
+
+
+@tracing.traced("walkforward", new_run=True)
+def run(db_path: Optional[Path | str] = None, *, k: Sequence[int] = (10, 20), horizons: Sequence[int] = (1, 2, 3, 5, 10),
+        horizon_days: int = 5, target_pct: float = 3.0, engines: Optional[Sequence[str]] = None,
+        workers: Optional[int] = None, start=None, end=None, resume: bool = True,
+        progress: Optional[Callable[[str], None]] = None) -> pd.DataFrame:
+    """Walk-forward replay of every engine over every labelled as-of date (see module header)."""
+    db = str(db_path or bb_paths.db_path())
+    ks = sorted({int(x) for x in k})
+    hs = sorted({int(h) for h in horizons} | {int(horizon_days)})
+    con = duckdb.connect(db)
+    try:
+        _prepare_labels(con, hs, target_pct)
+        data = _load(con, hs, target_pct, start, end)
+    finally:
+        con.close()
+    if data.empty:
+        return pd.DataFrame()
+    names = list(engines or engines_for(data.columns))
+    key = run_key(db, names, ks, hs, target_pct, horizon_days)
+    ck = _checkpoint_dir() / f"{key}.csv"
+    done: set = set()
+    if ck.exists() and resume:
+        try:
+            # a date is done once its longest horizon was labelled; others are redone
+            prev = pd.read_csv(ck, usecols=["as_of", f"hit_{hs[-1]}d"])
+            done = set(prev.loc[prev[f"hit_{hs[-1]}d"].notna(), "as_of"].astype(str))
+        except Exception:
+            done = set()
+    elif ck.exists():
+        ck.unlink()
+
+    items = [(a, g.reset_index(drop=True)) for a, g in data.groupby("as_of", sort=True) if str(pd.Timestamp(a)) not in done]
+    chunks = [items[i:i + CHUNK_DATES] for i in range(0, len(items), CHUNK_DATES)]
+    n_workers = max(1, int(workers if workers is not None else min(4, os.cpu_count() or 1)))
+    bb_paths.ensure_dir(ck.parent)
+
+    def save(rows: List[Dict]) -> None:
+        if rows:
+            pd.DataFrame(rows).to_csv(ck, mode="a", header=not ck.exists(), index=False)
+
+    n_done = 0
+    if n_workers == 1 or len(chunks) <= 1:
+        for ch in chunks:
+            save(_eval_chunk(ch, names, ks, hs, int(horizon_days)))
+            n_done += len(ch)
+            if progress:
+                progress(f"{n_done}/{len(items)} dates")
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as ex:
+            futs = {ex.submit(_eval_chunk, ch, names, ks, hs, int(horizon_days)): len(ch) for ch in chunks}
+            for f in as_completed(futs):
+                save(f.result())
+                n_done += futs[f]
+                if progress:
+                    progress(f"{n_done}/{len(items)} dates")
+
+    if not ck.exists():
+        return pd.DataFrame()
+    res = (pd.read_csv(ck).drop_duplicates(["as_of", "engine"], keep="last")
+             .sort_values(["as_of", "engine"]).reset_index(drop=True))
+    res["turnover"] = _turnover(res, max(ks))
+    res.attrs["checkpoint"] = str(ck)
+    return res
+
+
+def summary(results: pd.DataFrame) -> pd.DataFrame:
+    """Per engine: dates, mean P@K and lift over the base rate, mean hit rate per horizon, turnover,
+    and the inputs it ran on defaults for (on any date)."""
+    if results is None or results.empty:
+        return pd.DataFrame()
+    pk = [c for c in results.columns if c.startswith("P@")]
+    hit = sorted([c for c in results.columns if c.startswith("hit_")], key=lambda c: int(c[4:-1]))
+    agg = results.groupby("engine").agg(dates=("as_of", "nunique"), base_rate=("base_rate", "mean"),
+                                        candidates=("candidates", "mean"),
+                                        **{c: (c, "mean") for c in pk + hit}, turnover=("turnover", "mean"))
+    for c in pk:
+        agg[f"lift_{c}"] = agg[c] / agg["base_rate"].where(agg["base_rate"] > 0)
+    if "defaulted" in results.columns:
+        agg["defaulted"] = results.groupby("engine")["defaulted"].agg(
+            lambda v: " ".join(sorted({c for x in v.fillna("").astype(str) for c in x.split()})))
+    return agg.round(4).sort_values(pk[-1] if pk else "dates", ascending=False).reset_index()